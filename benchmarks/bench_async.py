@@ -0,0 +1,116 @@
+"""Load test of the /question endpoint against the fake APIs answering
+with a fixed latency: the Flask view handling the questions one at a time
+in a single worker, then the ASGI application handling them concurrently in
+a single event loop.
+
+Usage: python -m benchmarks.bench_async [questions] [concurrency] [latency]
+"""
+
+import asyncio
+import sys
+import time
+import urllib.parse
+
+from grandpy import bot, fakeserver
+from grandpy.apis import googlemaps, session, wikipedia
+
+
+def use_fake_server(server):
+    """Points the clients to the fake server, without any cache so that
+     every question reaches the fake APIs.
+    """
+    googlemaps.GEOCODING_URL, wikipedia.WIKIPEDIA_URL = fakeserver.urls(server)
+    bot.use_backends(
+        googlemaps.GoogleGeocodingClient(), wikipedia.WikipediaClient()
+    )
+    bot.get_answer_cache().maxsize = 0
+
+
+def name(number):
+    """Returns a name made of letters for the number, the parser removing
+     the digits of the questions.
+    """
+    letters = ""
+    while True:
+        number, letter = divmod(number, 26)
+        letters += chr(ord("a") + letter)
+        if not number:
+            return "x" + letters
+
+
+def questions(count):
+    """Returns count questions parsed to different addresses."""
+    return [f"Où se trouve la tour {name(i)} ?" for i in range(count)]
+
+
+def run_flask(count):
+    """Posts the questions one after the other to the Flask application and
+     returns the number of questions answered per second.
+    """
+    from website import app
+
+    client = app.test_client()
+    start = time.perf_counter()
+    for question in questions(count):
+        response = client.post("/question", data={"question": question})
+        assert response.get_json()["found"]
+    return count / (time.perf_counter() - start)
+
+
+async def post(question):
+    """Posts a question to the ASGI application and returns the status."""
+    from website.asgi import app
+
+    body = urllib.parse.urlencode({"question": question}).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/question"}
+    await app(scope, receive, send)
+    return sent[0]["status"]
+
+
+async def run_asgi(count, concurrency):
+    """Posts the questions to the ASGI application, concurrency at a time,
+     and returns the number of questions answered per second.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited_post(question):
+        async with semaphore:
+            return await post(question)
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*map(limited_post, questions(count)))
+    duration = time.perf_counter() - start
+    await session.async_close()
+    assert set(statuses) == {200}
+    return count / duration
+
+
+def main(count=200, concurrency=50, latency=0.05):
+    server = fakeserver.start_server(latency)
+    use_fake_server(server)
+    print(f"{count} questions, fake APIs latency {latency * 1000:.0f} ms")
+    flask_rate = run_flask(min(count, 40))
+    print(f"flask, 1 worker:           {flask_rate:8.1f} questions/s")
+    asgi_rate = asyncio.run(run_asgi(count, concurrency))
+    print(
+        f"asgi, {concurrency:>3} concurrent:      {asgi_rate:8.1f} questions/s"
+        f" (x{asgi_rate / flask_rate:.1f})"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    arguments = sys.argv[1:]
+    main(
+        *(int(argument) for argument in arguments[:2]),
+        *(float(argument) for argument in arguments[2:]),
+    )
@@ -0,0 +1,88 @@
+"""Measures the lookups of the offline gazetteer, with the exact names of
+the places and with misspelt names found by the fuzzy matching, in a
+gazetteer of synthetic places.
+
+The fuzzy lookups stay under a millisecond for a few thousand places; the
+synthetic names, made of a few syllables, share many more trigrams than
+real place names do.
+
+Usage: python -m benchmarks.bench_gazetteer [number of places] [lookups]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from grandpy.gazetteer import Gazetteer, build, place_key
+from grandpy.parser import Parser
+
+KINDS = ["tour", "musee", "chateau", "gare", "place", "pont", "eglise", "parc"]
+SYLLABLES = [
+    consonant + vowel
+    for consonant in "bcdfghjlmnprstv"
+    for vowel in ("a", "e", "i", "o", "u", "ou", "an", "on")
+]
+
+
+def places(count, seed=0):
+    """Returns count places with random names."""
+    rng = random.Random(seed)
+    return [
+        {
+            "name": "%s %s"
+            % (
+                rng.choice(KINDS),
+                "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))),
+            ),
+            "latitude": rng.uniform(-90, 90),
+            "longitude": rng.uniform(-180, 180),
+        }
+        for _ in range(count)
+    ]
+
+
+def misspelt(key, rng):
+    """Returns key with one letter of its last word removed."""
+    index = rng.randrange(key.rfind(" ") + 1, len(key))
+    return key[:index] + key[index + 1:]
+
+
+def measure(gazetteer, questions):
+    """Returns the mean duration of a lookup in microseconds and the number
+     of places found.
+    """
+    start = time.perf_counter()
+    found = sum(
+        gazetteer.search(question) is not None for question in questions
+    )
+    return (time.perf_counter() - start) / len(questions) * 1e6, found
+
+
+def main(count=5000, lookups=10000):
+    parser = Parser()
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "gazetteer.sqlite3")
+        data = places(count)
+        start = time.perf_counter()
+        build(path, data, parser)
+        print(f"built {count} places in {time.perf_counter() - start:.2f} s")
+        keys = [place_key(parser, place["name"]) for place in data]
+        gazetteer = Gazetteer(path)
+        exact = [rng.choice(keys) for _ in range(lookups)]
+        fuzzy = [misspelt(rng.choice(keys), rng) for _ in range(lookups)]
+        unknown = [f"lieu inconnu {i}" for i in range(lookups)]
+        print(f"{'lookups':<10}{'us/lookup':>12}{'found':>8}")
+        for name, questions in (
+            ("exact", exact),
+            ("fuzzy", fuzzy),
+            ("unknown", unknown),
+        ):
+            duration, found = measure(gazetteer, questions)
+            print(f"{name:<10}{duration:>12.1f}{found / lookups:>8.0%}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,88 @@
+"""Measures the cost of a new connection per request, like the module level
+requests.get does, against the shared pool of grandpy.apis.session, with a
+local stub server answering like the Google Geocoding API.
+
+Usage: python -m benchmarks.bench_http [number of requests] [threads]
+"""
+
+import concurrent.futures
+import http.server
+import sys
+import threading
+import time
+
+import requests
+
+from grandpy.apis import session
+
+BODY = (
+    b'{"results": [{"formatted_address": "Champ de Mars, 75007 Paris",'
+    b' "geometry": {"location": {"lat": 48.8583701, "lng": 2.2944813}}}],'
+    b' "status": "OK"}'
+)
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers every GET request with the same geocoding result."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    """Starts the stub server in a thread and returns it."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(server, get, count, threads):
+    """Sends count requests with get and returns the mean duration of a
+     request in milliseconds and the number of connections opened.
+    """
+    url = f"http://127.0.0.1:{server.server_address[1]}/geocode/json"
+    server.connections = 0
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+        for response in executor.map(
+            lambda _: get(url, params={"address": "tour eiffel"}),
+            range(count),
+        ):
+            response.raise_for_status()
+    duration = (time.perf_counter() - start) * 1000 / count
+    return duration, server.connections
+
+
+def main(count=500, threads=1):
+    server = start_server()
+    session.configure(pool_size=max(threads, 1))
+    print(f"{count} requests, {threads} thread(s)")
+    for name, get in (("requests.get", requests.get), ("pooled", session.get)):
+        duration, connections = run(server, get, count, threads)
+        print(
+            f"{name:>12}: {duration:6.3f} ms/request,"
+            f" {connections} connection(s) opened"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,108 @@
+"""Compares the json module of the standard library with orjson on the
+responses of the APIs recorded in the fixtures of the fake server: the
+decoding of the responses by the clients, and the serialization of the
+answer built from them, as grandpy.fastjson does with either library.
+
+Usage: python -m benchmarks.bench_json [repetitions]
+"""
+
+import json
+import sys
+import time
+
+from grandpy import fakeserver
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def stdlib_dumps(data):
+    """Serializes data like the fallback of grandpy.fastjson."""
+    return json.dumps(
+        data, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def payloads():
+    """Returns the recorded responses of the APIs and the answer built from
+     them, by name.
+    """
+    fixtures = fakeserver.load_fixtures()
+    geocoding = fixtures["geocoding"]["tour eiffel"]
+    geosearch = {
+        "batchcomplete": "",
+        "query": {
+            "geosearch": fixtures["geosearch"],
+            "pages": fixtures["pages"],
+        },
+    }
+    location = geocoding["results"][0]["geometry"]["location"]
+    page = next(iter(fixtures["pages"].values()))
+    answer = {
+        "found": True,
+        "question": "Salut GrandPy ! Où se trouve la tour Eiffel ?",
+        "intro": "Bien sûr mon poussin ! Voici ce que tu cherches : ",
+        "address": geocoding["results"][0]["formatted_address"],
+        "latitude": location["lat"],
+        "longitude": location["lng"],
+        "article_intro": "Au fait, cela me rappelle :",
+        "title": page.get("title"),
+        "summary": page.get("extract"),
+        "url": page.get("fullurl"),
+    }
+    return {
+        "geocoding": stdlib_dumps(geocoding),
+        "geosearch": stdlib_dumps(geosearch),
+        "answer": stdlib_dumps(answer),
+    }
+
+
+def microseconds(function, argument, repetitions):
+    """Returns the mean duration of function(argument) in microseconds, the
+     fastest of 5 runs being kept.
+    """
+    runs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            function(argument)
+        runs.append(time.perf_counter() - start)
+    return min(runs) / repetitions * 1e6
+
+
+def main(repetitions=20000):
+    libraries = {"json": (json.loads, stdlib_dumps)}
+    if orjson is not None:
+        libraries["orjson"] = (orjson.loads, orjson.dumps)
+    else:
+        print("orjson is not installed, only json is measured")
+    print(
+        f"{'payload':<10}{'bytes':>7}{'library':>9}{'decode':>10}"
+        f"{'serialize':>11}  (microseconds)"
+    )
+    for name, body in payloads().items():
+        data = json.loads(body)
+        baseline = None
+        for library, (loads, dumps) in libraries.items():
+            total = (
+                microseconds(loads, body, repetitions),
+                microseconds(dumps, data, repetitions),
+            )
+            line = (
+                f"{name:<10}{len(body):>7}{library:>9}"
+                f"{total[0]:>10.2f}{total[1]:>11.2f}"
+            )
+            if baseline is None:
+                baseline = total
+            else:
+                line += (
+                    f"  x{baseline[0] / total[0]:.1f}"
+                    f" / x{baseline[1] / total[1]:.1f}"
+                )
+            print(line)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,96 @@
+"""Compares the extraction of the place with the question tags looked up
+one after the other, like extract_place, and with the Aho-Corasick automaton
+of QuestionTagMatcher, for 10, 100 and 1000 question tags. The default
+matcher only scans with the automaton above its sequential threshold.
+
+Usage: python -m benchmarks.bench_matcher [number of questions]
+"""
+
+import itertools
+import json
+import sys
+import time
+
+from benchmarks.corpus import french_questions
+from grandpy.parser import QUESTIONS_PATH, QuestionTagMatcher, normalize
+
+PREFIXES = ["", "peux-tu ", "pourrais-tu ", "sais-tu ", "voudrais-tu "]
+VERBS = [
+    "m'indiquer ",
+    "me montrer ",
+    "me dire ",
+    "m'expliquer ",
+    "me donner ",
+    "me trouver ",
+    "me rappeler ",
+    "me decrire ",
+]
+OBJECTS = [
+    "",
+    "ou se trouve ",
+    "l'adresse de ",
+    "le chemin vers ",
+    "la position de ",
+    "comment aller a ",
+    "ou est ",
+    "ou se situe ",
+    "les coordonnees de ",
+    "l'emplacement de ",
+]
+LANGUAGES = ["", "en francais ", "rapidement ", "precisement ", "stp "]
+
+
+def question_tags(count):
+    """Returns count question tags, the real ones first."""
+    with open(QUESTIONS_PATH) as jsonfile:
+        tags = json.load(jsonfile)
+    for parts in itertools.product(PREFIXES, VERBS, LANGUAGES, OBJECTS):
+        tag = "".join(parts)
+        if tag not in tags:
+            tags.append(tag)
+    return tags[:count]
+
+
+def sequential_extract(question_tags, sentence):
+    """extract_place without the loading of the json file."""
+    for question_tag in question_tags:
+        parts = sentence.split(question_tag)
+        if len(parts) == 2:
+            return parts[1]
+    return sentence
+
+
+def extractions_per_second(extract, corpus):
+    """Returns the number of sentences of the corpus processed per second."""
+    start = time.perf_counter()
+    for sentence in corpus:
+        extract(sentence)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main(count=5000):
+    corpus = [normalize(sentence) for sentence in french_questions(count)]
+    print(f"corpus: {count} questions")
+    print(
+        f"{'tags':>5} {'sequential':>12} {'file_order':>12}"
+        f" {'leftmost':>12} {'default':>12}"
+    )
+    for size in (10, 100, 1000):
+        tags = question_tags(size)
+        results = [
+            extractions_per_second(
+                lambda sentence: sequential_extract(tags, sentence), corpus
+            )
+        ]
+        # The automaton alone for each policy, then the default matcher
+        for policy in QuestionTagMatcher.policies:
+            matcher = QuestionTagMatcher(tags, policy, sequential_threshold=0)
+            results.append(extractions_per_second(matcher.extract, corpus))
+        matcher = QuestionTagMatcher(tags)
+        results.append(extractions_per_second(matcher.extract, corpus))
+        print(f"{size:>5}", *(f"{result:>12.0f}" for result in results))
+    print("(extractions per second)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""Measures the memory taken by the geosearches with their data, for
+growing gslimit values: the decoding of the response, the PageList built
+from it when only its first page is read, as the bot does, and when all
+its pages are read.
+
+The responses are synthetic, each page having an extract of the size of
+the introductions returned by the API.
+
+Usage: python -m benchmarks.bench_memory [limits...]
+"""
+
+import json
+import sys
+import tracemalloc
+
+from grandpy.apis import wikipedia
+
+EXTRACT = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+
+
+def response(limit):
+    """Returns the encoded response of a geosearch of limit places."""
+    places = [
+        {"pageid": page_id, "lat": 48.85, "lon": 2.29, "dist": page_id}
+        for page_id in range(1, limit + 1)
+    ]
+    pages = {
+        str(page_id): {
+            "pageid": page_id,
+            "title": f"Page {page_id}",
+            "fullurl": f"https://fr.wikipedia.org/wiki/Page_{page_id}",
+            "extract": EXTRACT,
+            "lastrevid": page_id,
+        }
+        for page_id in range(1, limit + 1)
+    }
+    return json.dumps(
+        {"query": {"geosearch": places, "pages": pages}}
+    ).encode()
+
+
+def peak(function):
+    """Returns the peak memory allocated by function() in KiB."""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main(limits):
+    client = wikipedia.WikipediaClient()
+    print(f"WikipediaPage: {sys.getsizeof(wikipedia.WikipediaPage(1))} bytes")
+    print(f"{'gslimit':>8}{'decode':>12}{'first page':>12}{'all pages':>12}")
+    for limit in limits:
+        body = response(limit)
+        data = json.loads(body)
+
+        def first_page():
+            pages = client._geosearch_pages(data, with_data=True)
+            client.first_available_page(pages)
+
+        def all_pages():
+            list(client._geosearch_pages(data, with_data=True))
+
+        print(
+            f"{limit:>8}"
+            f"{peak(lambda: json.loads(body)):>9.0f} KiB"
+            f"{peak(first_page):>9.0f} KiB"
+            f"{peak(all_pages):>9.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main([int(limit) for limit in sys.argv[1:]] or [10, 50, 100, 500])
@@ -0,0 +1,73 @@
+"""Compares the parsing throughput of the reference pipeline, reading the
+data files on each call, with the compiled Parser, and the cost of the
+language detection of the MultilingualParser on french questions.
+
+Usage: python -m benchmarks.bench_parser [number of questions]
+"""
+
+import sys
+import time
+
+from benchmarks.corpus import french_questions
+from grandpy.parser import MultilingualParser, Parser
+
+
+def reference_parse(sentence):
+    """Parses the sentence with the reference pipeline."""
+    for cleaner in Parser.cleaners:
+        sentence = cleaner(sentence)
+    return sentence
+
+
+def parses_per_second(parse, corpus):
+    """Returns the number of sentences of the corpus parsed per second."""
+    start = time.perf_counter()
+    for sentence in corpus:
+        parse(sentence)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def parse_duration(parse, sentence):
+    """Returns the duration in milliseconds of the parsing of sentence."""
+    start = time.perf_counter()
+    parse(sentence)
+    return (time.perf_counter() - start) * 1000
+
+
+def main(count=5000):
+    corpus = french_questions(count)
+    parser = Parser()
+    before = parses_per_second(reference_parse, corpus)
+    after = parses_per_second(parser.parse, corpus)
+    print(f"corpus: {count} questions")
+    print(f"reference pipeline: {before:10.0f} parses/s")
+    print(
+        f"compiled parser:    {after:10.0f} parses/s"
+        f" (x{after / before:.1f})"
+    )
+
+    # The detection costs a few percent, compared on the best of 5 runs
+    single = MultilingualParser(["fr"])
+    multiple = MultilingualParser(["fr", "en", "de"])
+    runs = {"compiled parser": [], "fr only": [], "fr,en,de": []}
+    for _ in range(5):
+        runs["compiled parser"].append(parses_per_second(parser.parse, corpus))
+        runs["fr only"].append(parses_per_second(single.parse, corpus))
+        runs["fr,en,de"].append(parses_per_second(multiple.parse, corpus))
+    baseline = max(runs["compiled parser"])
+    for name in ("fr only", "fr,en,de"):
+        best = max(runs[name])
+        print(
+            f"multilingual {name:<8}: {best:7.0f} parses/s"
+            f" ({best / baseline - 1:+.1%} against the compiled parser)"
+        )
+
+    # The cost of a parse must grow linearly with the message length
+    for size in (1_000, 10_000, 100_000):
+        sentence = (" ".join(corpus) * (size // len(corpus[0]) + 1))[:size]
+        duration = parse_duration(parser.parse, sentence)
+        print(f"{size:>7} characters message: {duration:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,107 @@
+"""Measures the cold start of the Flask application in new processes:
+
+- the import time of the website package, with the modules taking the
+  longest to import, from python -X importtime;
+- the latency of the first questions against the fake APIs compared with
+  the steady latency of the following ones, without and with the warm-up
+  of grandpy.warmup.
+
+The caches of the bot are disabled and the questions all different, so that
+every question reaches the fake APIs.
+
+Usage: python -m benchmarks.bench_startup [latency] [top]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+from grandpy import fakeserver
+
+# Run in the new processes, printing the latencies of the questions in ms
+CHILD = """
+import time
+start = time.perf_counter()
+from website import app
+print((time.perf_counter() - start) * 1000)
+client = app.test_client()
+for letter in "abcdefghijklmnopqrstuvw":
+    question = f"Où se trouve la tour {letter * 3} ?"
+    start = time.perf_counter()
+    client.post("/question", data={"question": question})
+    print((time.perf_counter() - start) * 1000)
+"""
+
+NO_CACHE = {
+    "GRANDPY_ANSWER_CACHE_BYTES": "0",
+    "GRANDPY_GEOCODING_CACHE_SIZE": "0",
+    "GRANDPY_ARTICLE_CACHE_BYTES": "0",
+    "GRANDPY_GEOSEARCH_CACHE_PRECISION": "0",
+}
+
+
+def import_times(top):
+    """Returns the import time of the website package in milliseconds and
+     the top modules imported the longest, with their cumulative time.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import website"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    modules = []
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        # The packages and the modules of the bot, with their dependencies
+        if "." not in name or name.startswith(("grandpy.", "website.")):
+            modules.append((int(cumulative) / 1000, name))
+    total = int(stderr.splitlines()[-1].split("|")[1]) / 1000
+    return total, sorted(modules, reverse=True)[:top]
+
+
+def latencies(environment):
+    """Returns the import time and the latencies of the questions of a new
+     process in milliseconds.
+    """
+    stdout = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, **NO_CACHE, **environment},
+    ).stdout
+    times = [float(line) for line in stdout.split()]
+    return times[0], times[1:]
+
+
+def main(latency=0.005, top=10):
+    total, modules = import_times(top)
+    print(f"import website: {total:.1f} ms, the longest imports:")
+    for cumulative, name in modules:
+        print(f"  {cumulative:8.1f} ms  {name}")
+
+    server = fakeserver.start_server(latency=latency)
+    geocoding_url, wikipedia_url = fakeserver.urls(server)
+    urls = {
+        "GRANDPY_GEOCODING_URL": geocoding_url,
+        "GRANDPY_WIKIPEDIA_URL": wikipedia_url,
+    }
+    print(f"\nfake APIs latency: {latency * 1000:.0f} ms")
+    try:
+        for name, warm in (("cold", "0"), ("warmed up", "1")):
+            startup, times = latencies({**urls, "GRANDPY_WARMUP": warm})
+            steady = statistics.median(times[3:])
+            print(
+                f"{name:<10} startup {startup:7.1f} ms"
+                f"  first questions {times[0]:6.1f} {times[1]:6.1f}"
+                f" {times[2]:6.1f} ms  steady {steady:6.1f} ms"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:2]), *map(int, sys.argv[2:3]))
@@ -0,0 +1,54 @@
+"""Synthetic corpus of french questions used by the benchmarks."""
+
+import random
+
+GREETINGS = [
+    "Salut GrandPy !",
+    "Bonjour papy,",
+    "Bonsoir Grandpy, j'espère que tu as passé une belle semaine.",
+    "Hé grand-père !",
+    "",
+]
+
+QUESTIONS = [
+    "Où se trouve {place} ?",
+    "Est-ce que tu connais l'adresse de {place} ?",
+    "Peux-tu m'indiquer {place} s'il te plaît ?",
+    "Où est situé {place} ?",
+    "Pourrais-tu m'en dire plus sur {place} ?",
+    "Tu peux me montrer {place} ?",
+    "Sais-tu où puis-je trouver {place} ?",
+    "Quelles sont les coordonnées GPS de {place} ?",
+]
+
+PLACES = [
+    "la tour Eiffel",
+    "le musée du Louvre",
+    "OpenClassrooms",
+    "la cathédrale Notre-Dame de Paris",
+    "le château de Versailles",
+    "la gare de Lyon",
+    "l'Arc de Triomphe",
+    "le Mont-Saint-Michel",
+    "la place Bellecour à Lyon",
+    "le Vieux-Port de Marseille",
+]
+
+ENDINGS = ["Merci !", "Merci beaucoup.", "", "Bisous"]
+
+
+def french_questions(count, seed=0):
+    """Returns count random questions, the same ones for a given seed."""
+    rng = random.Random(seed)
+    return [
+        " ".join(
+            part
+            for part in (
+                rng.choice(GREETINGS),
+                rng.choice(QUESTIONS).format(place=rng.choice(PLACES)),
+                rng.choice(ENDINGS),
+            )
+            if part
+        )
+        for _ in range(count)
+    ]
@@ -0,0 +1,218 @@
+"""End-to-end benchmark suite of the question pipeline, whose results are
+written in a JSON file to be compared with the results of another commit.
+
+The suite measures:
+
+- parse: Parser.parse on the synthetic corpus of french questions;
+- geocoding, geosearch: the API clients against the fake server without
+  latency, that is the overhead of the clients and of the HTTP pool;
+- question: the /question route of the Flask application, called by
+  several threads through the test client, against the fake server with a
+  small latency.
+
+No cache is used, not even the answer cache, so that every question goes
+through the whole pipeline.
+Each benchmark is repeated, the fastest run being kept to limit the noise.
+
+Usage: python -m benchmarks.suite [--output FILE] [--compare FILE]
+                                  [--threshold RATIO] [--repeat N] [--quick]
+
+With --compare, the command fails when a throughput is lower than the one
+of the results compared by more than the threshold, 10% by default.
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import french_questions
+from grandpy import bot, fakeserver
+from grandpy.apis import googlemaps, wikipedia
+from grandpy.parser import Parser
+
+
+def summarize(durations, total):
+    """Returns the throughput and the latency percentiles of operations
+     lasting durations seconds, run in total seconds.
+    """
+    durations = sorted(durations)
+    return {
+        "operations": len(durations),
+        "ops_per_second": len(durations) / total,
+        "mean_ms": statistics.fmean(durations) * 1000,
+        "p50_ms": durations[len(durations) // 2] * 1000,
+        "p95_ms": durations[int(len(durations) * 0.95)] * 1000,
+    }
+
+
+def measure(function, arguments, threads=1):
+    """Calls function with each of the arguments, from threads threads, and
+     returns the summary of the calls.
+    """
+
+    def timed(argument):
+        start = time.perf_counter()
+        function(argument)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if threads == 1:
+        durations = [timed(argument) for argument in arguments]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+            durations = list(executor.map(timed, arguments))
+    return summarize(durations, time.perf_counter() - start)
+
+
+def bench_parse(count):
+    parser = Parser()
+    return measure(parser.parse, french_questions(count))
+
+
+def bench_geocoding(count):
+    client = googlemaps.GoogleGeocodingClient()
+    return measure(client.search, [f"tour {i}" for i in range(count)])
+
+
+def bench_geosearch(count):
+    client = wikipedia.WikipediaClient()
+    return measure(
+        lambda i: client.geosearch(48.8584, 2.2945, with_data=True),
+        range(count),
+    )
+
+
+def bench_question(count, threads):
+    from website import app
+
+    def post(question):
+        client = app.test_client()
+        response = client.post("/question", data={"question": question})
+        assert response.get_json()["found"]
+
+    return measure(post, french_questions(count), threads)
+
+
+def fastest(benchmark, repeat, *arguments):
+    """Runs the benchmark repeat times and returns its fastest run."""
+    return max(
+        (benchmark(*arguments) for _ in range(repeat)),
+        key=lambda result: result["ops_per_second"],
+    )
+
+
+def run(quick=False, threads=8, repeat=3, latency=0.005):
+    """Runs the benchmarks against a fake server and returns the results
+     by benchmark name.
+    """
+    scale = 10 if quick else 1
+    server = fakeserver.start_server(latency=0)
+    googlemaps.GEOCODING_URL, wikipedia.WIKIPEDIA_URL = fakeserver.urls(server)
+    bot.use_backends(
+        googlemaps.GoogleGeocodingClient(), wikipedia.WikipediaClient()
+    )
+    answer_cache = bot.get_answer_cache()
+    maxsize, answer_cache.maxsize = answer_cache.maxsize, 0
+    try:
+        results = {
+            "parse": fastest(bench_parse, repeat, 20000 // scale),
+            "geocoding": fastest(bench_geocoding, repeat, 2000 // scale),
+            "geosearch": fastest(bench_geosearch, repeat, 2000 // scale),
+        }
+        server.latency = latency
+        results["question"] = fastest(
+            bench_question, repeat, 1000 // scale, threads
+        )
+        results["question"]["threads"] = threads
+        results["question"]["upstream_latency_ms"] = latency * 1000
+    finally:
+        answer_cache.maxsize = maxsize
+        bot.use_backends()
+        server.shutdown()
+    return results
+
+
+def commit():
+    """Returns the current git commit, None outside of a repository."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results, threshold):
+    """Prints the throughputs of the results against the baseline ones and
+     returns the names of the benchmarks slower by more than threshold.
+    """
+    regressions = []
+    print(f"{'benchmark':<12}{'baseline':>14}{'current':>14}{'change':>9}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["ops_per_second"]
+        after = result["ops_per_second"]
+        change = after / before - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<12}{before:>14.1f}{after:>14.1f}{change:>+9.1%}{flag}"
+        )
+    print("(operations per second)")
+    return regressions
+
+
+def main(argv=None):
+    argument_parser = argparse.ArgumentParser(prog="benchmarks.suite")
+    argument_parser.add_argument("--output", help="JSON file of the results")
+    argument_parser.add_argument(
+        "--compare", help="JSON file of results to compare with"
+    )
+    argument_parser.add_argument("--threshold", type=float, default=0.1)
+    argument_parser.add_argument("--threads", type=int, default=8)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument(
+        "--quick", action="store_true", help="run 10 times fewer operations"
+    )
+    arguments = argument_parser.parse_args(argv)
+
+    report = {
+        "commit": commit(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "results": run(arguments.quick, arguments.threads, arguments.repeat),
+    }
+    for name, result in report["results"].items():
+        print(
+            f"{name:<12}{result['ops_per_second']:>10.1f} ops/s"
+            f"  p50 {result['p50_ms']:7.3f} ms"
+            f"  p95 {result['p95_ms']:7.3f} ms"
+        )
+    if arguments.output:
+        with open(arguments.output, "w") as jsonfile:
+            json.dump(report, jsonfile, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as jsonfile:
+            baseline = json.load(jsonfile)
+        print(f"\ncompared with {baseline.get('commit')}:")
+        regressions = compare(
+            baseline["results"], report["results"], arguments.threshold
+        )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from grandpy.cli import main
+
+main()
@@ -0,0 +1,89 @@
+"""Module defining the interfaces of the backends answering the questions:
+the geocoders, which locate the place of a question, and the article
+sources, which find the articles about the places around it.
+
+GoogleGeocodingClient and WikipediaClient implement them, and any other
+implementation can be given to grandpy.bot.use_backends. The asynchronous
+methods run the synchronous ones in a thread by default, so that a backend
+only has to implement them to be used by the ASGI application.
+"""
+
+import abc
+import asyncio
+import contextvars
+import functools
+
+
+async def run_in_thread(function, *args):
+    """Runs function(*args) in the default executor of the running loop,
+     in a copy of the current context so that the deadline of the question
+     applies in the thread too.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        None, functools.partial(context.run, function, *args)
+    )
+
+
+class BackendError(Exception):
+    """Base class of the errors of the backends, answered by the bot with a
+     negative answer.
+    """
+
+
+class GeocodingError(BackendError):
+    """Exception raised when a geocoder cannot locate an address."""
+
+
+class PlaceNotFoundError(GeocodingError):
+    """Exception raised when a geocoder knows no place at an address, as
+     opposed to the errors of the geocoder which may not happen again.
+    """
+
+
+class ArticleSourceError(BackendError):
+    """Exception raised when an article source finds no article."""
+
+
+class Geocoder(abc.ABC):
+    """Locates the place of the question parsed."""
+
+    @abc.abstractmethod
+    def search(self, address):
+        """Returns the address, latitude and longitude of the place, raising
+         a GeocodingError if it cannot be located.
+        """
+
+    async def search_async(self, address):
+        """Same as search, without blocking the event loop."""
+        return await run_in_thread(self.search, address)
+
+
+class ArticleSource(abc.ABC):
+    """Finds the articles about the places around a position, the pages
+     returned having an as_dict method giving their title, url and summary.
+    """
+
+    @abc.abstractmethod
+    def geosearch(self, latitude, longitude, with_data=False):
+        """Returns the pages around the position, the closest first, raising
+         an ArticleSourceError if there are none. With with_data, the data
+         of the pages is loaded at once if the source allows it.
+        """
+
+    @abc.abstractmethod
+    def first_available_page(self, pages):
+        """Returns the first page of the list whose data is available,
+         raising an ArticleSourceError if there is none.
+        """
+
+    async def geosearch_async(self, latitude, longitude, with_data=False):
+        """Same as geosearch, without blocking the event loop."""
+        return await run_in_thread(
+            self.geosearch, latitude, longitude, with_data
+        )
+
+    async def first_available_page_async(self, pages):
+        """Same as first_available_page, without blocking the event loop."""
+        return await run_in_thread(self.first_available_page, pages)
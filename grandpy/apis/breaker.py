@@ -0,0 +1,138 @@
+"""Module defining the circuit breakers of the APIs, which stop calling an
+API failing too often and let the clients fail fast instead.
+
+A breaker is closed while the proportion of failures among the last calls
+stays below its threshold. Beyond it, the breaker opens: the calls are
+rejected during reset_timeout seconds, after which a single trial call is
+let through (half open). Its success closes the breaker again, its failure
+opens it for another reset_timeout.
+
+The trips, recoveries and rejected calls are counted in the metrics.
+"""
+
+import collections
+import os
+import threading
+import time
+
+from grandpy import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Default settings, they can be changed with environment variables
+FAILURE_THRESHOLD = float(os.getenv("GRANDPY_BREAKER_THRESHOLD", "0.5"))
+MINIMUM_CALLS = int(os.getenv("GRANDPY_BREAKER_MINIMUM_CALLS", "10"))
+WINDOW_SIZE = int(os.getenv("GRANDPY_BREAKER_WINDOW_SIZE", "20"))
+RESET_TIMEOUT = float(os.getenv("GRANDPY_BREAKER_RESET_TIMEOUT", "30"))
+
+
+class CircuitBreaker:
+    """Circuit breaker of an API, fed with the outcomes of its calls."""
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=FAILURE_THRESHOLD,
+        minimum_calls=MINIMUM_CALLS,
+        window_size=WINDOW_SIZE,
+        reset_timeout=RESET_TIMEOUT,
+        clock=time.monotonic,
+    ):
+        """Initializes a closed breaker opening when the failures reach
+         failure_threshold of the last window_size calls, once at least
+         minimum_calls have been made.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._outcomes = collections.deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._opened_at = None
+
+    def allow(self):
+        """Returns True if a call can be made, False if it must fail fast.
+         Once the breaker has been open for reset_timeout seconds, a single
+         trial call is allowed, and another one if its outcome is not known
+         after reset_timeout seconds.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = self._clock()
+            if now - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._opened_at = now
+                return True
+        metrics.count_circuit_event(self.name, "rejected")
+        return False
+
+    def record_success(self):
+        """Records a successful call, which closes a half open breaker."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._close()
+                event = "recovery"
+            else:
+                self._outcomes.append(True)
+                event = None
+        if event:
+            metrics.count_circuit_event(self.name, event)
+
+    def record_failure(self):
+        """Records a failed call, which may open the breaker."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                tripped = True
+            else:
+                self._outcomes.append(False)
+                failures = self._outcomes.count(False)
+                calls = len(self._outcomes)
+                tripped = (
+                    self.state == CLOSED
+                    and calls >= self.minimum_calls
+                    and failures >= self.failure_threshold * calls
+                )
+            if tripped:
+                self.state = OPEN
+                self._opened_at = self._clock()
+        if tripped:
+            metrics.count_circuit_event(self.name, "trip")
+
+    def reset(self):
+        """Closes the breaker and forgets the previous calls."""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        # The lock must be held by the caller
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._opened_at = None
+
+
+# Breakers of the APIs used by the clients
+geocoding = CircuitBreaker("geocoding")
+wikipedia = CircuitBreaker("wikipedia")
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def breaker_states():
+    """Yields the states of the breakers for the metrics."""
+    for breaker in (geocoding, wikipedia):
+        yield (breaker.name,), STATE_VALUES[breaker.state]
+
+
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_circuit_breaker_state",
+        "State of the circuit breakers: 0 closed, 1 half open, 2 open.",
+        labels=("upstream",),
+        function=breaker_states,
+    )
+)
@@ -1,12 +1,28 @@
 """This module defines a class allowing to easily interact with
 the Google Maps REST API.
 """
+import asyncio
 import os
+import time
 
 import requests
 
+from grandpy import fastjson, metrics
+from grandpy.apis import breaker, session
+from grandpy.apis.backends import (
+    Geocoder,
+    GeocodingError,
+    PlaceNotFoundError,
+)
 
-class GoogleGeocodingError(Exception):
+# URL of the API, which can be replaced by the one of a local server
+GEOCODING_URL = os.getenv(
+    "GRANDPY_GEOCODING_URL",
+    "https://maps.googleapis.com/maps/api/geocode/json",
+)
+
+
+class GoogleGeocodingError(GeocodingError):
     """Exception thrown if an error occurs in the HTTP call to the API
      Google geocoding.
     """
@@ -14,43 +30,271 @@ class GoogleGeocodingError(Exception):
     pass
 
 
-class GoogleGeocodingNothingFoundError(GoogleGeocodingError):
+class GoogleGeocodingNothingFoundError(
+    GoogleGeocodingError, PlaceNotFoundError
+):
     """Exception thrown if the searched location was not found by google."""
 
     pass
 
 
-class GoogleGeocodingClient:
+class GoogleGeocodingUnavailableError(GoogleGeocodingError):
+    """Exception thrown without calling the API while its circuit breaker is
+     open.
+    """
+
+    pass
+
+
+class GoogleGeocodingDeadlineExceededError(GoogleGeocodingError):
+    """Exception thrown without calling the API once the deadline of the
+     question is exceeded.
+    """
+
+    pass
+
+
+class GoogleGeocodingOverQueryLimitError(GoogleGeocodingError):
+    """Exception thrown if the API answers that the quota of the key is
+     exceeded.
+    """
+
+    pass
+
+
+class GoogleGeocodingThrottledError(GoogleGeocodingOverQueryLimitError):
+    """Exception thrown without calling the API if the rate limiter would
+     delay the call for too long.
+    """
+
+    pass
+
+
+class GoogleGeocodingQuotaExceededError(GoogleGeocodingOverQueryLimitError):
+    """Exception thrown without calling the API once the daily quota of the
+     client is reached.
+    """
+
+    pass
+
+
+class GoogleGeocodingRequestDeniedError(GoogleGeocodingError):
+    """Exception thrown if the API denies the request, for instance because
+     of an invalid key.
+    """
+
+    pass
+
+
+# Statuses of the answers of the API which are failures of the API itself
+FAILURE_STATUSES = {
+    "OVER_QUERY_LIMIT": GoogleGeocodingOverQueryLimitError,
+    "OVER_DAILY_LIMIT": GoogleGeocodingOverQueryLimitError,
+    "REQUEST_DENIED": GoogleGeocodingRequestDeniedError,
+    "UNKNOWN_ERROR": GoogleGeocodingError,
+}
+
+
+class GoogleGeocodingClient(Geocoder):
     """Represents a client interface for researching
      on the Google Geocoding API.
     """
 
-    def __init__(self):
-        self._url = "https://maps.googleapis.com/maps/api/geocode/json"
+    def __init__(
+        self,
+        cache=None,
+        negative_ttl=None,
+        circuit_breaker=None,
+        rate_limiter=None,
+        max_wait=None,
+        quota=None,
+        connect_timeout=None,
+        read_timeout=None,
+    ):
+        """Initializes a new client, the results being stored in the optional
+         cache. The addresses not found are cached too, during negative_ttl
+         seconds if given, the default time to live of the cache otherwise.
+         The calls go through the geocoding circuit breaker unless another
+         one is given, and wait for the optional rate_limiter, a TokenBucket,
+         at most max_wait seconds if given. They are counted in the optional
+         quota, a DailyQuota. The connect_timeout and read_timeout of the
+         requests are the ones of grandpy.apis.session by default.
+        """
+        self._url = GEOCODING_URL
         self._key = os.getenv("GOOGLE_MAPS_GEOCODING_KEY")
+        self.cache = cache
+        self.negative_ttl = negative_ttl
+        self.circuit_breaker = circuit_breaker or breaker.geocoding
+        self.rate_limiter = rate_limiter
+        self.max_wait = max_wait
+        self.quota = quota
+        self.timeout = (connect_timeout, read_timeout)
 
     def search(self, address):
         """Looks up an address on the Google Maps Geocoding API."""
+        result = self._cached_result(address)
+        if result is None:
+            self._check_deadline()
+            # Throttled before the breaker, so that a rejected call does not
+            # take the trial call of a half open breaker
+            delay = self._throttle()
+            self._check_circuit()
+            if delay:
+                time.sleep(delay)
+            try:
+                response = session.get(
+                    url=self._url,
+                    params={"address": address, "key": self._key},
+                    timeout=self.timeout,
+                )
+                # We check that the status is not different from 200
+                response.raise_for_status()
+            except session.DeadlineExceeded:
+                self._deadline_exceeded()
+            except requests.Timeout:
+                self._timed_out()
+            except (requests.HTTPError, requests.ConnectionError):
+                self._failed()
+            data = fastjson.response_json(response)
+            result = self._store_result(address, data)
+        return result
+
+    async def search_async(self, address):
+        """Same as search, without blocking the event loop."""
+        result = self._cached_result(address)
+        if result is None:
+            self._check_deadline()
+            # Throttled before the breaker, so that a rejected call does not
+            # take the trial call of a half open breaker
+            delay = self._throttle()
+            self._check_circuit()
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                response = await session.async_get(
+                    self._url,
+                    params={"address": address, "key": self._key},
+                    timeout=self.timeout,
+                )
+            except session.DeadlineExceeded:
+                self._deadline_exceeded()
+            except requests.Timeout:
+                self._timed_out()
+            except (requests.HTTPError, requests.ConnectionError):
+                self._failed()
+            data = fastjson.response_json(response)
+            result = self._store_result(address, data)
+        return result
+
+    def _check_deadline(self):
+        """Fails fast once the deadline is exceeded."""
+        if session.remaining() is not None and session.remaining() <= 0:
+            self._deadline_exceeded()
+
+    def _check_circuit(self):
+        """Fails fast while the circuit breaker rejects the calls."""
+        if not self.circuit_breaker.allow():
+            raise GoogleGeocodingUnavailableError(
+                "The google geocoding API is failing, it is not called."
+            )
+
+    def _throttle(self):
+        """Reserves a call in the rate limiter and the quota and returns the
+         seconds to wait before making it. Fails fast if the wait would be
+         longer than max_wait or than the time left before the deadline.
+        """
+        if self.rate_limiter is not None:
+            max_wait = self.max_wait
+            remaining = session.remaining()
+            if remaining is not None:
+                max_wait = remaining if max_wait is None else min(
+                    max_wait, remaining
+                )
+            delay = self.rate_limiter.reserve(max_wait)
+            if delay is None:
+                metrics.count_throttled("geocoding", "rejected")
+                raise GoogleGeocodingThrottledError(
+                    "Too many calls to the google geocoding API, "
+                    "it is not called."
+                )
+        else:
+            delay = 0
+        if self.quota is not None and not self.quota.consume():
+            metrics.count_throttled("geocoding", "quota_exceeded")
+            raise GoogleGeocodingQuotaExceededError(
+                "The daily quota of the google geocoding API is reached."
+            )
+        if delay:
+            metrics.count_throttled("geocoding", "delayed")
+        return delay
+
+    def _deadline_exceeded(self):
+        """Fails without recording a failure of the API, the time being
+         spent before the call.
+        """
+        raise GoogleGeocodingDeadlineExceededError(
+            "The deadline of the question is exceeded, "
+            "the google geocoding API is not called."
+        )
+
+    def _timed_out(self):
+        """Records the failure of a call which took too long."""
+        self.circuit_breaker.record_failure()
+        raise GoogleGeocodingError(
+            "The google geocoding API did not answer in time."
+        )
+
+    def _failed(self):
+        """Records the failure of a call."""
+        self.circuit_breaker.record_failure()
+        raise GoogleGeocodingError(
+            "An HTTP error occured in google geocoding API call."
+        )
+
+    def _cached_result(self, address):
+        """Checks the address and returns its cached result, None if the
+         address is not in the cache.
+        """
         if not address.strip():
             raise GoogleGeocodingError("address cannot be an empty string.")
-        try:
-            response = requests.get(
-                url=self._url, params={"address": address, "key": self._key}
+        if self.cache is None:
+            return None
+        # The addresses not found are cached as False
+        result = self.cache.get(address)
+        if result is False:
+            raise GoogleGeocodingNothingFoundError(
+                "No result found for the current address"
+            )
+        return result
+
+    def _store_result(self, address, data):
+        """Extracts the result from the data received and caches it, the
+         statuses of failure being recorded by the circuit breaker.
+        """
+        status = data["status"]
+        if status in FAILURE_STATUSES:
+            self.circuit_breaker.record_failure()
+            raise FAILURE_STATUSES[status](
+                f"The google geocoding API answered {status}: "
+                f"{data.get('error_message', '')}"
             )
-            # We check that the status is not different from 200
-            response.raise_for_status()
-        except (requests.HTTPError, requests.ConnectionError):
+        self.circuit_breaker.record_success()
+        if status == "INVALID_REQUEST":
             raise GoogleGeocodingError(
-                "An HTTP error occured in google geocoding API call."
+                f"The request is invalid: {data.get('error_message', '')}"
             )
-        data = response.json()
         # We check that there are results
-        if data['status'] == 'ZERO_RESULTS':
+        if status == "ZERO_RESULTS":
+            if self.cache is not None:
+                self.cache.set(address, False, ttl=self.negative_ttl)
             raise GoogleGeocodingNothingFoundError(
                 "No result found for the current address"
             )
-        return {
+        result = {
             "address": data["results"][0]["formatted_address"],
             "latitude": data["results"][0]["geometry"]["location"]["lat"],
             "longitude": data["results"][0]["geometry"]["location"]["lng"],
         }
+        if self.cache is not None:
+            self.cache.set(address, result)
+        return result
@@ -0,0 +1,201 @@
+"""Module limiting the calls to an API on the client side, to stay within
+the quotas of the API: TokenBucket limits their rate, DailyQuota their
+number per day.
+
+Their state is kept in memory and shared by the threads of the process, or
+kept in a SQLite file given by path and shared by all the processes using
+it, for instance the workers of the web server.
+"""
+
+import asyncio
+import json
+import math
+import sqlite3
+import threading
+import time
+
+
+class MemoryState:
+    """State of the limiters of the process."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the value of key, None if it has none."""
+        with self._lock:
+            return self._values.get(key)
+
+    def update(self, key, function):
+        """Replaces atomically the value of key, None if it has none, by the
+         first item returned by function(value), and returns the second one.
+        """
+        with self._lock:
+            self._values[key], result = function(self._values.get(key))
+        return result
+
+
+class SQLiteState:
+    """State of the limiters shared by the processes through a SQLite file,
+     the values being serialized in json.
+    """
+
+    def __init__(self, path, timeout=10):
+        """Opens the state stored in the SQLite file path, waiting at most
+         timeout seconds for the other processes.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS limiters "
+                "(key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def get(self, key):
+        """Returns the value of key, None if it has none."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM limiters WHERE key = ?", (key,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def update(self, key, function):
+        """Same as MemoryState.update, the other processes waiting for the
+         end of the update.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT value FROM limiters WHERE key = ?", (key,)
+                ).fetchone()
+                value, result = function(
+                    None if row is None else json.loads(row[0])
+                )
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO limiters VALUES (?, ?)",
+                    (key, json.dumps(value)),
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+        return result
+
+
+def create_state(path=None):
+    """Returns the state stored in the SQLite file path, in memory if path
+     is None.
+    """
+    return MemoryState() if path is None else SQLiteState(path)
+
+
+class TokenBucket:
+    """Token bucket allowing rate calls per second on average, in bursts of
+     at most burst calls.
+
+    Each call reserves a token, the calls finding the bucket empty waiting
+    for their token in the order of their reservations.
+    """
+
+    def __init__(
+        self, rate, burst=None, path=None, name="default", clock=None
+    ):
+        """Initializes a full bucket, burst being rate rounded up by
+         default. With path, the bucket name of the SQLite file is shared
+         by the processes.
+        """
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+        self.rate = rate
+        self.burst = burst or math.ceil(rate)
+        self.key = f"bucket:{name}"
+        self._state = create_state(path)
+        # The monotonic clocks of the processes may differ
+        self._clock = clock or (time.monotonic if path is None else time.time)
+
+    def reserve(self, max_wait=None):
+        """Takes a token and returns the seconds to wait before using it.
+         Returns None without taking a token if the wait would be longer
+         than max_wait seconds.
+        """
+
+        def take(value):
+            # The time is read in the update, so that the updates are
+            # stored in the order of their times
+            now = self._clock()
+            tokens, updated = value or (self.burst, now)
+            tokens += max(0, now - updated) * self.rate
+            tokens = min(self.burst, tokens) - 1
+            delay = max(0, -tokens / self.rate)
+            # The clocks of the processes may be behind the one of the
+            # last update
+            updated = max(updated, now)
+            if max_wait is not None and delay > max_wait:
+                return [tokens + 1, updated], None
+            return [tokens, updated], delay
+
+        return self._state.update(self.key, take)
+
+    def acquire(self, max_wait=None):
+        """Waits until a call is allowed and returns True, or returns False
+         at once if the wait would be longer than max_wait seconds.
+        """
+        delay = self.reserve(max_wait)
+        if delay:
+            time.sleep(delay)
+        return delay is not None
+
+    async def acquire_async(self, max_wait=None):
+        """Same as acquire, without blocking the event loop."""
+        delay = self.reserve(max_wait)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay is not None
+
+
+class DailyQuota:
+    """Quota of calls per day, the days starting at midnight UTC."""
+
+    def __init__(self, limit, path=None, name="default", clock=time.time):
+        """Initializes the quota of limit calls per day. With path, the
+         quota name of the SQLite file is shared by the processes.
+        """
+        self.limit = limit
+        self.key = f"quota:{name}"
+        self._state = create_state(path)
+        self._clock = clock
+
+    def _today(self):
+        return time.strftime("%Y-%m-%d", time.gmtime(self._clock()))
+
+    def consume(self):
+        """Counts a call and returns True, or returns False without counting
+         it if the quota of the day is reached.
+        """
+
+        def count(value):
+            today = self._today()
+            day, used = value or (today, 0)
+            if day != today:
+                used = 0
+            if used >= self.limit:
+                return [today, used], False
+            return [today, used + 1], True
+
+        return self._state.update(self.key, count)
+
+    def used(self):
+        """Returns the number of calls counted today."""
+        value = self._state.get(self.key)
+        if value is None or value[0] != self._today():
+            return 0
+        return value[1]
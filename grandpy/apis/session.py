@@ -0,0 +1,319 @@
+"""Module sharing a pool of HTTP connections between the API clients.
+
+All the clients send their requests through get(), so that the connections
+to the APIs are kept alive and reused from one question to the next instead
+of paying a new TCP and TLS handshake for each call. Each thread has its own
+requests.Session, every session being mounted on the same adapter whose
+urllib3 pools are thread safe.
+
+The async clients send theirs through async_get(), each event loop having
+its own httpx.AsyncClient. httpx is required by the Pipfile but only
+imported by the async clients, which saves its import to the Flask
+application.
+
+Every request waits at most CONNECT_TIMEOUT seconds for the connection and
+READ_TIMEOUT seconds for the response, or the timeouts of its client, less
+when a deadline() is running: the requests sent in the block share its time
+budget, and fail with requests.Timeout once it is spent, or with
+DeadlineExceeded without being sent if it was spent before. Their retries
+share it too, each attempt being bounded by the time left and no retry being
+made once the deadline would be exceeded while waiting for it.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import threading
+import time
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ReadTimeoutError
+from urllib3.util.retry import Retry
+from urllib3.util.timeout import Timeout
+
+# httpx is imported by the first async client, the Flask application
+# starting faster without it
+httpx = None
+
+# Default settings, they can be changed with environment variables
+POOL_SIZE = int(os.getenv("GRANDPY_HTTP_POOL_SIZE", "10"))
+RETRIES = int(os.getenv("GRANDPY_HTTP_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("GRANDPY_HTTP_BACKOFF_FACTOR", "0.3"))
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CONNECT_TIMEOUT = float(os.getenv("GRANDPY_HTTP_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("GRANDPY_HTTP_READ_TIMEOUT", "5"))
+
+# Time, on the monotonic clock, at which the current deadline expires
+_deadline = contextvars.ContextVar("grandpy_deadline", default=None)
+
+_lock = threading.Lock()
+_local = threading.local()
+_adapter = None
+_generation = 0
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Exception raised instead of sending a request once the deadline is
+     exceeded, which is not a failure of the API.
+    """
+
+
+# Shortest timeout of an attempt, urllib3 rejecting the timeouts not positive
+MINIMUM_TIMEOUT = 0.001
+
+
+class DeadlineRetry(Retry):
+    """Retry of urllib3 giving up once the wait before the next attempt
+     reaches the current deadline.
+    """
+
+    def increment(self, method=None, url=None, *args, **kwargs):
+        retry = super().increment(method, url, *args, **kwargs)
+        left = remaining()
+        if left is not None and left <= retry.get_backoff_time():
+            raise MaxRetryError(
+                kwargs.get("_pool"),
+                url,
+                kwargs.get("error")
+                or requests.Timeout("The deadline of the question is near."),
+            )
+        return retry
+
+
+class DeadlineTimeout(Timeout):
+    """Timeout of urllib3 bounded by the time left before the current
+     deadline, computed again for each attempt of a request, urllib3
+     cloning the timeout at every attempt.
+    """
+
+    def clone(self):
+        left = remaining()
+        if left is None:
+            return super().clone()
+        left = max(left, MINIMUM_TIMEOUT)
+        return Timeout(
+            connect=min(self._connect, left), read=min(self._read, left)
+        )
+
+
+def create_adapter(
+    pool_size=POOL_SIZE,
+    retries=RETRIES,
+    backoff_factor=BACKOFF_FACTOR,
+    retry_statuses=RETRY_STATUSES,
+):
+    """Creates an adapter keeping pool_size connections alive per host.
+
+    Failed GET requests are retried up to retries times on connection errors
+    and on the retry_statuses, waiting longer each time according to
+    backoff_factor. The requests which timed out reading the response are not
+    retried, their time budget being spent already, and no retry is made past
+    the current deadline.
+    """
+    return HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=DeadlineRetry(
+            total=retries,
+            read=0,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses,
+            allowed_methods=frozenset({"GET"}),
+            # The last response is returned so that the clients handle
+            # it with raise_for_status()
+            raise_on_status=False,
+        ),
+    )
+
+
+def configure(**settings):
+    """Replaces the shared pool of connections by a new one created with
+     the settings accepted by create_adapter().
+    """
+    global _adapter, _generation
+    adapter = create_adapter(**settings)
+    with _lock:
+        previous, _adapter = _adapter, adapter
+        _generation += 1
+    if previous is not None:
+        previous.close()
+
+
+def get_adapter():
+    """Returns the shared adapter, created with the default settings on
+     first use.
+    """
+    global _adapter, _generation
+    if _adapter is None:
+        with _lock:
+            if _adapter is None:
+                _adapter = create_adapter()
+                _generation += 1
+    return _adapter
+
+
+def get_session():
+    """Returns the session of the current thread, mounted on the shared
+     adapter.
+    """
+    session = getattr(_local, "session", None)
+    if session is None or _local.generation != _generation:
+        # The generation is read first, a concurrent configure() only
+        # causing the session to be created once more on the next call.
+        generation = _generation
+        adapter = get_adapter()
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+        _local.generation = generation
+    return session
+
+
+@contextlib.contextmanager
+def deadline(seconds):
+    """Context manager limiting the time the requests sent in the block can
+     take together, a deadline running already being only shortened. The
+     deadline follows the block into the tasks and the threads started by
+     asyncio.
+    """
+    end = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        end = min(end, current)
+    token = _deadline.set(end)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Returns the seconds left before the current deadline, None if there
+     is no deadline.
+    """
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+def check_deadline():
+    """Raises DeadlineExceeded if the current deadline is exceeded."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("The deadline of the question is exceeded.")
+
+
+def timeouts(connect=None, read=None):
+    """Returns the connect and read timeouts of a request, connect and read
+     if given, CONNECT_TIMEOUT and READ_TIMEOUT otherwise, bounded by the
+     current deadline. Raises DeadlineExceeded if the deadline is exceeded.
+    """
+    connect = CONNECT_TIMEOUT if connect is None else connect
+    read = READ_TIMEOUT if read is None else read
+    check_deadline()
+    left = remaining()
+    if left is None:
+        return connect, read
+    return min(connect, left), min(read, left)
+
+
+def get(url, timeout=None, **kwargs):
+    """Sends a GET request through the shared pool of connections, timeout
+     being the optional connect and read timeouts of the client.
+    """
+    connect, read = timeouts(*(timeout or ()))
+    kwargs["timeout"] = DeadlineTimeout(connect=connect, read=read)
+    try:
+        return get_session().get(url, **kwargs)
+    except requests.ConnectionError as error:
+        # The read timeouts exhausting the retries are raised by requests
+        # as connection errors
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        if isinstance(reason, ReadTimeoutError):
+            raise requests.ReadTimeout(*error.args) from error
+        raise
+
+
+def stats():
+    """Returns the number of connections opened and of requests sent
+     through the connections currently pooled.
+    """
+    connections = requests_sent = 0
+    if _adapter is not None:
+        pools = _adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            connections += pool.num_connections
+            requests_sent += pool.num_requests
+    return {"connections": connections, "requests": requests_sent}
+
+
+def close():
+    """Closes all the pooled connections."""
+    global _adapter, _generation
+    with _lock:
+        previous, _adapter = _adapter, None
+        _generation += 1
+    if previous is not None:
+        previous.close()
+
+
+# httpx clients of the event loops
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """Returns the httpx client of the running event loop, created with the
+     default settings on first use.
+    """
+    global httpx
+    if httpx is None:
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError(
+                "The async clients require httpx, install it with "
+                "'pipenv install httpx'."
+            )
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=None, max_keepalive_connections=POOL_SIZE
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=RETRIES),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def async_get(url, timeout=None, **kwargs):
+    """Sends a GET request through the httpx client of the running event
+     loop, like get. The errors are raised as the requests.HTTPError,
+     requests.Timeout and requests.ConnectionError exceptions handled by the
+     clients.
+    """
+    client = get_async_client()
+    connect, read = timeouts(*(timeout or ()))
+    kwargs["timeout"] = httpx.Timeout(read, connect=connect)
+    try:
+        response = await client.get(url, **kwargs)
+        response.raise_for_status()
+    except httpx.HTTPStatusError as error:
+        raise requests.HTTPError(str(error))
+    except httpx.TimeoutException as error:
+        raise requests.Timeout(str(error))
+    except httpx.TransportError as error:
+        raise requests.ConnectionError(str(error))
+    return response
+
+
+async def async_close():
+    """Closes the httpx client of the running event loop."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,9 +1,17 @@
 """Module responsible for implementing an interface for the Wikipedia API."""
 
+import collections.abc
+import itertools
+import os
+
 import requests
 
+from grandpy import fastjson
+from grandpy.apis import breaker, session
+from grandpy.apis.backends import ArticleSource, ArticleSourceError
+
 
-class WikipediaError(Exception):
+class WikipediaError(ArticleSourceError):
     pass
 
 
@@ -15,20 +23,220 @@ class WikipediaInvalidGPSCoordinates(WikipediaError):
     pass
 
 
-class WikipediaClient:
+class WikipediaUnavailableError(WikipediaError):
+    """Exception raised without calling the API while its circuit breaker is
+     open.
+    """
+
+    pass
+
+
+class WikipediaDeadlineExceededError(WikipediaError):
+    """Exception raised without calling the API once the deadline of the
+     question is exceeded.
+    """
+
+    pass
+
+
+# Parameters asking the API for the data of the pages
+PAGE_PARAMS = {
+    "prop": "extracts|info",
+    "inprop": "url",
+    "exchars": 1200,
+    "explaintext": True,
+}
+
+# URL of the API for a language, which can be replaced by the one of a local
+# server
+WIKIPEDIA_URL = os.getenv(
+    "GRANDPY_WIKIPEDIA_URL", "https://{lang}.wikipedia.org/w/api.php"
+)
+
+# Maximum number of page ids accepted by the API in a single request
+PAGES_PER_REQUEST = 50
+
+# Number of places returned by a geosearch by default, the API accepting up
+# to 500
+GEOSEARCH_LIMIT = 10
+
+
+def article_size(article):
+    """Returns the size in bytes of the texts of a cached article, used to
+     bound the memory of the article cache.
+    """
+    return sum(
+        len(value.encode()) for value in article.values()
+        if isinstance(value, str)
+    )
+
+
+def revalidate(cache, key, revision):
+    """Removes the article of key from the cache if it was cached for
+     another revision than the current one.
+    """
+    if cache is None:
+        return
+    cached = cache.peek(key)
+    if cached is not None and cached["revision"] != revision:
+        cache.delete(key)
+
+
+def call_api(url, params, timeout=None):
+    """Calls the Wikipedia API and returns the decoded json response,
+     timeout being the optional connect and read timeouts of the client.
+    """
+    check_circuit()
+    try:
+        response = session.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+    except (
+        requests.HTTPError, requests.ConnectionError, requests.Timeout
+    ) as error:
+        raise api_error(error)
+    breaker.wikipedia.record_success()
+    return fastjson.response_json(response)
+
+
+async def call_api_async(url, params, timeout=None):
+    """Same as call_api, without blocking the event loop."""
+    check_circuit()
+    try:
+        response = await session.async_get(
+            url, params=params, timeout=timeout
+        )
+    except (
+        requests.HTTPError, requests.ConnectionError, requests.Timeout
+    ) as error:
+        raise api_error(error)
+    breaker.wikipedia.record_success()
+    return fastjson.response_json(response)
+
+
+def check_circuit():
+    """Fails fast once the deadline is exceeded, or while the circuit
+     breaker of the API rejects the calls.
+    """
+    if session.remaining() is not None and session.remaining() <= 0:
+        raise api_error(session.DeadlineExceeded())
+    if not breaker.wikipedia.allow():
+        raise WikipediaUnavailableError(
+            "The wikipedia API is failing, it is not called."
+        )
+
+
+def api_error(error):
+    """Records the failure of a call and returns the WikipediaError to raise
+     for the requests exception. The deadline exceeded before the call is
+     not a failure of the API.
+    """
+    if isinstance(error, session.DeadlineExceeded):
+        return WikipediaDeadlineExceededError(
+            "The deadline of the question is exceeded, "
+            "the wikipedia API is not called."
+        )
+    breaker.wikipedia.record_failure()
+    if isinstance(error, requests.Timeout):
+        return WikipediaError("The wikipedia API did not answer in time.")
+    if isinstance(error, requests.HTTPError):
+        return WikipediaError(
+            "A HTTP status difference from 200 was received."
+        )
+    return WikipediaError(
+        "A Connection error occured when contacting the wikipedia API."
+    )
+
+
+class WikipediaClient(ArticleSource):
     """Represents a client to search the API
      Wikipedia REST.
     """
 
-    def __init__(self, lang="fr"):
-        """Initializes a new client for the Wikipedia API."""
+    def __init__(
+        self,
+        lang="fr",
+        cache=None,
+        geosearch_cache=None,
+        connect_timeout=None,
+        read_timeout=None,
+    ):
+        """Initializes a new client for the Wikipedia API, cache being an
+         optional cache of the articles shared by the pages of the client and
+         geosearch_cache an optional SpatialCache of the searches. The
+         connect_timeout and read_timeout of the requests of the client and
+         its pages are the ones of grandpy.apis.session by default.
+        """
         self.lang = lang
         if lang not in ("fr", "en", "de"):
             raise ValueError("The lang arg must be in ('fr', 'en', 'de')")
-        self._url = f"https://{lang}.wikipedia.org/w/api.php"
+        self._url = WIKIPEDIA_URL.format(lang=lang)
+        self.cache = cache
+        self.geosearch_cache = geosearch_cache
+        self.timeout = (connect_timeout, read_timeout)
+
+    def geosearch(
+        self, latitude, longitude, with_data=False, limit=GEOSEARCH_LIMIT
+    ):
+        """Search wikipedia pages by GPS coordinates, returning at most limit
+         pages.
+
+        With with_data, the same request also downloads the title, url and
+        summary of the pages found, thanks to the geosearch generator. The
+        API only returns several extracts for the introductions of the pages,
+        so the summaries are then taken from the introductions.
+
+        The pages found in the geosearch cache are returned without their
+        data, which is then loaded on demand, from the article cache first.
+
+        The pages are returned in a PageList, which only builds them when
+        they are accessed.
+        """
+        params = self._geosearch_params(latitude, longitude, with_data, limit)
+        pages = self._cached_geosearch(latitude, longitude, limit)
+        if pages is not None:
+            return pages
+        # Wikipedia API call
+        data = call_api(self._url, params, self.timeout)
+        return self._geosearch_pages(
+            data, with_data, latitude, longitude, limit
+        )
+
+    async def geosearch_async(
+        self, latitude, longitude, with_data=False, limit=GEOSEARCH_LIMIT
+    ):
+        """Same as geosearch, without blocking the event loop."""
+        params = self._geosearch_params(latitude, longitude, with_data, limit)
+        pages = self._cached_geosearch(latitude, longitude, limit)
+        if pages is not None:
+            return pages
+        data = await call_api_async(self._url, params, self.timeout)
+        return self._geosearch_pages(
+            data, with_data, latitude, longitude, limit
+        )
 
-    def geosearch(self, latitude, longitude):
-        """Search wikipedia pages by GPS coordinates."""
+    def _cached_geosearch(self, latitude, longitude, limit=GEOSEARCH_LIMIT):
+        """Returns the pages cached for the position, None if there are none.
+        """
+        if self.geosearch_cache is None:
+            return None
+        places = self.geosearch_cache.get(
+            latitude, longitude, prefix=f"{self.lang}:{limit}:"
+        )
+        if places is None:
+            return None
+        if not places:
+            raise WikipediaNothingFound("No data has been found.")
+        return PageList(
+            [place["pageid"] for place in places],
+            self.lang,
+            self.cache,
+            timeout=self.timeout,
+        )
+
+    def _geosearch_params(
+        self, latitude, longitude, with_data, limit=GEOSEARCH_LIMIT
+    ):
+        """Checks the coordinates and returns the parameters of a search."""
         # Validating arguments
         if abs(latitude) > 90:
             raise WikipediaInvalidGPSCoordinates(
@@ -38,37 +246,239 @@ class WikipediaClient:
             raise WikipediaInvalidGPSCoordinates(
                 "Longitude must stay between -180 and 180."
             )
-        # Wikipedia API call
-        try:
-            response = requests.get(
-                self._url,
-                params={
-                    "format": "json",
-                    "action": "query",
-                    "list": "geosearch",
-                    "gsradius": 10000,
-                    "gscoord": f"{latitude}|{longitude}",
-                },
-            )
-            response.raise_for_status()
-        except requests.HTTPError:
-            raise WikipediaError(
-                "A HTTP status difference from 200 was received."
+        params = {
+            "format": "json",
+            "action": "query",
+            "list": "geosearch",
+            "gsradius": 10000,
+            "gscoord": f"{latitude}|{longitude}",
+            "gslimit": limit,
+        }
+        if with_data:
+            # The list gives the order by distance, the generator the data
+            params.update(
+                PAGE_PARAMS,
+                generator="geosearch",
+                ggsradius=params["gsradius"],
+                ggscoord=params["gscoord"],
+                ggslimit=limit,
+                exintro=True,
+                exlimit="max",
             )
-        except requests.ConnectionError:
-            raise WikipediaError(
-                "A Connection error occured when contacting the wikipedia API."
+        return params
+
+    def _geosearch_pages(
+        self,
+        data,
+        with_data,
+        latitude=None,
+        longitude=None,
+        limit=GEOSEARCH_LIMIT,
+    ):
+        """Returns the PageList of the pages found in the data received,
+         caching them for the position searched.
+        """
+        places = data["query"]["geosearch"]
+        if self.geosearch_cache is not None and latitude is not None:
+            self.geosearch_cache.set(
+                latitude,
+                longitude,
+                [
+                    {key: place[key] for key in ("pageid", "lat", "lon")}
+                    for place in places
+                ],
+                prefix=f"{self.lang}:{limit}:",
             )
         # Processing of data received from Wikipedia API.
         # If the Wikipedia API did not find anything, the pages list is empty
-        data = response.json()
-        pages = [
-            WikipediaPage(page["pageid"], self.lang)
-            for page in data["query"]["geosearch"]
-        ]
-        if not pages:
+        if not places:
             raise WikipediaNothingFound("No data has been found.")
-        return pages
+        pages_data = None
+        if with_data:
+            pages_data = data["query"].get("pages", {})
+            # The articles cached for an older revision are dropped at once,
+            # whether their pages are ever built or not
+            for page_id, page_data in pages_data.items():
+                if "extract" not in page_data and "lastrevid" in page_data:
+                    revalidate(
+                        self.cache,
+                        f"{self.lang}:{page_id}",
+                        page_data["lastrevid"],
+                    )
+        return PageList(
+            [place["pageid"] for place in places],
+            self.lang,
+            self.cache,
+            pages_data,
+            self.timeout,
+        )
+
+    def load_pages(self, pages):
+        """Downloads the data of the pages not loaded yet, by batches of
+         PAGES_PER_REQUEST pages per request, and returns the pages found
+         in their original order. The pages which do not exist are marked as
+         missing.
+
+        Like geosearch with_data, the summaries are taken from the
+        introductions of the pages, the only extracts the API returns for
+        several pages at once. The API returning at most 20 extracts per
+        response, the remaining ones are fetched by following the
+        continuation of the query.
+        """
+        for batch in self._batches(pages):
+            params = self._pages_params(batch)
+            pages_data = {}
+            continuation = {}
+            while continuation is not None:
+                data = call_api(
+                    self._url, {**params, **continuation}, self.timeout
+                )
+                continuation = self._merge_pages_data(pages_data, data)
+            self._fill_pages(batch, pages_data)
+        return [page for page in pages if page.loaded]
+
+    async def load_pages_async(self, pages):
+        """Same as load_pages, without blocking the event loop."""
+        for batch in self._batches(pages):
+            params = self._pages_params(batch)
+            pages_data = {}
+            continuation = {}
+            while continuation is not None:
+                data = await call_api_async(
+                    self._url, {**params, **continuation}, self.timeout
+                )
+                continuation = self._merge_pages_data(pages_data, data)
+            self._fill_pages(batch, pages_data)
+        return [page for page in pages if page.loaded]
+
+    def _batches(self, pages):
+        """Yields the pages to load by batches of PAGES_PER_REQUEST, the
+         pages found in the article cache being loaded from it.
+        """
+        to_load = [
+            page
+            for page in pages
+            if not page.loaded and not page.missing and not page.load_cached()
+        ]
+        for start in range(0, len(to_load), PAGES_PER_REQUEST):
+            yield to_load[start:start + PAGES_PER_REQUEST]
+
+    def _pages_params(self, pages):
+        """Returns the parameters of a query of the data of the pages."""
+        return {
+            "format": "json",
+            "action": "query",
+            **PAGE_PARAMS,
+            "exintro": True,
+            "exlimit": "max",
+            "pageids": "|".join(str(page.id) for page in pages),
+        }
+
+    def _merge_pages_data(self, pages_data, data):
+        """Merges the data of the pages received into pages_data and returns
+         the parameters continuing the query, None if it is complete.
+        """
+        for page_id, page_data in data["query"]["pages"].items():
+            pages_data.setdefault(page_id, {}).update(page_data)
+        return data.get("continue")
+
+    def _fill_pages(self, pages, pages_data):
+        """Loads the pages with their data, marking the missing ones."""
+        for page in pages:
+            try:
+                page.load(pages_data.get(str(page.id), {"missing": ""}))
+            except WikipediaNothingFound:
+                pass
+
+    def first_available_page(self, pages, prefetch=3):
+        """Returns the first page of the list whose data is available.
+
+        When a page is not loaded yet, it is downloaded along with the next
+        prefetch - 1 pages not loaded, in a single request, so that falling
+        back on the following pages does not cost another round trip.
+        """
+        for index, page in enumerate(pages):
+            if not page.loaded and not page.missing:
+                self.load_pages(self._prefetched(pages, index, prefetch))
+            if page.loaded:
+                return page
+        raise WikipediaNothingFound("No data has been found.")
+
+    async def first_available_page_async(self, pages, prefetch=3):
+        """Same as first_available_page, without blocking the event loop."""
+        for index, page in enumerate(pages):
+            if not page.loaded and not page.missing:
+                await self.load_pages_async(
+                    self._prefetched(pages, index, prefetch)
+                )
+            if page.loaded:
+                return page
+        raise WikipediaNothingFound("No data has been found.")
+
+    def _prefetched(self, pages, index, prefetch):
+        """Returns the prefetch pages to load from index, the following pages
+         not being built.
+        """
+        return list(
+            itertools.islice(
+                (
+                    page
+                    for page in itertools.islice(pages, index, None)
+                    if not page.loaded and not page.missing
+                ),
+                prefetch,
+            )
+        )
+
+
+class PageList(collections.abc.Sequence):
+    """Pages found by a geosearch, the closest first. A page is only built,
+     and loaded with the data received for it, when it is accessed: the
+     bot usually reads the first one only.
+    """
+
+    __slots__ = (
+        "_page_ids", "_pages", "_lang", "_cache", "_pages_data", "_timeout"
+    )
+
+    def __init__(
+        self, page_ids, lang="fr", cache=None, pages_data=None, timeout=None
+    ):
+        """Initializes the list of the pages of page_ids, pages_data being
+         the optional data of the pages received with the geosearch, by page
+         id, and timeout the connect and read timeouts of the pages.
+        """
+        self._page_ids = page_ids
+        self._pages = [None] * len(page_ids)
+        self._lang = lang
+        self._cache = cache
+        self._pages_data = pages_data
+        self._timeout = timeout
+
+    def __len__(self):
+        return len(self._page_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        page = self._pages[index]
+        if page is None:
+            page = self._pages[index] = self._build(self._page_ids[index])
+        return page
+
+    def _build(self, page_id):
+        """Returns the page of page_id, loaded if its data was received."""
+        page = WikipediaPage(page_id, self._lang, self._cache, self._timeout)
+        if self._pages_data is not None:
+            page_data = self._pages_data.get(str(page_id), {})
+            if "extract" in page_data:
+                page.load(page_data)
+        return page
+
+    @property
+    def built(self):
+        """Number of pages built so far."""
+        return len(self._pages) - self._pages.count(None)
 
 
 class WikipediaPage:
@@ -76,47 +486,109 @@ class WikipediaPage:
      the title, the summary, the url.
     """
 
-    def __init__(self, page_id, lang="fr"):
-        """Initialize a new wikipedia page."""
+    # Many pages are built for the geosearches, without instance dictionary
+    __slots__ = (
+        "lang",
+        "_url",
+        "id",
+        "cache",
+        "_title",
+        "_summary",
+        "_fullurl",
+        "revision",
+        "missing",
+        "timeout",
+    )
+
+    def __init__(self, page_id, lang="fr", cache=None, timeout=None):
+        """Initialize a new wikipedia page, cache being an optional cache of
+         the articles looked up before calling the API, and timeout the
+         optional connect and read timeouts of its requests.
+        """
         self.lang = lang
         if lang not in ("fr", "en", "de"):
             raise ValueError("The lang arg must be in ('fr', 'en', 'de')")
-        self._url = f"https://{lang}.wikipedia.org/w/api.php"
+        self._url = WIKIPEDIA_URL.format(lang=lang)
         self.id = page_id
+        self.cache = cache
         self._title = None
         self._summary = None
         self._fullurl = None
+        self.revision = None
+        self.missing = False
+        self.timeout = timeout
+
+    @property
+    def cache_key(self):
+        """Key of the article in the cache, the page ids being only unique
+         within a Wikipedia edition.
+        """
+        return f"{self.lang}:{self.id}"
 
     def get_data(self):
-        """Downloads page data from wikipedia API."""
+        """Downloads page data from wikipedia API, unless the article is in
+         the cache.
+        """
+        if self.load_cached():
+            return
         # query parameters
         params = {
             "format": "json",
             "action": "query",
-            "prop": "extracts|info",
-            "inprop": "url",
-            "exchars": 1200,
-            "explaintext": True,
+            **PAGE_PARAMS,
             "pageids": self.id,
         }
-        try:
-            response = requests.get(self._url, params=params)
-            response.raise_for_status()
-        except requests.HTTPError:
-            raise WikipediaError(
-                "A HTTP status difference from 200 was received."
-            )
-        except requests.ConnectionError:
-            raise WikipediaError(
-                "A Connection error occured when contacting the wikipedia API."
-            )
         # Récupération des données reçues
-        data = response.json()
-        if "missing" in data["query"]["pages"][str(self.id)]:
+        data = call_api(self._url, params, self.timeout)
+        self.load(data["query"]["pages"][str(self.id)])
+
+    def load(self, page_data):
+        """Fills the page with the data of a page returned by the API."""
+        if "missing" in page_data:
+            self.missing = True
             raise WikipediaNothingFound("No data has been found.")
-        self._title = data["query"]["pages"][str(self.id)]["title"]
-        self._summary = data["query"]["pages"][str(self.id)]["extract"]
-        self._fullurl = data["query"]["pages"][str(self.id)]["fullurl"]
+        self._title = page_data["title"]
+        self._summary = page_data["extract"]
+        self._fullurl = page_data["fullurl"]
+        self.revision = page_data.get("lastrevid")
+        if self.cache is not None:
+            cached = self.cache.peek(self.cache_key)
+            if cached is None or cached["revision"] != self.revision:
+                self.cache.set(
+                    self.cache_key,
+                    {
+                        "title": self._title,
+                        "summary": self._summary,
+                        "url": self._fullurl,
+                        "revision": self.revision,
+                    },
+                )
+
+    def load_cached(self):
+        """Fills the page with the article cached, returns False if it is not
+         in the cache.
+        """
+        if self.cache is None:
+            return False
+        article = self.cache.get(self.cache_key)
+        if article is None:
+            return False
+        self._title = article["title"]
+        self._summary = article["summary"]
+        self._fullurl = article["url"]
+        self.revision = article["revision"]
+        return True
+
+    def revalidate(self, revision):
+        """Removes the article from the cache if it was cached for another
+         revision than the current one.
+        """
+        revalidate(self.cache, self.cache_key, revision)
+
+    @property
+    def loaded(self):
+        """True if the data of the page has been downloaded."""
+        return self._title is not None
 
     @property
     def title(self):
@@ -0,0 +1,137 @@
+"""Batch geocoding of a file of questions or addresses, one per line, used
+to pre-warm the geocoding cache and to validate a list of places.
+
+Each line is parsed like a question, then the place is geocoded by a pool
+of threads, at most rate calls per second reaching the API. The results are
+appended to a JSON Lines file, one object per line of the input giving:
+
+- "line": the number of the line in the input, from 1;
+- "question" and "query": the line and the address searched;
+- "found": false if the geocoder knows no place at the address, true with
+  the "address", "latitude" and "longitude" of the place otherwise.
+
+The output file is the checkpoint of the batch: the lines already written
+are skipped when the batch is run again, so that an interrupted batch
+resumes where it stopped. The lines whose geocoding failed, for instance on
+a timeout, are not written and are retried by the next run.
+"""
+
+import collections
+import concurrent.futures
+import json
+import os
+
+from grandpy import bot
+from grandpy.apis.backends import GeocodingError, PlaceNotFoundError
+from grandpy.apis.googlemaps import GoogleGeocodingClient
+from grandpy.apis.ratelimit import TokenBucket
+from grandpy.singleflight import SingleFlight
+
+
+def completed_lines(output_path):
+    """Returns the numbers of the lines written in the output file, which is
+     truncated after its last complete line, the one being written when
+     the batch was interrupted being lost.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "rb+") as output:
+        data = output.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            output.truncate(end)
+    return {json.loads(line)["line"] for line in data[:end].splitlines()}
+
+
+class BatchGeocoder:
+    """Geocodes the questions of a batch, each address once."""
+
+    def __init__(self, geocoder, parser):
+        """Initializes the batch, the questions being parsed by parser and
+         located by geocoder.
+        """
+        self.geocoder = geocoder
+        self.parser = parser
+        self._results = {}
+        self._in_flight = SingleFlight()
+
+    def geocode(self, number, question):
+        """Returns the result of the question of the line number, raising a
+         GeocodingError if the geocoder failed.
+        """
+        query = self.parser.parse(question)
+        result = self._results.get(query)
+        if result is None:
+            result = self._in_flight.do(query, lambda: self._search(query))
+            self._results[query] = result
+        return {
+            "line": number,
+            "question": question,
+            "query": query,
+            **result,
+        }
+
+    def _search(self, query):
+        try:
+            return {"found": True, **self.geocoder.search(query)}
+        except PlaceNotFoundError:
+            return {"found": False}
+
+
+def geocode_file(
+    questions_path,
+    output_path,
+    concurrency=8,
+    rate=10,
+    geocoder=None,
+    parser=None,
+):
+    """Geocodes the questions of a file into a JSON Lines file, resuming
+     the batch written in it, and returns the number of lines found, not
+     found, failed and skipped.
+
+    The geocoder is by default a Google geocoding client sharing the cache
+    and the daily quota of the bot, so that the batch pre-warms it, and
+    making at most rate calls per second. The questions are parsed by the
+    parser of the bot by default.
+    """
+    if geocoder is None:
+        geocoder = GoogleGeocodingClient(
+            cache=bot.get_google_client().cache,
+            negative_ttl=bot.get_google_client().negative_ttl,
+            rate_limiter=TokenBucket(rate),
+            quota=bot.get_google_client().quota,
+        )
+    batch = BatchGeocoder(geocoder, parser or bot.get_parser())
+    done = completed_lines(output_path)
+    counts = collections.Counter(found=0, not_found=0, failed=0, skipped=0)
+
+    with open(questions_path, encoding="utf-8") as questions, open(
+        output_path, "a", encoding="utf-8"
+    ) as output, concurrent.futures.ThreadPoolExecutor(concurrency) as pool:
+        pending = collections.deque()
+
+        def write_first():
+            try:
+                result = pending.popleft().result()
+            except GeocodingError:
+                counts["failed"] += 1
+                return
+            counts["found" if result["found"] else "not_found"] += 1
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+
+        for number, line in enumerate(questions, 1):
+            question = line.strip()
+            if not question:
+                continue
+            if number in done:
+                counts["skipped"] += 1
+                continue
+            # Only a few questions per thread are in flight
+            if len(pending) >= 2 * concurrency:
+                write_first()
+            pending.append(pool.submit(batch.geocode, number, question))
+        while pending:
+            write_first()
+    return dict(counts)
@@ -1,9 +1,22 @@
+import hashlib
+import logging
+import os
 import random
+import sqlite3
+import time
 
-from grandpy.parser import Parser
-from grandpy.apis.googlemaps import GoogleGeocodingClient, GoogleGeocodingError
-from grandpy.apis.wikipedia import WikipediaClient, WikipediaError
+from grandpy import fastjson, metrics
+from grandpy.cache import MemoryCache, SpatialCache, SQLiteCache
+from grandpy.gazetteer import Gazetteer
+from grandpy.parser import MultilingualParser
+from grandpy.singleflight import AsyncSingleFlight, SingleFlight
+from grandpy.apis import session
+from grandpy.apis.backends import BackendError
+from grandpy.apis.googlemaps import GoogleGeocodingClient
+from grandpy.apis.ratelimit import DailyQuota, TokenBucket
+from grandpy.apis.wikipedia import WikipediaClient, article_size
 
+logger = logging.getLogger(__name__)
 
 positive_answers = [
     "Bien sûr mon poussin ! Voici ce que tu cherches : ",
@@ -26,32 +39,721 @@ article_intros = [
 ]
 
 
+_parser = None
+
+
+def get_parser():
+    """Returns the parser shared by all the questions, its vocabularies
+     being loaded on first use. The languages of the questions are given by
+     the GRANDPY_LANGUAGES environment variable, "fr,en,de" by default, the
+     first one being the language of the questions whose language is not
+     recognized.
+    """
+    global _parser
+    if _parser is None:
+        languages = os.getenv("GRANDPY_LANGUAGES", "fr,en,de").split(",")
+        _parser = MultilingualParser(languages, default=languages[0])
+    return _parser
+
+
+_google_client = None
+
+
+def client_timeouts(api):
+    """Returns the connect and read timeouts of the client of the api, read
+     from the GRANDPY_<API>_CONNECT_TIMEOUT and GRANDPY_<API>_READ_TIMEOUT
+     environment variables, None for the ones of grandpy.apis.session.
+    """
+    return tuple(
+        float(value) if value else None
+        for value in (
+            os.getenv(f"GRANDPY_{api.upper()}_CONNECT_TIMEOUT"),
+            os.getenv(f"GRANDPY_{api.upper()}_READ_TIMEOUT"),
+        )
+    )
+
+
+def get_google_client():
+    """Returns the geocoding client shared by all the questions, its cache
+     being configured with environment variables:
+
+    - GRANDPY_GEOCODING_CACHE_SIZE: number of addresses kept in memory;
+    - GRANDPY_GEOCODING_CACHE_TTL: time to live of the results in seconds;
+    - GRANDPY_GEOCODING_CACHE_NEGATIVE_TTL: same for the addresses not found;
+    - GRANDPY_GEOCODING_CACHE_PATH: optional SQLite file persisting the cache.
+
+    and its calls to the API being limited with:
+
+    - GRANDPY_GEOCODING_RATE: calls per second on average, 0 for no limit;
+    - GRANDPY_GEOCODING_BURST: calls in a burst, the rate by default;
+    - GRANDPY_GEOCODING_MAX_WAIT: seconds a call waits for the rate limit
+      before failing;
+    - GRANDPY_GEOCODING_DAILY_QUOTA: calls per day, 0 for no limit;
+    - GRANDPY_GEOCODING_LIMITS_PATH: optional SQLite file sharing the limits
+      between the processes of the website;
+    - GRANDPY_GEOCODING_CONNECT_TIMEOUT, GRANDPY_GEOCODING_READ_TIMEOUT:
+      timeouts of its requests in seconds, see client_timeouts().
+    """
+    global _google_client
+    if _google_client is None:
+        ttl = float(os.getenv("GRANDPY_GEOCODING_CACHE_TTL", 7 * 24 * 3600))
+        path = os.getenv("GRANDPY_GEOCODING_CACHE_PATH")
+        backend = SQLiteCache(path, ttl, table="geocoding") if path else None
+        cache = MemoryCache(
+            maxsize=int(os.getenv("GRANDPY_GEOCODING_CACHE_SIZE", 4096)),
+            ttl=ttl,
+            backend=backend,
+        )
+        limits_path = os.getenv("GRANDPY_GEOCODING_LIMITS_PATH")
+        rate = float(os.getenv("GRANDPY_GEOCODING_RATE", 50))
+        burst = int(os.getenv("GRANDPY_GEOCODING_BURST", 0))
+        daily_quota = int(os.getenv("GRANDPY_GEOCODING_DAILY_QUOTA", 0))
+        connect_timeout, read_timeout = client_timeouts("geocoding")
+        _google_client = GoogleGeocodingClient(
+            cache=cache,
+            negative_ttl=float(
+                os.getenv("GRANDPY_GEOCODING_CACHE_NEGATIVE_TTL", 3600)
+            ),
+            rate_limiter=TokenBucket(
+                rate, burst, path=limits_path, name="geocoding"
+            )
+            if rate
+            else None,
+            max_wait=float(os.getenv("GRANDPY_GEOCODING_MAX_WAIT", 0.5)),
+            quota=DailyQuota(daily_quota, path=limits_path, name="geocoding")
+            if daily_quota
+            else None,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+    return _google_client
+
+
+def geocoding_cache_stats():
+    """Yields the counters of the geocoding cache for the metrics."""
+    for name, value in get_google_client().cache.stats().items():
+        yield (name,), value
+
+
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_geocoding_cache",
+        "Counters of the geocoding cache.",
+        labels=("stat",),
+        function=geocoding_cache_stats,
+    )
+)
+
+
+def geocoding_quota_stats():
+    """Yields the calls counted today and the daily quota for the metrics."""
+    quota = get_google_client().quota
+    if quota is not None:
+        yield ("used",), quota.used()
+        yield ("limit",), quota.limit
+
+
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_geocoding_quota",
+        "Calls to the geocoding API counted today and daily quota.",
+        labels=("stat",),
+        function=geocoding_quota_stats,
+    )
+)
+
+
+_gazetteer = None
+_gazetteer_error_path = None
+
+
+def get_gazetteer():
+    """Returns the offline gazetteer stored in the SQLite file given by the
+     GRANDPY_GAZETTEER_PATH environment variable, None if it is not set.
+     A gazetteer which cannot be opened is logged once and replaced by the
+     geocoder.
+    """
+    global _gazetteer, _gazetteer_error_path
+    path = os.getenv("GRANDPY_GAZETTEER_PATH")
+    if _gazetteer is None and path and path != _gazetteer_error_path:
+        try:
+            _gazetteer = Gazetteer(path)
+        except sqlite3.Error as error:
+            _gazetteer_error_path = path
+            logger.error(
+                "The gazetteer %s cannot be opened, the places are "
+                "geocoded: %s",
+                path,
+                error,
+            )
+    return _gazetteer
+
+
+def gazetteer_stats():
+    """Yields the counters of the gazetteer for the metrics."""
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        for name, value in gazetteer.stats().items():
+            yield (name,), value
+
+
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_gazetteer",
+        "Questions answered by the offline gazetteer or not.",
+        labels=("stat",),
+        function=gazetteer_stats,
+    )
+)
+
+
+_wikipedia_caches = None
+_wikipedia_clients = {}
+
+
+def get_wikipedia_client(lang="fr"):
+    """Returns the client of the Wikipedia edition of lang shared by all the
+     questions, the clients of the editions sharing their caches. The caches
+     are configured with environment variables:
+
+    - GRANDPY_ARTICLE_CACHE_BYTES: size of the texts kept in memory;
+    - GRANDPY_ARTICLE_CACHE_TTL: time to live of the articles in seconds;
+    - GRANDPY_ARTICLE_CACHE_PATH: optional SQLite file persisting the cache;
+    - GRANDPY_GEOSEARCH_CACHE_SIZE: number of geohash cells kept in memory;
+    - GRANDPY_GEOSEARCH_CACHE_TTL: time to live of the searches in seconds;
+    - GRANDPY_GEOSEARCH_CACHE_PRECISION: length of the geohashes of the
+      cells, 0 disabling the cache.
+
+    The timeouts of their requests are read from
+    GRANDPY_WIKIPEDIA_CONNECT_TIMEOUT and GRANDPY_WIKIPEDIA_READ_TIMEOUT.
+    """
+    global _wikipedia_caches
+    client = _wikipedia_clients.get(lang)
+    if client is None:
+        if _wikipedia_caches is None:
+            _wikipedia_caches = create_wikipedia_caches()
+        client = _wikipedia_clients.setdefault(
+            lang,
+            WikipediaClient(
+                lang,
+                *_wikipedia_caches,
+                *client_timeouts("wikipedia"),
+            ),
+        )
+    return client
+
+
+def create_wikipedia_caches():
+    """Returns the article cache and the geosearch cache of the Wikipedia
+     clients.
+    """
+    ttl = float(os.getenv("GRANDPY_ARTICLE_CACHE_TTL", 24 * 3600))
+    path = os.getenv("GRANDPY_ARTICLE_CACHE_PATH")
+    backend = SQLiteCache(path, ttl, table="articles") if path else None
+    cache = MemoryCache(
+        maxsize=float("inf"),
+        ttl=ttl,
+        backend=backend,
+        maxbytes=int(
+            os.getenv("GRANDPY_ARTICLE_CACHE_BYTES", 16 * 1024 * 1024)
+        ),
+        sizeof=article_size,
+    )
+    precision = int(os.getenv("GRANDPY_GEOSEARCH_CACHE_PRECISION", 6))
+    geosearch_cache = None
+    if precision:
+        geosearch_cache = SpatialCache(
+            MemoryCache(
+                maxsize=int(os.getenv("GRANDPY_GEOSEARCH_CACHE_SIZE", 4096)),
+                ttl=float(
+                    os.getenv("GRANDPY_GEOSEARCH_CACHE_TTL", 24 * 3600)
+                ),
+            ),
+            precision,
+        )
+    return cache, geosearch_cache
+
+
+def article_cache_stats():
+    """Yields the counters of the article cache for the metrics."""
+    for name, value in get_wikipedia_client().cache.stats().items():
+        yield (name,), value
+
+
+def geosearch_cache_stats():
+    """Yields the counters of the geosearch cache for the metrics."""
+    geosearch_cache = get_wikipedia_client().geosearch_cache
+    if geosearch_cache is not None:
+        for name, value in geosearch_cache.stats().items():
+            yield (name,), value
+
+
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_article_cache",
+        "Counters of the Wikipedia article cache.",
+        labels=("stat",),
+        function=article_cache_stats,
+    )
+)
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_geosearch_cache",
+        "Counters of the geosearch cache by geohash cell.",
+        labels=("stat",),
+        function=geosearch_cache_stats,
+    )
+)
+
+
+_geocoder = None
+_article_source = None
+
+
+def use_backends(geocoder=None, article_source=None):
+    """Replaces the Google geocoding and Wikipedia clients used to answer
+     the questions by other implementations of the Geocoder and
+     ArticleSource interfaces of grandpy.apis.backends, None restoring the
+     default client. The answers cached are forgotten.
+    """
+    global _geocoder, _article_source
+    _geocoder = geocoder
+    _article_source = article_source
+    get_answer_cache().clear()
+
+
+def get_geocoder():
+    """Returns the geocoder locating the places of the questions."""
+    return _geocoder or get_google_client()
+
+
+def get_article_source(lang="fr"):
+    """Returns the source of the articles about the places, in the language
+     lang for the Wikipedia clients.
+    """
+    return _article_source or get_wikipedia_client(lang)
+
+
+# Time in seconds the API calls answering a question can take together
+ANSWER_DEADLINE = float(os.getenv("GRANDPY_ANSWER_DEADLINE", 2))
+
+# Time in seconds a question waits for the identical question in flight, at
+# most the time left before its deadline
+COALESCING_TIMEOUT = float(os.getenv("GRANDPY_COALESCING_TIMEOUT", 10))
+
+_in_flight = SingleFlight()
+_in_flight_async = AsyncSingleFlight()
+
+
+def coalescing_stats():
+    """Yields the counters of the questions coalesced for the metrics."""
+    for in_flight in (_in_flight, _in_flight_async):
+        for name, value in in_flight.stats().items():
+            yield (name,), value
+
+
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_coalesced_questions",
+        "Questions sharing the answer of the identical question in flight.",
+        labels=("stat",),
+        function=coalescing_stats,
+    )
+)
+
+
+_answer_cache = None
+
+
+def get_answer_cache():
+    """Returns the cache of the answers serialized, by question parsed,
+     configured with environment variables:
+
+    - GRANDPY_ANSWER_CACHE_BYTES: size of the answers kept in memory;
+    - GRANDPY_ANSWER_CACHE_TTL: time to live of the answers in seconds.
+    """
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = MemoryCache(
+            maxsize=float("inf"),
+            ttl=float(os.getenv("GRANDPY_ANSWER_CACHE_TTL", 3600)),
+            maxbytes=int(
+                os.getenv("GRANDPY_ANSWER_CACHE_BYTES", 4 * 1024 * 1024)
+            ),
+            sizeof=lambda entry: len(entry[0]),
+        )
+    return _answer_cache
+
+
+def answer_cache_stats():
+    """Yields the counters of the answer cache for the metrics."""
+    for name, value in get_answer_cache().stats().items():
+        yield (name,), value
+
+
+metrics.registry.register(
+    metrics.Gauge(
+        "grandpy_answer_cache",
+        "Counters of the cache of the answers serialized.",
+        labels=("stat",),
+        function=answer_cache_stats,
+    )
+)
+
+
 def answer(question):
-    """Réponds à la question passé en argument sur un mode conversationnel."""
-    parser = Parser()
-    google_client = GoogleGeocodingClient()
-    wikipedia_client = WikipediaClient()
-
-    # Using the parser and API clients
-    try:
-        cleaned_question = parser.parse(question)
-        geo_info = google_client.search(cleaned_question)
-        pages = wikipedia_client.geosearch(
-            latitude=geo_info["latitude"], longitude=geo_info["longitude"]
-        )
-    except (GoogleGeocodingError, WikipediaError):
-        return {
-            "found": False,
-            "question": question.strip(),
-            "answer": random.choice(negative_answers),
-        }
-
-    # Preparing the response
+    """Réponds à la question passé en argument sur un mode conversationnel.
+
+    The article is searched in the Wikipedia edition of the language of the
+    question. The questions parsed identically while one of them is being
+    answered share the place and the article found for it. The API calls
+    share a deadline of ANSWER_DEADLINE seconds.
+    """
+    parser = get_parser()
+
+    # Using the parser and the backends
+    try:
+        with metrics.timer("parse"):
+            language, cleaned_question = parser.parse_with_language(question)
+        with session.deadline(ANSWER_DEADLINE):
+            geo_info, page = _in_flight.do(
+                (language, cleaned_question),
+                lambda: locate(cleaned_question, language),
+                min(COALESCING_TIMEOUT, session.remaining()),
+            )
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        return negative_answer(question)
+
+    return positive_answer(question, geo_info, page)
+
+
+async def answer_async(question):
+    """Same as answer, the API calls not blocking the event loop."""
+    parser = get_parser()
+
+    try:
+        with metrics.timer("parse"):
+            language, cleaned_question = parser.parse_with_language(question)
+        with session.deadline(ANSWER_DEADLINE):
+            geo_info, page = await _in_flight_async.do(
+                (language, cleaned_question),
+                lambda: locate_async(cleaned_question, language),
+                min(COALESCING_TIMEOUT, session.remaining()),
+            )
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        return negative_answer(question)
+
+    return positive_answer(question, geo_info, page)
+
+
+def answer_json(question):
+    """Same as answer, returning the response serialized in JSON and the
+     ETag of the place and article it gives, None for a negative answer.
+
+    The place and the article found for a question parsed are cached once
+    serialized, so that the repeated questions only serialize the question
+    and the phrases of GrandPy, picked at random for each response.
+    """
+    try:
+        with metrics.timer("parse"):
+            language, cleaned_question = (
+                get_parser().parse_with_language(question)
+            )
+        key = (language, cleaned_question)
+        cached = get_answer_cache().get(key)
+        if cached is None:
+            with session.deadline(ANSWER_DEADLINE):
+                geo_info, page = _in_flight.do(
+                    key,
+                    lambda: locate(cleaned_question, language),
+                    min(COALESCING_TIMEOUT, session.remaining()),
+                )
+            cached = cache_answer(key, geo_info, page)
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        return dumps(negative_answer(question)), None
+    return render_answer(question, cached)
+
+
+async def answer_json_async(question):
+    """Same as answer_json, the API calls not blocking the event loop."""
+    try:
+        with metrics.timer("parse"):
+            language, cleaned_question = (
+                get_parser().parse_with_language(question)
+            )
+        key = (language, cleaned_question)
+        cached = get_answer_cache().get(key)
+        if cached is None:
+            with session.deadline(ANSWER_DEADLINE):
+                geo_info, page = await _in_flight_async.do(
+                    key,
+                    lambda: locate_async(cleaned_question, language),
+                    min(COALESCING_TIMEOUT, session.remaining()),
+                )
+            cached = cache_answer(key, geo_info, page)
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        return dumps(negative_answer(question)), None
+    return render_answer(question, cached)
+
+
+def dumps(data):
+    """Serializes data in compact JSON."""
+    return fastjson.dumps(data)
+
+
+# Phrases of GrandPy serialized once
+_positive_answers_json = [dumps(phrase) for phrase in positive_answers]
+_article_intros_json = [dumps(phrase) for phrase in article_intros]
+
+
+def cache_answer(key, geo_info, page):
+    """Caches the place and the article found for the question parsed, by
+     language and question parsed, serialized without the enclosing braces,
+     along with their ETag, and returns them.
+    """
+    fragment = dumps({**geo_info, **page.as_dict()})[1:-1]
+    etag = hashlib.blake2b(fragment, digest_size=16).hexdigest()
+    get_answer_cache().set(key, (fragment, etag))
+    return fragment, etag
+
+
+def render_answer(question, cached):
+    """Returns the JSON response and the ETag of a positive answer, from
+     the place and article cached for the question.
+    """
+    metrics.count_answer(True)
+    fragment, etag = cached
+    body = b'{"found":true,"question":%s,"answer":%s,"intro":%s,%s}' % (
+        dumps(question.strip()),
+        random.choice(_positive_answers_json),
+        random.choice(_article_intros_json),
+        fragment,
+    )
+    return body, etag
+
+
+def locate(cleaned_question, lang="fr"):
+    """Returns the place of the question parsed and the first article
+     available about its surroundings, in the language lang.
+    """
+    geo_info = locate_place(cleaned_question)
+    return geo_info, find_article(geo_info, lang)
+
+
+async def locate_async(cleaned_question, lang="fr"):
+    """Same as locate, the API calls not blocking the event loop."""
+    geo_info = await locate_place_async(cleaned_question)
+    return geo_info, await find_article_async(geo_info, lang)
+
+
+def locate_place(cleaned_question):
+    """Returns the address, latitude and longitude of the question parsed."""
+    gazetteer = get_gazetteer()
+    with metrics.timer("geocode"):
+        geo_info = (
+            gazetteer.search(cleaned_question)
+            if gazetteer is not None
+            else None
+        )
+        if geo_info is None:
+            geo_info = get_geocoder().search(cleaned_question)
+    return geo_info
+
+
+async def locate_place_async(cleaned_question):
+    """Same as locate_place, the API calls not blocking the event loop."""
+    gazetteer = get_gazetteer()
+    with metrics.timer("geocode"):
+        geo_info = (
+            gazetteer.search(cleaned_question)
+            if gazetteer is not None
+            else None
+        )
+        if geo_info is None:
+            geo_info = await get_geocoder().search_async(cleaned_question)
+    return geo_info
+
+
+def find_article(geo_info, lang="fr"):
+    """Returns the first article available about the surroundings of the
+     place, in the language lang.
+    """
+    article_source = get_article_source(lang)
+    with metrics.timer("geosearch"):
+        pages = article_source.geosearch(
+            latitude=geo_info["latitude"],
+            longitude=geo_info["longitude"],
+            with_data=True,
+        )
+    with metrics.timer("page"):
+        return article_source.first_available_page(pages)
+
+
+async def find_article_async(geo_info, lang="fr"):
+    """Same as find_article, the API calls not blocking the event loop."""
+    article_source = get_article_source(lang)
+    with metrics.timer("geosearch"):
+        pages = await article_source.geosearch_async(
+            latitude=geo_info["latitude"],
+            longitude=geo_info["longitude"],
+            with_data=True,
+        )
+    with metrics.timer("page"):
+        return await article_source.first_available_page_async(pages)
+
+
+def answer_stream(question):
+    """Same as answer, the response being given in parts as soon as they
+     are known: a "place" part with the address and the position, then an
+     "article" part with the article about the surroundings, which is not
+     found when the article source fails without the place being lost.
+
+    The parts are dictionaries whose "part" key gives the name. When the
+    place is not found, the "place" part is a negative answer and is the
+    only one. Like answer, the API calls giving both parts share a deadline
+    of ANSWER_DEADLINE seconds. Like answer_json, the parts of the questions
+    whose place and article are in the answer cache are given from it, and
+    the others cached.
+    """
+    try:
+        with metrics.timer("parse"):
+            language, cleaned_question = (
+                get_parser().parse_with_language(question)
+            )
+        key = (language, cleaned_question)
+        cached = get_answer_cache().get(key)
+        if cached is None:
+            end = time.monotonic() + ANSWER_DEADLINE
+            with session.deadline(ANSWER_DEADLINE):
+                geo_info = _in_flight.do(
+                    ("place", cleaned_question),
+                    lambda: locate_place(cleaned_question),
+                    min(COALESCING_TIMEOUT, session.remaining()),
+                )
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        yield {"part": "place", **negative_answer(question)}
+        return
+    if cached is not None:
+        yield from cached_parts(question, cached)
+        return
+    yield {"part": "place", **place_answer(question, geo_info)}
+
+    try:
+        # The article gets the time left by the place, the deadline not
+        # being kept open while the place part is consumed
+        with session.deadline(end - time.monotonic()):
+            page = _in_flight.do(
+                ("article", language, cleaned_question),
+                lambda: find_article(geo_info, language),
+                min(COALESCING_TIMEOUT, session.remaining()),
+            )
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        yield {"part": "article", "found": False}
+        return
+    cache_answer(key, geo_info, page)
+    yield {"part": "article", **article_answer(page.as_dict())}
+
+
+async def answer_stream_async(question):
+    """Same as answer_stream, the API calls not blocking the event loop."""
+    try:
+        with metrics.timer("parse"):
+            language, cleaned_question = (
+                get_parser().parse_with_language(question)
+            )
+        key = (language, cleaned_question)
+        cached = get_answer_cache().get(key)
+        if cached is None:
+            end = time.monotonic() + ANSWER_DEADLINE
+            with session.deadline(ANSWER_DEADLINE):
+                geo_info = await _in_flight_async.do(
+                    ("place", cleaned_question),
+                    lambda: locate_place_async(cleaned_question),
+                    min(COALESCING_TIMEOUT, session.remaining()),
+                )
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        yield {"part": "place", **negative_answer(question)}
+        return
+    if cached is not None:
+        for part in cached_parts(question, cached):
+            yield part
+        return
+    yield {"part": "place", **place_answer(question, geo_info)}
+
+    try:
+        # The article gets the time left by the place, the deadline not
+        # being kept open while the place part is consumed
+        with session.deadline(end - time.monotonic()):
+            page = await _in_flight_async.do(
+                ("article", language, cleaned_question),
+                lambda: find_article_async(geo_info, language),
+                min(COALESCING_TIMEOUT, session.remaining()),
+            )
+    except (BackendError, TimeoutError) as error:
+        metrics.count_error(error)
+        yield {"part": "article", "found": False}
+        return
+    cache_answer(key, geo_info, page)
+    yield {"part": "article", **article_answer(page.as_dict())}
+
+
+# Fields of the places found by the geocoders, the other fields of the
+# answers cached being the ones of the articles
+PLACE_FIELDS = ("address", "latitude", "longitude")
+
+
+def cached_parts(question, cached):
+    """Yields the parts of the answer streamed from the place and article
+     cached for the question.
+    """
+    article = fastjson.loads(b"{%s}" % cached[0])
+    geo_info = {name: article.pop(name) for name in PLACE_FIELDS}
+    yield {"part": "place", **place_answer(question, geo_info)}
+    yield {"part": "article", **article_answer(article)}
+
+
+def negative_answer(question):
+    """Prepares the response given when no place has been found."""
+    metrics.count_answer(False)
+    return {
+        "found": False,
+        "question": question.strip(),
+        "answer": random.choice(negative_answers),
+    }
+
+
+def positive_answer(question, geo_info, page):
+    """Prepares the response giving the place found and its article."""
+    return {
+        **place_answer(question, geo_info),
+        **article_answer(page.as_dict()),
+    }
+
+
+def place_answer(question, geo_info):
+    """Prepares the part of the response giving the place found."""
+    metrics.count_answer(True)
     return {
         "found": True,
         "question": question.strip(),
         "answer": random.choice(positive_answers),
-        "intro": random.choice(article_intros),
         **geo_info,
-        **pages[0].as_dict(),
+    }
+
+
+def article_answer(article):
+    """Prepares the part of the response giving the article found, with
+     the title, url and summary of the page.
+    """
+    return {
+        "found": True,
+        "intro": random.choice(article_intros),
+        **article,
     }
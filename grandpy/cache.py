@@ -0,0 +1,332 @@
+"""Module defining the caches used to avoid calling the APIs again for the
+questions already answered.
+
+MemoryCache is an in-process LRU cache whose entries expire after a time to
+live. It can be backed by a SQLiteCache, a persistent store which survives
+restarts, the entries missing in memory being looked up there.
+
+SpatialCache serves the results of a search around a position to the
+searches around the positions of the same geohash cell.
+"""
+
+import collections
+import json
+import math
+import sqlite3
+import threading
+import time
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Mean radius of the Earth in meters
+EARTH_RADIUS = 6371008.8
+
+
+class MemoryCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(
+        self,
+        maxsize=1024,
+        ttl=None,
+        backend=None,
+        clock=time.time,
+        maxbytes=None,
+        sizeof=None,
+    ):
+        """Initializes an empty cache holding at most maxsize entries, ttl
+         being the default time to live of the entries (None for no
+         expiration) and backend an optional persistent cache.
+
+        With maxbytes, the least recently used entries are also evicted
+        when the sum of the sizes of the values, given by the sizeof
+        function, exceeds maxbytes.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries = collections.OrderedDict()
+        self._sizes = {}
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Returns the value cached for key, or default if there is none."""
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Returns the (value, expiration time) pair cached for key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        if self.backend is not None:
+            entry = self.backend.get_entry(key)
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                    self._store(key, entry)
+                return entry
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def peek(self, key, default=None):
+        """Returns the value kept in memory for key, or default, without
+         counting a hit or a miss nor refreshing the entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry):
+                return default
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """Caches value for key during ttl seconds, the default time to live
+         of the cache if ttl is None.
+        """
+        self.set_entry(key, (value, self._expiration(ttl)))
+
+    def set_entry(self, key, entry):
+        """Caches the (value, expiration time) pair for key."""
+        with self._lock:
+            self._store(key, entry)
+        if self.backend is not None:
+            self.backend.set_entry(key, entry)
+
+    def delete(self, key):
+        """Removes the entry of key from the cache."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.backend is not None:
+            self.backend.delete(key)
+
+    def clear(self):
+        """Removes all the entries of the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.bytes = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        """Returns the counters of the cache."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expiration(self, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        return None if ttl is None else self._clock() + ttl
+
+    def _expired(self, entry):
+        return entry[1] is not None and entry[1] <= self._clock()
+
+    def _store(self, key, entry):
+        # The lock must be held by the caller
+        if self._sizeof is not None:
+            size = self._sizeof(entry[0])
+            self.bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize or (
+            self.maxbytes is not None
+            and self.bytes > self.maxbytes
+            and len(self._entries) > 1
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        # The lock must be held by the caller
+        del self._entries[key]
+        self.bytes -= self._sizes.pop(key, 0)
+
+
+class SQLiteCache:
+    """Persistent cache stored in a SQLite file, the values being serialized
+     in json.
+    """
+
+    def __init__(self, path, ttl=None, table="cache", clock=time.time):
+        """Opens the cache stored in the table of the SQLite file path, the
+         expired entries being removed.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.table = table
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+            )
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE expires <= ?", (self._clock(),)
+            )
+
+    def get(self, key, default=None):
+        """Returns the value cached for key, or default if there is none."""
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """Returns the (value, expiration time) pair cached for key, or None.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT value, expires FROM {self.table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= self._clock()):
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl=None):
+        """Caches value for key during ttl seconds, the default time to live
+         of the cache if ttl is None.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else self._clock() + ttl
+        self.set_entry(key, (value, expires))
+
+    def set_entry(self, key, entry):
+        """Caches the (value, expiration time) pair for key."""
+        value, expires = entry
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires),
+            )
+
+    def delete(self, key):
+        """Removes the entry of key from the cache."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"DELETE FROM {self.table} WHERE key = ?", (key,)
+            )
+
+    def clear(self):
+        """Removes all the entries of the cache."""
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                f"SELECT COUNT(*) FROM {self.table}"
+            ).fetchone()[0]
+
+    def close(self):
+        """Closes the SQLite file."""
+        self._connection.close()
+
+
+def geohash(latitude, longitude, precision):
+    """Returns the geohash of the position with precision characters, the
+     cells being about 1.2 km by 0.6 km with 6 characters.
+    """
+    intervals = [[-90.0, 90.0], [-180.0, 180.0]]
+    values = (latitude, longitude)
+    characters = []
+    bit = 0
+    for index in range(precision * 5):
+        # The bits alternate between the longitude and the latitude
+        axis = 1 - index % 2
+        interval = intervals[axis]
+        middle = (interval[0] + interval[1]) / 2
+        bit <<= 1
+        if values[axis] >= middle:
+            bit |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        if index % 5 == 4:
+            characters.append(GEOHASH_ALPHABET[bit])
+            bit = 0
+    return "".join(characters)
+
+
+def distance(latitude1, longitude1, latitude2, longitude2):
+    """Returns the great-circle distance in meters between two positions."""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+class SpatialCache:
+    """Cache of the places found around a position, shared by the positions
+     of the same geohash cell.
+
+    The places are dictionaries with "lat" and "lon" keys, returned sorted by
+    distance to the position looked up. As they were searched around another
+    position of the cell, the places close to the edge of the search radius
+    may be missing: the precision bounds this error to the size of a cell.
+    """
+
+    def __init__(self, cache, precision=6):
+        """Initializes a spatial cache storing the places in cache, a
+         MemoryCache whose ttl is the time to live of the searches.
+        """
+        self.cache = cache
+        self.precision = precision
+
+    def key(self, latitude, longitude, prefix=""):
+        """Returns the key of the cell of the position."""
+        return prefix + geohash(latitude, longitude, self.precision)
+
+    def get(self, latitude, longitude, prefix=""):
+        """Returns the places cached for the cell of the position, sorted by
+         distance to the position, or None if the cell is not cached.
+        """
+        places = self.cache.get(self.key(latitude, longitude, prefix))
+        if places is None:
+            return None
+        return sorted(
+            places,
+            key=lambda place: distance(
+                latitude, longitude, place["lat"], place["lon"]
+            ),
+        )
+
+    def set(self, latitude, longitude, places, prefix=""):
+        """Caches the places found around the position for its cell."""
+        self.cache.set(self.key(latitude, longitude, prefix), places)
+
+    def stats(self):
+        """Returns the counters of the underlying cache."""
+        return self.cache.stats()
@@ -0,0 +1,214 @@
+"""Command line interface of GrandPy Bot, run with python -m grandpy."""
+
+import argparse
+import math
+import sys
+import threading
+
+from grandpy import batch, bot, fakeserver, gazetteer, warmup
+
+
+def parse_command(arguments):
+    """Parses the questions of a file, one per line, and writes the
+     cleaned questions in the same order on the standard output, with the
+     parser of the bot.
+    """
+    parser = bot.get_parser()
+    lines = (line.rstrip("\n") for line in arguments.file)
+    for cleaned in parser.parse_many(
+        lines, processes=arguments.processes, chunksize=arguments.chunksize
+    ):
+        print(cleaned)
+
+
+def gazetteer_command(arguments):
+    """Builds the offline gazetteer from a CSV or JSON file of places."""
+    count = gazetteer.build(
+        arguments.database, gazetteer.read_places(arguments.source)
+    )
+    print(f"{count} places written to {arguments.database}")
+
+
+def geocode_command(arguments):
+    """Geocodes the questions of a file into a JSON Lines file."""
+    counts = batch.geocode_file(
+        arguments.file,
+        arguments.output,
+        concurrency=arguments.concurrency,
+        rate=arguments.rate,
+    )
+    print(
+        "{found} found, {not_found} not found, {failed} failed, "
+        "{skipped} already geocoded".format(**counts)
+    )
+
+
+def warmup_command(arguments):
+    """Warms up the bot, filling its persistent caches with the places of
+     a file, and prints the durations of the stages.
+    """
+    report = warmup.warm_up(
+        connections=arguments.connections,
+        places_path=arguments.places,
+        count=arguments.count,
+    )
+    for name, value in report.items():
+        if isinstance(value, float):
+            print(f"{name}: {value * 1000:.1f} ms")
+        else:
+            print(f"{name}: {value}")
+
+
+def fakeserver_command(arguments):
+    """Serves the fake Google Geocoding and Wikipedia APIs until
+     interrupted.
+    """
+    server = fakeserver.start_server(
+        latency=arguments.latency,
+        error_rate=arguments.error_rate,
+        fixtures=fakeserver.load_fixtures(arguments.fixtures),
+        port=arguments.port,
+    )
+    geocoding_url, wikipedia_url = fakeserver.urls(server)
+    print(f"GRANDPY_GEOCODING_URL={geocoding_url}")
+    print(f"GRANDPY_WIKIPEDIA_URL={wikipedia_url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+def positive_float(value):
+    """Converts a command line argument to a finite float greater than
+     zero.
+    """
+    number = float(value)
+    if not 0 < number < math.inf:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
+
+def build_argument_parser():
+    """Builds the parser of the command line arguments."""
+    argument_parser = argparse.ArgumentParser(prog="grandpy")
+    subparsers = argument_parser.add_subparsers(dest="command", required=True)
+
+    parse = subparsers.add_parser(
+        "parse", help="clean questions read line by line"
+    )
+    parse.add_argument(
+        "file",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="file of questions, the standard input by default",
+    )
+    parse.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=None,
+        help="number of processes parsing the questions",
+    )
+    parse.add_argument(
+        "--chunksize",
+        type=int,
+        default=256,
+        help="number of questions sent at once to a process",
+    )
+    parse.set_defaults(handler=parse_command)
+
+    build = subparsers.add_parser(
+        "gazetteer", help="build the offline gazetteer of places"
+    )
+    build.add_argument(
+        "source",
+        help="CSV or JSON file of places with the name, latitude, longitude "
+        "and optional address fields",
+    )
+    build.add_argument("database", help="SQLite file of the gazetteer")
+    build.set_defaults(handler=gazetteer_command)
+
+    geocode = subparsers.add_parser(
+        "geocode", help="geocode questions read line by line"
+    )
+    geocode.add_argument("file", help="file of questions or addresses")
+    geocode.add_argument(
+        "output",
+        help="JSON Lines file of the results, resumed if it exists",
+    )
+    geocode.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=8,
+        help="number of questions geocoded at the same time",
+    )
+    geocode.add_argument(
+        "--rate",
+        type=positive_float,
+        default=10,
+        help="maximum number of calls to the API per second",
+    )
+    geocode.set_defaults(handler=geocode_command)
+
+    settings = warmup.settings()
+    warm = subparsers.add_parser(
+        "warmup", help="warm up the bot and prime its caches"
+    )
+    warm.add_argument(
+        "--places",
+        default=settings["places_path"],
+        help="file of questions or places answered, the most asked first",
+    )
+    warm.add_argument(
+        "--count",
+        type=int,
+        default=settings["count"],
+        help="number of lines of the file answered",
+    )
+    warm.add_argument(
+        "--connections",
+        type=int,
+        default=settings["connections"],
+        help="number of connections opened to each API",
+    )
+    warm.set_defaults(handler=warmup_command)
+
+    serve = subparsers.add_parser(
+        "fakeserver",
+        help="serve fake geocoding and Wikipedia APIs replaying fixtures",
+    )
+    serve.add_argument("--port", type=int, default=8001)
+    serve.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="seconds waited before each response",
+    )
+    serve.add_argument(
+        "--error-rate",
+        type=float,
+        default=0,
+        help="probability of answering a server error",
+    )
+    serve.add_argument(
+        "--fixtures",
+        default=fakeserver.FIXTURES_PATH,
+        help="JSON file of the responses replayed",
+    )
+    serve.set_defaults(handler=fakeserver_command)
+
+    return argument_parser
+
+
+def main(argv=None):
+    """Runs the command given on the command line."""
+    arguments = build_argument_parser().parse_args(argv)
+    arguments.handler(arguments)
+
+
+if __name__ == "__main__":
+    main()
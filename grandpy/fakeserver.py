@@ -0,0 +1,147 @@
+"""Local HTTP server imitating the Google Geocoding and Wikipedia APIs, used
+to run the load tests and benchmarks without keys nor network.
+
+The server replays the responses recorded in a fixtures file, by default
+data/fixtures/apis.json, holding:
+
+- "geocoding": the geocoding responses by address, the "*" address
+  answering the unknown addresses, which are not found without it;
+- "geosearch": the places found by any geosearch, at most gslimit;
+- "pages": the data of the pages by page id, the other pages being missing.
+
+Each response is sent after the latency of the server, and a server error
+is answered instead with the probability error_rate. The clients are
+pointed to the server with the GRANDPY_GEOCODING_URL and
+GRANDPY_WIKIPEDIA_URL environment variables given by urls().
+"""
+
+import http.server
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from grandpy import fastjson
+
+FIXTURES_PATH = "data/fixtures/apis.json"
+
+
+def load_fixtures(path=FIXTURES_PATH):
+    """Returns the responses recorded in the fixtures file."""
+    with open(path, encoding="utf-8") as jsonfile:
+        return json.load(jsonfile)
+
+
+class FakeAPIHandler(http.server.BaseHTTPRequestHandler):
+    """Answers /geocode/json like the Google Geocoding API and
+     /<lang>/w/api.php like the Wikipedia API.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if self.server.failed():
+            self.send_json({"error": "Fake server error"}, status=500)
+        elif url.path.endswith("/geocode/json"):
+            self.send_json(self.geocoding(query))
+        elif url.path.endswith("/w/api.php"):
+            self.send_json(self.wikipedia(query))
+        else:
+            self.send_json({"error": "Not found"}, status=404)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def geocoding(self, query):
+        """Returns the response recorded for the address."""
+        responses = self.server.fixtures["geocoding"]
+        address = " ".join(query.get("address", "").split())
+        response = responses.get(address, responses.get("*"))
+        if response is None:
+            return {"results": [], "status": "ZERO_RESULTS"}
+        return response
+
+    def wikipedia(self, query):
+        """Returns the geosearch or the pages of the query."""
+        fixtures = self.server.fixtures
+        places = fixtures["geosearch"][:int(query.get("gslimit", 10))]
+        if "pageids" in query:
+            page_ids = query["pageids"].split("|")
+        elif "generator" in query:
+            page_ids = [str(place["pageid"]) for place in places]
+        else:
+            page_ids = []
+        pages = {
+            page_id: fixtures["pages"].get(
+                page_id, {"pageid": int(page_id), "missing": ""}
+            )
+            for page_id in page_ids
+        }
+        data = {"batchcomplete": "", "query": {}}
+        if query.get("list") == "geosearch":
+            data["query"]["geosearch"] = places
+        if pages:
+            data["query"]["pages"] = pages
+        return data
+
+    def send_json(self, data, status=200):
+        body = fastjson.dumps(data)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeAPIServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(
+        self,
+        address,
+        fixtures=None,
+        latency=0.05,
+        error_rate=0,
+        seed=None,
+    ):
+        super().__init__(address, FakeAPIHandler)
+        self.fixtures = load_fixtures() if fixtures is None else fixtures
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def failed(self):
+        """Returns True if the current request must fail."""
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+
+def start_server(latency=0.05, error_rate=0, fixtures=None, port=0, seed=None):
+    """Starts the fake server in a thread and returns it."""
+    server = FakeAPIServer(
+        ("127.0.0.1", port), fixtures, latency, error_rate, seed
+    )
+    threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    ).start()
+    return server
+
+
+def urls(server):
+    """Returns the urls of the geocoding and Wikipedia APIs of the server."""
+    root = f"http://127.0.0.1:{server.server_address[1]}"
+    return f"{root}/geocode/json", f"{root}/{{lang}}/w/api.php"
@@ -0,0 +1,44 @@
+"""Module encoding and decoding JSON with orjson when it is installed, the
+json module of the standard library otherwise, so that the responses of the
+APIs and the answers of GrandPy are decoded and serialized by the fastest
+library available.
+
+orjson is required by the Pipfile, the fallback serving the installs
+without it: both libraries give the same compact UTF-8 JSON, the stdlib one
+being forced with GRANDPY_JSON=json.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if os.getenv("GRANDPY_JSON") == "json":
+    orjson = None
+
+# Name of the library used, for the benchmarks
+library = "json" if orjson is None else "orjson"
+
+
+def loads(data):
+    """Decodes the JSON document data, in bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data):
+    """Serializes data in compact JSON encoded in UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(
+        data, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def response_json(response):
+    """Decodes the JSON body of a requests or httpx response."""
+    return loads(response.content)
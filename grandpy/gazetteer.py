@@ -0,0 +1,176 @@
+"""Module defining an offline gazetteer, an index of well-known places built
+in a SQLite file, loaded in memory and looked up before calling the
+geocoding API.
+
+The names of the places are indexed under the same form as the questions
+parsed by the parser of the bot, in the language of the name, so that "Où
+se trouve la tour Eiffel ?" finds the place named "Tour Eiffel". The
+questions which do not match a name exactly are compared with the names
+sharing the most of their rarest trigrams, the closest name being accepted
+above a similarity cutoff. Only the rarest
+trigrams are looked up, until MAX_TRIGRAM_ROWS names are found, so that the
+fuzzy matching stays fast whatever the number of names starting with "tour"
+or "musee".
+"""
+
+import array
+import collections
+import csv
+import difflib
+import json
+import os
+import sqlite3
+
+from grandpy.parser import normalize
+
+# Maximum number of names compared with a question
+MAX_CANDIDATES = 10
+
+# Number of names sharing a trigram with a question looked up, at most
+MAX_TRIGRAM_ROWS = 5000
+
+
+def place_key(parser, name):
+    """Returns the form under which a name is indexed, the one of the
+     questions parsed by parser.
+    """
+    return " ".join(parser.tokenize(normalize(name)).split())
+
+
+def trigrams(key):
+    """Returns the set of the trigrams of a key, its words being padded with
+     spaces.
+    """
+    padded = f" {key} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def read_places(path):
+    """Reads the places of a CSV file with a header or of a JSON file
+     holding a list of objects, with the name, latitude, longitude and
+     optional address fields.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if os.path.splitext(path)[1].lower() == ".json":
+            return json.load(file)
+        return list(csv.DictReader(file))
+
+
+def build(path, places, parser=None):
+    """Writes the places in the gazetteer stored in the SQLite file path,
+     replacing the places of the same name, and returns their number. The
+     names are indexed with the parser of the bot by default.
+    """
+    if parser is None:
+        # The bot looks up the gazetteer built by this module
+        from grandpy import bot
+
+        parser = bot.get_parser()
+    connection = sqlite3.connect(path)
+    count = 0
+    with connection:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS places "
+            "(key TEXT PRIMARY KEY, address TEXT, latitude REAL, "
+            "longitude REAL)"
+        )
+        for place in places:
+            key = place_key(parser, place["name"])
+            if not key:
+                continue
+            connection.execute(
+                "INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    place.get("address") or place["name"],
+                    float(place["latitude"]),
+                    float(place["longitude"]),
+                ),
+            )
+            count += 1
+    connection.close()
+    return count
+
+
+class Gazetteer:
+    """Index of the places of a SQLite file, loaded in memory."""
+
+    def __init__(self, path, cutoff=0.85):
+        """Loads the gazetteer stored in the SQLite file path, the names
+         whose similarity with a question is below cutoff being rejected.
+        """
+        self.path = path
+        self.cutoff = cutoff
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        rows = connection.execute(
+            "SELECT key, address, latitude, longitude FROM places"
+        ).fetchall()
+        connection.close()
+        self._keys = [row[0] for row in rows]
+        self._places = [
+            {"address": row[1], "latitude": row[2], "longitude": row[3]}
+            for row in rows
+        ]
+        self._ids = {key: index for index, key in enumerate(self._keys)}
+        self._trigrams = collections.defaultdict(lambda: array.array("I"))
+        for index, key in enumerate(self._keys):
+            for trigram in trigrams(key):
+                self._trigrams[trigram].append(index)
+        self._trigrams = dict(self._trigrams)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, question):
+        """Returns the place named in the question parsed, with the same
+         fields as the results of the geocoding API, or None.
+        """
+        key = " ".join(question.split())
+        index = self._ids.get(key)
+        if index is None and key:
+            index = self._closest(key)
+        if index is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(self._places[index])
+
+    def _closest(self, key):
+        """Returns the index of the name closest to key, None if none is
+         above the cutoff.
+        """
+        postings = sorted(
+            (
+                self._trigrams[trigram]
+                for trigram in trigrams(key)
+                if trigram in self._trigrams
+            ),
+            key=len,
+        )
+        shared = collections.Counter()
+        rows = 0
+        for posting in postings:
+            rows += len(posting)
+            if shared and rows > MAX_TRIGRAM_ROWS:
+                break
+            shared.update(posting)
+        matcher = difflib.SequenceMatcher(b=key)
+        best, best_ratio = None, self.cutoff
+        for index, _ in shared.most_common(MAX_CANDIDATES):
+            matcher.set_seq1(self._keys[index])
+            if matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = index, ratio
+        return best
+
+    def stats(self):
+        """Returns the counters of the gazetteer."""
+        return {
+            "size": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,248 @@
+"""Module measuring the time spent in each stage of the answer to a question
+and counting the errors of the APIs, the measures being exported in the
+Prometheus text format by the /metrics route of the website.
+
+The instrumentation can be disabled with the GRANDPY_METRICS=0 environment
+variable, timer() and count_error() then doing nothing.
+"""
+
+import bisect
+import contextlib
+import os
+import threading
+import time
+
+enabled = os.getenv("GRANDPY_METRICS", "1") != "0"
+
+# Upper bounds in seconds of the buckets of the latency histograms
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def format_labels(names, values, extra=()):
+    """Formats the labels of a sample, like {stage="parse"}."""
+    labels = [*zip(names, values), *extra]
+    if not labels:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, str(value).replace('"', '\\"'))
+        for name, value in labels
+    )
+
+
+class Counter:
+    """Counter of events, with one value per combination of labels."""
+
+    type = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        """Adds amount to the counter of the label values."""
+        with self._lock:
+            self._values[label_values] = (
+                self._values.get(label_values, 0) + amount
+            )
+
+    def value(self, *label_values):
+        """Returns the counter of the label values."""
+        return self._values.get(label_values, 0)
+
+    def samples(self):
+        """Yields the lines of the samples of the counter."""
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}{labels} {value}"
+
+
+class Gauge(Counter):
+    """Value which can go up and down, either set or read from a function
+     returning the values by label values when the metrics are rendered.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, help, labels=(), function=None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def set(self, value, *label_values):
+        """Sets the value of the label values."""
+        with self._lock:
+            self._values[label_values] = value
+
+    def samples(self):
+        if self.function is not None:
+            with self._lock:
+                self._values = dict(self.function())
+        yield from super().samples()
+
+
+class Histogram:
+    """Distribution of durations in buckets, per combination of labels."""
+
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._counts = {}
+        self._sums = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Records a value for the label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label_values)
+            if counts is None:
+                counts = self._counts[label_values] = [0] * (
+                    len(self.buckets) + 1
+                )
+                self._sums[label_values] = 0
+            counts[index] += 1
+            self._sums[label_values] += value
+
+    def count(self, *label_values):
+        """Returns the number of values recorded for the label values."""
+        return sum(self._counts.get(label_values, ()))
+
+    def samples(self):
+        """Yields the lines of the buckets, sum and count of the histogram."""
+        with self._lock:
+            counts = {key: list(value) for key, value in self._counts.items()}
+            sums = dict(self._sums)
+        for label_values in sorted(counts):
+            cumulative = 0
+            bounds = [*map(str, self.buckets), "+Inf"]
+            for bound, count in zip(bounds, counts[label_values]):
+                cumulative += count
+                labels = format_labels(
+                    self.labels, label_values, [("le", bound)]
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {sums[label_values]}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Set of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        """Adds the metric to the registry and returns it."""
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """Returns all the metrics in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_duration = registry.register(
+    Histogram(
+        "grandpy_stage_duration_seconds",
+        "Time spent in each stage of the answer to a question.",
+        labels=("stage",),
+    )
+)
+upstream_errors = registry.register(
+    Counter(
+        "grandpy_upstream_errors_total",
+        "Errors of the APIs by exception class.",
+        labels=("exception",),
+    )
+)
+answers = registry.register(
+    Counter(
+        "grandpy_answers_total",
+        "Questions answered, whether a place was found or not.",
+        labels=("found",),
+    )
+)
+circuit_events = registry.register(
+    Counter(
+        "grandpy_circuit_breaker_events_total",
+        "Trips, recoveries and calls rejected by the circuit breakers.",
+        labels=("upstream", "event"),
+    )
+)
+throttled_calls = registry.register(
+    Counter(
+        "grandpy_throttled_calls_total",
+        "Calls to the APIs delayed or rejected by the client-side limits.",
+        labels=("upstream", "outcome"),
+    )
+)
+
+_disabled_timer = contextlib.nullcontext()
+
+
+class Timer:
+    """Context manager recording its duration in the stage histogram."""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        stage_duration.observe(time.perf_counter() - self.start, self.stage)
+
+
+def timer(stage):
+    """Returns a context manager measuring the duration of a stage."""
+    if not enabled:
+        return _disabled_timer
+    return Timer(stage)
+
+
+def count_error(error):
+    """Counts an error of the APIs by its exception class."""
+    if enabled:
+        upstream_errors.inc(type(error).__name__)
+
+
+def count_answer(found):
+    """Counts a question answered."""
+    if enabled:
+        answers.inc("true" if found else "false")
+
+
+def count_circuit_event(upstream, event):
+    """Counts an event of the circuit breaker of an API."""
+    if enabled:
+        circuit_events.inc(upstream, event)
+
+
+def count_throttled(upstream, outcome):
+    """Counts a call to an API delayed or rejected by its limits."""
+    if enabled:
+        throttled_calls.inc(upstream, outcome)
+
+
+def render():
+    """Returns the metrics in the Prometheus text format."""
+    return registry.render()
@@ -3,9 +3,35 @@ so as to extract the important information to find the address and
 geographic coordinates.
 """
 
+import collections
+import concurrent.futures
+import itertools
 import json
+import os
+import re
 import string
 
+# Data files holding the location questions and the french stop words
+QUESTIONS_PATH = "data/questions.json"
+STOP_WORDS_PATH = "data/fr.json"
+
+# Data files of the question tags and of the stop words of each language
+LANGUAGES = {
+    "fr": (QUESTIONS_PATH, STOP_WORDS_PATH),
+    "en": ("data/questions_en.json", "data/en.json"),
+    "de": ("data/questions_de.json", "data/de.json"),
+}
+
+# Languages writing the punctuation glued to the words, detached from them
+# before the stop words are removed
+GLUED_PUNCTUATION = frozenset({"en", "de"})
+glued_punctuation_pattern = re.compile(r"(?<=\w)(?=[?!,;:])")
+
+# Separators of the words looked up among the marker words of the
+# languages, the elided and hyphenated words like "l'adresse" or
+# "connais-tu" counting as two words
+marker_separator_pattern = re.compile(r"[\s'-]+")
+
 # translation table for accents
 translations = {
     "à": "a",
@@ -25,6 +51,7 @@ translations = {
     "ù": "u",
     "ü": "u",
     "ç": "c",
+    "ß": "ss",
     "\u00e7": "c",
     "\\u00e7": "c",
 }
@@ -97,17 +124,285 @@ def remove_stop_words(sentence):
 
 def remove_punctuation_characters(sentence):
     """Removes punctuation."""
-    for letter in sentence:
-        if letter not in set(string.ascii_letters + string.whitespace + "'-"):
-            sentence = sentence.replace(letter, "")
-    return sentence
+    return punctuation_pattern.sub("", sentence)
+
+
+# Characters kept by remove_punctuation_characters
+allowed_characters = string.ascii_letters + string.whitespace + "'-"
+punctuation_pattern = re.compile(f"[^{re.escape(allowed_characters)}]")
+
+# Single character accents folded in one str.translate pass, the escaped
+# sequences being replaced afterwards.
+accents_table = str.maketrans(
+    {key: value for key, value in translations.items() if len(key) == 1}
+)
+escaped_accents = {
+    key: value for key, value in translations.items() if len(key) > 1
+}
+
+# Words glued back together once the apostrophes are removed
+apostrophe_pattern = re.compile("quelqu un|aujourd hui")
+apostrophe_words = {"quelqu un": "quelqu'un", "aujourd hui": "aujourd'hui"}
+
+
+class CharacterClasses(dict):
+    """Translation table mapping each character to its class for
+     normalize_spaces: "a" for a letter, "s" for a space, "o" otherwise.
+     Classes are computed on first encounter of a character and cached.
+    """
+
+    def __missing__(self, code):
+        letter = chr(code)
+        if letter.isalpha():
+            character_class = "a"
+        elif letter.isspace():
+            character_class = "s"
+        else:
+            character_class = "o"
+        self[code] = character_class
+        return character_class
+
+
+character_classes = CharacterClasses()
+# A space is kept when it is the first one following a letter, the other
+# characters in between not counting.
+kept_space_pattern = re.compile("(ao*)s")
+removed_spaces_pattern = re.compile("s+")
+
+
+def squeeze_spaces(sentence):
+    """Same result as normalize_spaces, computed with regular expressions on
+     the classes of the characters so that the cost stays linear.
+    """
+    classes = kept_space_pattern.sub(
+        r"\1k", sentence.translate(character_classes)
+    )
+    parts = []
+    start = 0
+    for match in removed_spaces_pattern.finditer(classes):
+        parts.append(sentence[start:match.start()])
+        start = match.end()
+    if not parts:
+        return sentence
+    parts.append(sentence[start:])
+    return "".join(parts)
+
+
+def normalize(sentence):
+    """Lowercases the sentence, removes its accents and its unnecessary
+     spaces, like the first three cleaners of the parser.
+    """
+    sentence = sentence.lower().translate(accents_table)
+    for with_accent, without_accent in escaped_accents.items():
+        if with_accent in sentence:
+            sentence = sentence.replace(with_accent, without_accent)
+    return squeeze_spaces(sentence)
+
+
+class DataFile:
+    """JSON data file loaded once and reloaded only when it changes on disk."""
+
+    def __init__(self, path):
+        """Loads the json file found at path."""
+        self.path = path
+        self.mtime = None
+        self.data = None
+        self.load()
+
+    def load(self):
+        """Reads the file and remembers its modification time."""
+        self.mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as jsonfile:
+            self.data = json.load(jsonfile)
+
+    def has_changed(self):
+        """Returns True if the file was modified since the last load."""
+        return os.stat(self.path).st_mtime_ns != self.mtime
+
+
+class QuestionTagMatcher:
+    """Extracts the place following a question tag.
+
+    The tags are compiled once into an Aho-Corasick automaton which finds
+    the occurrences of all of them in a single scan of the sentence. When
+    several tags are present, the policy decides which one wins:
+
+    - "file_order": the first tag in file order found exactly once in the
+      sentence, like extract_place;
+    - "leftmost_longest": the tag starting first in the sentence, the
+      longest one if several start at the same position.
+    """
+
+    policies = ("file_order", "leftmost_longest")
+
+    def __init__(
+        self, question_tags, policy="file_order", sequential_threshold=200
+    ):
+        """Builds the automaton of the question tags.
+
+        With the file_order policy and fewer tags than sequential_threshold,
+        looking the tags up one after the other with str.count is faster than
+        the scan of the automaton (see benchmarks/bench_matcher.py), so the
+        automaton is only used above this threshold.
+        """
+        if policy not in self.policies:
+            raise ValueError(f"The policy arg must be in {self.policies}")
+        self.policy = policy
+        self.question_tags = tuple(question_tags)
+        self.sequential = (
+            policy == "file_order"
+            and len(self.question_tags) < sequential_threshold
+        )
+        # Each state has its transitions, its failure state and the indexes
+        # of the tags ending in this state.
+        self._transitions = [{}]
+        self._failures = [0]
+        self._outputs = [()]
+        for index, question_tag in enumerate(self.question_tags):
+            self._add(index, question_tag)
+        self._link()
+        self._longest = max(map(len, self.question_tags), default=0)
+
+    def _add(self, index, question_tag):
+        """Adds the path of a tag to the trie of the automaton."""
+        state = 0
+        for letter in question_tag:
+            if letter not in self._transitions[state]:
+                self._transitions.append({})
+                self._failures.append(0)
+                self._outputs.append(())
+                self._transitions[state][letter] = len(self._transitions) - 1
+            state = self._transitions[state][letter]
+        if question_tag:
+            self._outputs[state] += (index,)
+
+    def _link(self):
+        """Computes the failure states with a breadth first traversal."""
+        queue = collections.deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for letter, child in self._transitions[state].items():
+                queue.append(child)
+                failure = self._failures[state]
+                while failure and letter not in self._transitions[failure]:
+                    failure = self._failures[failure]
+                self._failures[child] = self._transitions[failure].get(
+                    letter, 0
+                )
+                self._outputs[child] += self._outputs[self._failures[child]]
+
+    def occurrences(self, sentence):
+        """Returns the (end, index) pairs of the occurrences of the tags in
+         the sentence, by increasing end position, overlapping occurrences
+         included.
+        """
+        transitions = self._transitions
+        failures = self._failures
+        outputs = self._outputs
+        found = []
+        state = 0
+        for end, letter in enumerate(sentence, 1):
+            following = transitions[state].get(letter)
+            while following is None and state:
+                state = failures[state]
+                following = transitions[state].get(letter)
+            state = following or 0
+            if outputs[state]:
+                found.extend((end, index) for index in outputs[state])
+        return found
+
+    def extract(self, sentence):
+        """Returns the part of the sentence following the winning tag, or the
+         whole sentence if no tag is found.
+        """
+        if self.policy == "leftmost_longest":
+            return self._extract_leftmost_longest(sentence)
+        return self._extract_file_order(sentence)
 
+    def _extract_file_order(self, sentence):
+        if self.sequential:
+            for question_tag in self.question_tags:
+                if question_tag and sentence.count(question_tag) == 1:
+                    return sentence.partition(question_tag)[2]
+            return sentence
 
-class Parser:
+        # Like str.split, only the non overlapping occurrences of a tag
+        # are counted.
+        counts = {}
+        first_ends = {}
+        last_ends = {}
+        for end, index in self.occurrences(sentence):
+            if end - len(self.question_tags[index]) >= last_ends.get(index, 0):
+                counts[index] = counts.get(index, 0) + 1
+                first_ends.setdefault(index, end)
+                last_ends[index] = end
+        for index in sorted(counts):
+            if counts[index] == 1:
+                return sentence[first_ends[index]:]
+        return sentence
+
+    def _extract_leftmost_longest(self, sentence):
+        best = None
+        for end, index in self.occurrences(sentence):
+            # No occurrence ending further can start before the best one
+            if best is not None and end - self._longest > best[0]:
+                break
+            start = end - len(self.question_tags[index])
+            if (
+                best is None
+                or start < best[0]
+                or (start == best[0] and end > best[1])
+            ):
+                best = (start, end)
+        if best is None:
+            return sentence
+        return sentence[best[1]:]
+
+
+class ParallelParser:
+    """Base class of the parsers, parsing many sentences in a pool of
+     processes where the parser is created again from worker_arguments().
+    """
+
+    def parse_many(self, sentences, processes=None, chunksize=256):
+        """Parses lazily each sentence of the iterable, yielding the results
+         in order. With processes greater than one, chunks of sentences are
+         dispatched to a pool of processes, only a few chunks per process
+         being in flight so that memory stays constant.
+        """
+        if not processes or processes == 1:
+            for sentence in sentences:
+                yield self.parse(sentence)
+            return
+
+        sentences = iter(sentences)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(type(self), *self.worker_arguments()),
+        ) as executor:
+            pending = collections.deque()
+            while True:
+                while len(pending) < 2 * processes:
+                    chunk = list(itertools.islice(sentences, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_parse_chunk, chunk))
+                if not pending:
+                    return
+                yield from pending.popleft().result()
+
+
+class Parser(ParallelParser):
     """Object responsible for cleaning up questions sent by the user
      in order to facilitate research on a geolocation API.
+
+    The vocabularies are loaded and compiled once when the parser is created,
+    call reload() to take the modifications of the data files into account.
     """
 
+    # Reference pipeline reading the data files on each call, parse()
+    # applies the same steps with the compiled vocabularies.
     cleaners = [
         transform_to_lowercase,
         remove_all_accents,
@@ -118,9 +413,205 @@ class Parser:
         remove_punctuation_characters,
     ]
 
+    def __init__(
+        self,
+        questions_path=QUESTIONS_PATH,
+        stop_words_path=STOP_WORDS_PATH,
+        policy="file_order",
+    ):
+        """Loads and compiles the vocabularies of the parser, policy choosing
+         the question tag used when several are found.
+        """
+        self.policy = policy
+        self._questions_file = DataFile(questions_path)
+        self._stop_words_file = DataFile(stop_words_path)
+        self.compile()
+
+    def compile(self):
+        """Builds the question tag matcher and the stop words set."""
+        self.matcher = QuestionTagMatcher(
+            self._questions_file.data, self.policy
+        )
+        self.stop_words = frozenset(self._stop_words_file.data)
+
+    def reload(self):
+        """Reloads the data files modified since the last load.
+         Returns True if the parser has been recompiled.
+        """
+        changed = False
+        for data_file in (self._questions_file, self._stop_words_file):
+            if data_file.has_changed():
+                data_file.load()
+                changed = True
+        if changed:
+            self.compile()
+        return changed
+
     def parse(self, sentence):
         """Extract important information from the sentence passed in argument.
         """
-        for cleaner in self.cleaners:
-            sentence = cleaner(sentence)
-        return sentence
+        sentence = normalize(sentence)
+        sentence = self.matcher.extract(sentence)
+        return self.tokenize(sentence)
+
+    def worker_arguments(self):
+        """Returns the arguments creating the parser in the processes of
+         parse_many.
+        """
+        return (
+            (self._questions_file.path, self._stop_words_file.path),
+            {"policy": self.policy},
+        )
+
+    def tokenize(self, sentence):
+        """Removes the apostrophes, the stop words and the punctuation
+         in a single pass over the words of the sentence.
+        """
+        sentence = sentence.replace("'", " ")
+        if "quelqu un" in sentence or "aujourd hui" in sentence:
+            sentence = apostrophe_pattern.sub(
+                lambda match: apostrophe_words[match.group()], sentence
+            )
+        return punctuation_pattern.sub(
+            "",
+            " ".join(
+                word
+                for word in sentence.split(" ")
+                if word not in self.stop_words
+            ),
+        )
+
+
+class MultilingualParser(ParallelParser):
+    """Parses the questions asked in several languages, with a Parser per
+     language loaded once.
+
+    The language of a question is the one with the most of its words among
+    the marker words of the languages, the stop words and question tag words
+    only found in this language. The default language wins the questions
+    without marker words.
+    """
+
+    def __init__(self, languages=tuple(LANGUAGES), default="fr", **kwargs):
+        """Loads the parsers of the languages, the other keyword arguments
+         being given to them.
+        """
+        for language in (*languages, default):
+            if language not in LANGUAGES:
+                raise ValueError(
+                    f"The languages must be in {tuple(LANGUAGES)}"
+                )
+        self.default = default
+        self.languages = tuple(languages)
+        self._kwargs = kwargs
+        self.parsers = {
+            language: Parser(*LANGUAGES[language], **kwargs)
+            for language in dict.fromkeys((default, *languages))
+        }
+        self.compile()
+
+    def compile(self):
+        """Computes the marker words of the languages."""
+        vocabularies = {
+            language: set(
+                marker_separator_pattern.split(
+                    " ".join(
+                        (*parser.stop_words, *parser.matcher.question_tags)
+                    )
+                )
+            )
+            - {""}
+            for language, parser in self.parsers.items()
+        }
+        self.markers = {
+            language: vocabulary.difference(
+                *(
+                    other
+                    for other_language, other in vocabularies.items()
+                    if other_language != language
+                )
+            )
+            for language, vocabulary in vocabularies.items()
+        }
+        # The marker words of the languages are disjoint, a single lookup
+        # gives the language of a word
+        self._word_languages = {
+            word: language
+            for language, markers in self.markers.items()
+            for word in markers
+        }
+
+    def reload(self):
+        """Reloads the data files modified since the last load.
+         Returns True if a parser has been recompiled.
+        """
+        changed = [parser.reload() for parser in self.parsers.values()]
+        if any(changed):
+            self.compile()
+        return any(changed)
+
+    def detect(self, sentence):
+        """Returns the language of the normalized sentence."""
+        if len(self.parsers) == 1:
+            return self.default
+        languages = [
+            language
+            for language in map(
+                self._word_languages.get,
+                marker_separator_pattern.split(sentence),
+            )
+            if language
+        ]
+        if not languages:
+            return self.default
+        # Most questions only have marker words of their language
+        if languages.count(languages[0]) == len(languages):
+            return languages[0]
+        return max(dict.fromkeys(languages), key=languages.count)
+
+    def worker_arguments(self):
+        """Returns the arguments creating the parser in the processes of
+         parse_many.
+        """
+        return (self.languages, self.default), self._kwargs
+
+    def tokenize(self, sentence):
+        """Removes the stop words and the punctuation of the normalized
+         sentence, in its language.
+        """
+        language = self.detect(sentence)
+        if language in GLUED_PUNCTUATION:
+            sentence = glued_punctuation_pattern.sub(" ", sentence)
+        return self.parsers[language].tokenize(sentence)
+
+    def parse(self, sentence):
+        """Extract important information from the sentence passed in argument,
+         in its language.
+        """
+        return self.parse_with_language(sentence)[1]
+
+    def parse_with_language(self, sentence):
+        """Returns the language of the sentence and the sentence parsed."""
+        sentence = normalize(sentence)
+        language = self.detect(sentence)
+        if language in GLUED_PUNCTUATION:
+            sentence = glued_punctuation_pattern.sub(" ", sentence)
+        parser = self.parsers[language]
+        return language, parser.tokenize(parser.matcher.extract(sentence))
+
+
+# Parser of the current process when parse_many uses a pool of processes
+_worker_parser = None
+
+
+def _init_worker(parser_class, args, kwargs):
+    """Loads the parser of a worker process, like the parser of
+     parse_many.
+    """
+    global _worker_parser
+    _worker_parser = parser_class(*args, **kwargs)
+
+
+def _parse_chunk(sentences):
+    """Parses a chunk of sentences in a worker process."""
+    return [_worker_parser.parse(sentence) for sentence in sentences]
@@ -0,0 +1,130 @@
+"""Module coalescing the identical calls in flight: while a call for a key is
+running, the calls for the same key wait for its result instead of running
+again, and receive its result or its exception.
+
+SingleFlight coalesces the calls of several threads, AsyncSingleFlight the
+coroutines of an event loop. The callers waiting longer than their timeout
+get a TimeoutError, the call itself going on for the other callers. When
+the coroutine making the call is cancelled, one of the coroutines waiting
+for it makes the call again for the others.
+"""
+
+import asyncio
+import threading
+
+# Result of the call whose coroutine was cancelled
+_CANCELLED = object()
+
+
+class _Call:
+    """Call in flight, whose outcome is shared by the callers of its key."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces the calls of the threads by key."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, function, timeout=None):
+        """Returns the result of function(), called once for all the threads
+         asking for key at the same time. The exception raised by the call
+         is raised in all of them.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                call.result = function()
+            except BaseException as error:
+                call.error = error
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result
+        if not call.done.wait(timeout):
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"The call for {key!r} took too long.")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        """Returns the counters of the calls."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+                "in_flight": len(self._calls),
+            }
+
+
+class AsyncSingleFlight(SingleFlight):
+    """Coalesces the coroutines of the event loops by key."""
+
+    async def do(self, key, coroutine_function, timeout=None):
+        """Same as SingleFlight.do, coroutine_function() being awaited once
+         for all the coroutines of the event loop asking for key. If the
+         coroutine awaiting it is cancelled, the others call it again.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        # The futures can only be awaited in their event loop
+        loop_key = (id(loop), key)
+        with self._lock:
+            future = self._calls.get(loop_key)
+            leader = future is None
+            if leader:
+                future = self._calls[loop_key] = loop.create_future()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                result = await coroutine_function()
+            except asyncio.CancelledError:
+                future.set_result(_CANCELLED)
+                raise
+            except BaseException as error:
+                future.set_exception(error)
+                # The exception is retrieved by the leader itself
+                future.exception()
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with self._lock:
+                    del self._calls[loop_key]
+        try:
+            result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"The call for {key!r} took too long.")
+        if result is _CANCELLED:
+            if deadline is not None:
+                timeout = max(deadline - loop.time(), 0)
+            return await self.do(key, coroutine_function, timeout)
+        return result
@@ -0,0 +1,202 @@
+"""Warm-up of a new process of the bot, so that it answers its first
+questions at the latency of the following ones instead of paying the
+first-time costs on them:
+
+- parser: the vocabularies of the languages are loaded and sample
+  questions parsed, filling the lazy tables of the parser;
+- clients: the API clients and their caches are created, the gazetteer and
+  the persistent caches opened;
+- connections: connections to the APIs are opened in the shared pool, the
+  TCP and TLS handshakes being paid before the first question;
+- caches: the questions or places of a file, the most asked first, are
+  answered to fill the caches.
+
+The warm-up is run when the Flask and ASGI applications are created if the
+GRANDPY_WARMUP environment variable is 1, or by the warmup command of the
+command line, see warm_up() for its other settings.
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import os
+import time
+
+import requests
+
+from grandpy import bot
+from grandpy.apis import googlemaps, session, wikipedia
+
+enabled = os.getenv("GRANDPY_WARMUP", "0") == "1"
+
+# Questions parsed to warm up the parsers of the languages
+SAMPLE_QUESTIONS = {
+    "fr": (
+        "Salut GrandPy ! "
+        "Est-ce que tu connais l'adresse de la tour Eiffel ?"
+    ),
+    "en": "Hi GrandPy! Do you know the address of the Eiffel Tower?",
+    "de": "Hallo GrandPy! Kennst du die Adresse vom Eiffelturm?",
+}
+
+
+def read_places(path, count):
+    """Returns the count first questions or places of a file, one per
+     line.
+    """
+    places = []
+    with open(path, encoding="utf-8") as places_file:
+        for line in places_file:
+            if len(places) >= count:
+                break
+            if line.strip():
+                places.append(line.strip())
+    return places
+
+
+def warm_up_parser():
+    """Loads the parser and parses a sample question in each language."""
+    parser = bot.get_parser()
+    for language in parser.parsers:
+        parser.parse(SAMPLE_QUESTIONS[language])
+    return parser
+
+
+def warm_up_clients(languages):
+    """Creates the API clients of the languages and opens their caches."""
+    bot.get_google_client()
+    bot.get_gazetteer()
+    for language in languages:
+        bot.get_article_source(language)
+
+
+def upstream_urls(languages):
+    """Returns the urls of the APIs called for the questions of the
+     languages.
+    """
+    return [
+        googlemaps.GEOCODING_URL,
+        *(wikipedia.WIKIPEDIA_URL.format(lang=lang) for lang in languages),
+    ]
+
+
+def open_connection(url):
+    """Opens a connection to url in the shared pool with a HEAD request,
+     and returns True if it succeeded.
+    """
+    try:
+        session.get_session().head(url, timeout=session.timeouts())
+    except requests.RequestException:
+        return False
+    return True
+
+
+def open_connections(urls, connections=2):
+    """Opens connections to each of the urls at the same time, so that they
+     are distinct connections of the pool, and returns the number opened.
+    """
+    with concurrent.futures.ThreadPoolExecutor(
+        len(urls) * connections
+    ) as executor:
+        return sum(executor.map(open_connection, urls * connections))
+
+
+def prime_caches(questions, concurrency=8):
+    """Answers the questions to fill the caches and returns the number of
+     positive answers.
+    """
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        answers = executor.map(bot.answer_json, questions)
+        return sum(etag is not None for _, etag in answers)
+
+
+def settings():
+    """Returns the settings of the warm-up read from the environment:
+
+    - GRANDPY_WARMUP_CONNECTIONS: connections opened per API, 0 for none;
+    - GRANDPY_WARMUP_PLACES: optional file of questions or places answered;
+    - GRANDPY_WARMUP_COUNT: number of lines of this file answered.
+    """
+    return {
+        "connections": int(os.getenv("GRANDPY_WARMUP_CONNECTIONS", 2)),
+        "places_path": os.getenv("GRANDPY_WARMUP_PLACES"),
+        "count": int(os.getenv("GRANDPY_WARMUP_COUNT", 100)),
+    }
+
+
+@contextlib.contextmanager
+def stage(report, name):
+    """Context manager recording the duration of a stage in the report."""
+    start = time.perf_counter()
+    yield
+    report[name] = time.perf_counter() - start
+
+
+def warm_up(connections=2, places_path=None, count=100):
+    """Warms up the process, opening connections connections to each API
+     and answering the count first lines of the file places_path, and
+     returns the durations of the stages in seconds, with the number of
+     connections opened and of places found.
+    """
+    report = {}
+    with stage(report, "parser"):
+        parser = warm_up_parser()
+    with stage(report, "clients"):
+        warm_up_clients(parser.parsers)
+    if connections:
+        with stage(report, "connections"):
+            report["connections_opened"] = open_connections(
+                upstream_urls(parser.parsers), connections
+            )
+    if places_path:
+        with stage(report, "caches"):
+            report["places_found"] = prime_caches(
+                read_places(places_path, count)
+            )
+    return report
+
+
+async def open_connection_async(url):
+    """Same as open_connection, in the httpx pool of the event loop."""
+    client = session.get_async_client()
+    try:
+        await client.head(url, timeout=session.CONNECT_TIMEOUT)
+    except session.httpx.HTTPError:
+        return False
+    return True
+
+
+async def prime_caches_async(questions, concurrency=8):
+    """Same as prime_caches, concurrency questions being answered at the
+     same time in the event loop.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def answer(question):
+        async with semaphore:
+            _, etag = await bot.answer_json_async(question)
+        return etag is not None
+
+    return sum(await asyncio.gather(*map(answer, questions)))
+
+
+async def warm_up_async(connections=2, places_path=None, count=100):
+    """Same as warm_up for the ASGI application, the connections being
+     opened and the places answered in the running event loop.
+    """
+    report = {}
+    with stage(report, "parser"):
+        parser = warm_up_parser()
+    with stage(report, "clients"):
+        warm_up_clients(parser.parsers)
+    if connections:
+        with stage(report, "connections"):
+            urls = upstream_urls(parser.parsers) * connections
+            opened = await asyncio.gather(*map(open_connection_async, urls))
+            report["connections_opened"] = sum(opened)
+    if places_path:
+        with stage(report, "caches"):
+            report["places_found"] = await prime_caches_async(
+                read_places(places_path, count)
+            )
+    return report
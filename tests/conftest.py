@@ -0,0 +1,64 @@
+import pytest
+
+from grandpy import bot
+from grandpy.apis import backends, breaker
+
+
+class FakeClock:
+    """Clock whose time only changes when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Fixture giving a FakeClock to the caches, breakers and limiters."""
+    yield FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def closed_breakers():
+    """Fixture closing the circuit breakers of the APIs around each test, so
+     that the failures simulated by a test do not open them for the others.
+    """
+    breaker.geocoding.reset()
+    breaker.wikipedia.reset()
+    yield
+    breaker.geocoding.reset()
+    breaker.wikipedia.reset()
+
+
+class FakeGeocoder(backends.Geocoder):
+    """Geocoder finding the Eiffel Tower for every question."""
+
+    def search(self, address):
+        return {"address": "Champ de Mars", "latitude": 48.8, "longitude": 2.3}
+
+
+class FakePage:
+    def as_dict(self):
+        return {"title": "Tour Eiffel", "url": "", "summary": ""}
+
+
+class FakeArticleSource(backends.ArticleSource):
+    """Article source finding the same page around every place."""
+
+    def geosearch(self, latitude, longitude, with_data=False):
+        return [FakePage()]
+
+    def first_available_page(self, pages):
+        return pages[0]
+
+
+@pytest.fixture
+def fake_backends():
+    """Fixture answering the questions with imitations of the backends,
+     through all the stages of an answer.
+    """
+    bot.use_backends(FakeGeocoder(), FakeArticleSource())
+    yield
+    bot.use_backends()
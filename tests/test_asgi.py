@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+
+from website import asgi
+
+
+def request(method, path, body=b"", headers=(), query_string=b""):
+    """Sends a request to the ASGI application and returns the status and
+     the body of the response.
+    """
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": list(headers),
+        "query_string": query_string,
+    }
+    asyncio.run(asgi.app(scope, receive, send))
+    return sent[0]["status"], b"".join(message["body"] for message in sent[1:])
+
+
+@pytest.fixture
+def mock_answer_async(monkeypatch):
+    """Fixture replacing answer_json_async with an imitation, answering
+     with the ETag "louvre" when the question is about the Louvre.
+    """
+
+    async def mock_answer_async(question):
+        body = json.dumps({"found": False, "question": question}).encode()
+        return body, "louvre" if "Louvre" in question else None
+
+    async def mock_answer_stream_async(question):
+        yield {"part": "place", "found": True, "question": question}
+        yield {"part": "article", "found": False}
+
+    monkeypatch.setattr(asgi, "answer_json_async", mock_answer_async)
+    monkeypatch.setattr(
+        asgi, "answer_stream_async", mock_answer_stream_async
+    )
+    yield mock_answer_async
+
+
+def test_question_view_answers_the_question_posted(mock_answer_async):
+    status, body = request(
+        "POST", "/question", b"question=O%C3%B9+est+le+Louvre+%3F"
+    )
+    assert status == 200
+    assert json.loads(body) == {
+        "found": False,
+        "question": "Où est le Louvre ?",
+    }
+
+
+def test_question_view_answers_the_question_posted_as_form_data(
+    mock_answer_async,
+):
+    body = (
+        b"--boundary\r\n"
+        b'Content-Disposition: form-data; name="question"\r\n\r\n'
+        b"O\xc3\xb9 est le Louvre ?\r\n"
+        b"--boundary--\r\n"
+    )
+    content_type = b"multipart/form-data; boundary=boundary"
+    status, body = request(
+        "POST", "/question", body, [(b"content-type", content_type)]
+    )
+    assert status == 200
+    assert json.loads(body)["question"] == "Où est le Louvre ?"
+
+
+def test_question_view_answers_a_get_request_not_modified(mock_answer_async):
+    status, body = request(
+        "GET",
+        "/question",
+        headers=[(b"if-none-match", b'W/"louvre"')],
+        query_string=b"question=Louvre",
+    )
+    assert status == 304
+    assert body == b""
+
+
+def test_question_view_answers_a_get_request_modified(mock_answer_async):
+    status, body = request(
+        "GET",
+        "/question",
+        headers=[(b"if-none-match", b'W/"orsay"')],
+        query_string=b"question=Louvre",
+    )
+    assert status == 200
+    assert json.loads(body)["question"] == "Louvre"
+
+
+def test_question_view_streams_the_answer_in_json_lines(mock_answer_async):
+    status, body = request(
+        "POST",
+        "/question",
+        b"question=O%C3%B9+est+le+Louvre+%3F",
+        [(b"accept", b"application/x-ndjson")],
+    )
+    assert status == 200
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"part": "place", "found": True, "question": "Où est le Louvre ?"},
+        {"part": "article", "found": False},
+    ]
+
+
+def test_question_view_rejects_a_form_without_question(mock_answer_async):
+    status, _ = request("POST", "/question", b"other=1")
+    assert status == 400
+
+
+def test_other_routes_are_not_found(mock_answer_async):
+    status, _ = request("GET", "/")
+    assert status == 404
+
+
+def test_metrics_route_exports_the_durations_of_the_stages(fake_backends):
+    request("POST", "/question", b"question=O%C3%B9+est+la+tour+Eiffel+%3F")
+    status, body = request("GET", "/metrics")
+    text = body.decode()
+    assert status == 200
+    assert "# HELP grandpy_stage_duration_seconds " in text
+    assert "# TYPE grandpy_stage_duration_seconds histogram" in text
+    for stage in ("parse", "geocode", "geosearch", "page", "question"):
+        assert (
+            f'grandpy_stage_duration_seconds_bucket{{stage="{stage}",'
+            'le="+Inf"}'
+        ) in text
@@ -0,0 +1,108 @@
+import json
+import threading
+
+import pytest
+
+from grandpy import batch
+from grandpy.apis import backends
+from grandpy.parser import Parser
+
+PLACES = {
+    "tour eiffel ": {
+        "address": "Champ de Mars",
+        "latitude": 48.8,
+        "longitude": 2.3,
+    },
+    "louvre": {"address": "Rue de Rivoli", "latitude": 48.9, "longitude": 2.3},
+}
+
+
+class MockGeocoder(backends.Geocoder):
+    """Geocoder knowing the PLACES, failing on the addresses in errors."""
+
+    def __init__(self, errors=()):
+        self.errors = set(errors)
+        self.searched = []
+        self._lock = threading.Lock()
+
+    def search(self, address):
+        with self._lock:
+            self.searched.append(address)
+        if address in self.errors:
+            raise backends.GeocodingError("timeout")
+        if address not in PLACES:
+            raise backends.PlaceNotFoundError("nothing")
+        return PLACES[address]
+
+
+@pytest.fixture(scope="module")
+def parser():
+    yield Parser()
+
+
+@pytest.fixture
+def questions(tmp_path):
+    path = tmp_path / "questions.txt"
+    path.write_text(
+        "Où se trouve la tour Eiffel ?\n"
+        "Où est le Louvre\n"
+        "\n"
+        "Où se trouve nulle part ?\n"
+        "Salut GrandPy, où se trouve la tour Eiffel ?\n"
+    )
+    yield path
+
+
+def read_results(path):
+    with open(path) as output:
+        return {result["line"]: result for result in map(json.loads, output)}
+
+
+def test_geocode_file_writes_one_result_per_question(
+    questions, tmp_path, parser
+):
+    output = tmp_path / "results.jsonl"
+    geocoder = MockGeocoder()
+    counts = batch.geocode_file(
+        questions, output, concurrency=2, geocoder=geocoder, parser=parser
+    )
+    assert counts == {"found": 3, "not_found": 1, "failed": 0, "skipped": 0}
+    results = read_results(output)
+    assert sorted(results) == [1, 2, 4, 5]
+    assert results[1]["query"] == "tour eiffel "
+    assert results[1]["address"] == "Champ de Mars"
+    assert results[4]["found"] is False
+    # Each address is geocoded once
+    assert sorted(geocoder.searched) == [
+        "louvre",
+        "nulle part ",
+        "tour eiffel ",
+    ]
+
+
+def test_geocode_file_resumes_from_the_results_written(
+    questions, tmp_path, parser
+):
+    output = tmp_path / "results.jsonl"
+    batch.geocode_file(
+        questions,
+        output,
+        geocoder=MockGeocoder(errors=["louvre"]),
+        parser=parser,
+    )
+    assert sorted(read_results(output)) == [1, 4, 5]
+
+    geocoder = MockGeocoder()
+    counts = batch.geocode_file(
+        questions, output, geocoder=geocoder, parser=parser
+    )
+    assert counts == {"found": 1, "not_found": 0, "failed": 0, "skipped": 3}
+    assert geocoder.searched == ["louvre"]
+    assert sorted(read_results(output)) == [1, 2, 4, 5]
+
+
+def test_completed_lines_drops_the_line_being_written(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"line": 1, "found": false}\n{"line": 2, "fo')
+    assert batch.completed_lines(output) == {1}
+    assert output.read_text() == '{"line": 1, "found": false}\n'
@@ -0,0 +1,409 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from grandpy import bot, gazetteer, metrics
+from grandpy.apis import backends, session
+from grandpy.apis.googlemaps import GoogleGeocodingNothingFoundError
+
+GEO_INFO = {"address": "Champ de Mars", "latitude": 48.8, "longitude": 2.29}
+PAGE = {
+    "title": "Tour Eiffel",
+    "url": "https://fr.wikipedia.org",
+    "summary": "",
+}
+
+
+class MockPage:
+    def as_dict(self):
+        return PAGE
+
+
+class MockGoogleClient:
+    def __init__(self, error=None):
+        self.error = error
+        self.searched = []
+
+    def search(self, address):
+        self.searched.append(address)
+        if self.error is not None:
+            raise self.error
+        return GEO_INFO
+
+
+class MockWikipediaClient:
+    def geosearch(self, latitude, longitude, with_data=False):
+        return [MockPage()]
+
+    def first_available_page(self, pages):
+        return pages[0]
+
+
+@pytest.fixture
+def google_client(monkeypatch):
+    """Fixture replacing the API clients of the bot with imitations."""
+    client = MockGoogleClient()
+    monkeypatch.setattr(bot, "get_google_client", lambda: client)
+    monkeypatch.setattr(
+        bot, "get_wikipedia_client", lambda lang="fr": MockWikipediaClient()
+    )
+    bot.get_answer_cache().clear()
+    yield client
+
+
+def test_answer_returns_the_place_and_its_article(google_client):
+    response = bot.answer("Où se trouve la tour Eiffel ?")
+    assert google_client.searched == ["tour eiffel "]
+    assert response["found"] is True
+    assert response["question"] == "Où se trouve la tour Eiffel ?"
+    assert response["address"] == GEO_INFO["address"]
+    assert response["title"] == PAGE["title"]
+
+
+def test_answer_returns_a_negative_answer_on_api_error(google_client):
+    google_client.error = GoogleGeocodingNothingFoundError("nothing")
+    response = bot.answer("Où se trouve nulle part ?")
+    assert response["found"] is False
+    assert response["answer"] in bot.negative_answers
+
+
+def test_answer_records_the_duration_of_each_stage(google_client):
+    stages = ["parse", "geocode", "geosearch", "page"]
+    counts = [metrics.stage_duration.count(stage) for stage in stages]
+    bot.answer("Où se trouve la tour Eiffel ?")
+    assert [metrics.stage_duration.count(stage) for stage in stages] == [
+        count + 1 for count in counts
+    ]
+
+
+def test_answer_counts_api_errors_by_exception_class(google_client):
+    google_client.error = GoogleGeocodingNothingFoundError("nothing")
+    errors = metrics.upstream_errors.value("GoogleGeocodingNothingFoundError")
+    bot.answer("Où se trouve nulle part ?")
+    assert (
+        metrics.upstream_errors.value("GoogleGeocodingNothingFoundError")
+        == errors + 1
+    )
+
+
+def test_answer_looks_up_the_gazetteer_first(google_client, monkeypatch):
+    class MockGazetteer:
+        def search(self, question):
+            return {**GEO_INFO, "address": "Tour Eiffel"}
+
+    monkeypatch.setattr(bot, "get_gazetteer", lambda: MockGazetteer())
+    response = bot.answer("Où se trouve la tour Eiffel ?")
+    assert response["address"] == "Tour Eiffel"
+    assert google_client.searched == []
+
+
+def test_answer_calls_the_geocoder_with_an_empty_gazetteer(
+    google_client, monkeypatch, tmp_path
+):
+    path = str(tmp_path / "gazetteer.sqlite3")
+    gazetteer.build(path, [])
+    monkeypatch.setattr(bot, "_gazetteer", gazetteer.Gazetteer(path))
+    response = bot.answer("Où se trouve la tour Eiffel ?")
+    assert response["address"] == GEO_INFO["address"]
+    assert google_client.searched == ["tour eiffel "]
+
+
+def test_answer_calls_the_geocoder_if_the_gazetteer_cannot_be_opened(
+    google_client, monkeypatch, tmp_path, caplog
+):
+    path = str(tmp_path / "missing.sqlite3")
+    monkeypatch.setenv("GRANDPY_GAZETTEER_PATH", path)
+    monkeypatch.setattr(bot, "_gazetteer", None)
+    monkeypatch.setattr(bot, "_gazetteer_error_path", None)
+    for _ in range(2):
+        response = bot.answer("Où se trouve la tour Eiffel ?")
+        assert response["address"] == GEO_INFO["address"]
+    assert len(caplog.records) == 1
+    assert path in caplog.records[0].getMessage()
+
+
+def test_answer_async_with_other_backends():
+    class Geocoder(backends.Geocoder):
+        def search(self, address):
+            return GEO_INFO
+
+    class ArticleSource(backends.ArticleSource):
+        def geosearch(self, latitude, longitude, with_data=False):
+            return [MockPage()]
+
+        def first_available_page(self, pages):
+            return pages[0]
+
+    bot.use_backends(Geocoder(), ArticleSource())
+    try:
+        response = asyncio.run(bot.answer_async("Où est la tour Eiffel ?"))
+    finally:
+        bot.use_backends()
+    assert response["title"] == PAGE["title"]
+
+
+def test_async_methods_of_the_backends_keep_the_deadline():
+    class Geocoder(backends.Geocoder):
+        def search(self, address):
+            return session.remaining()
+
+    async def search():
+        with session.deadline(5):
+            return await Geocoder().search_async("tour eiffel")
+
+    assert 4 < asyncio.run(search()) <= 5
+
+
+def test_identical_questions_in_flight_share_the_backend_calls():
+    released = threading.Event()
+
+    class SlowGeocoder(backends.Geocoder):
+        searched = []
+
+        def search(self, address):
+            self.searched.append(address)
+            released.wait(5)
+            return GEO_INFO
+
+    class ArticleSource(backends.ArticleSource):
+        def geosearch(self, latitude, longitude, with_data=False):
+            return [MockPage()]
+
+        def first_available_page(self, pages):
+            return pages[0]
+
+    bot.use_backends(SlowGeocoder(), ArticleSource())
+    shared = bot._in_flight.stats()["shared"]
+    responses = []
+    threads = [
+        threading.Thread(
+            target=lambda question: responses.append(bot.answer(question)),
+            args=(question,),
+        )
+        for question in ["Où est la tour Eiffel ?", "La tour Eiffel ?"] * 2
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        while bot._in_flight.stats()["shared"] < shared + 3:
+            released.wait(0.001)
+        released.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        bot.use_backends()
+    assert SlowGeocoder.searched == ["tour eiffel "]
+    assert [response["found"] for response in responses] == [True] * 4
+
+
+def test_the_backends_are_called_within_the_answer_deadline():
+    remaining = []
+
+    class Geocoder(backends.Geocoder):
+        def search(self, address):
+            remaining.append(session.remaining())
+            raise backends.GeocodingError("nothing")
+
+    bot.use_backends(Geocoder(), None)
+    try:
+        response = bot.answer("Où est la tour Eiffel ?")
+    finally:
+        bot.use_backends()
+    assert response["found"] is False
+    assert 0 < remaining[0] <= bot.ANSWER_DEADLINE
+
+
+class FailingWikipediaClient(backends.ArticleSource):
+    def geosearch(self, latitude, longitude, with_data=False):
+        raise backends.ArticleSourceError("nothing")
+
+    def first_available_page(self, pages):
+        return pages[0]
+
+
+def test_answer_stream_gives_the_place_then_the_article(google_client):
+    parts = list(bot.answer_stream("Où se trouve la tour Eiffel ?"))
+    assert [part["part"] for part in parts] == ["place", "article"]
+    assert parts[0]["found"] is True
+    assert parts[0]["address"] == GEO_INFO["address"]
+    assert "title" not in parts[0]
+    assert parts[1]["found"] is True
+    assert parts[1]["title"] == PAGE["title"]
+
+
+def test_answer_stream_serves_the_repeated_questions_from_the_cache(
+    google_client,
+):
+    first = list(bot.answer_stream("Où se trouve la tour Eiffel ?"))
+    second = list(bot.answer_stream("Où est la tour Eiffel ?"))
+    assert google_client.searched == ["tour eiffel "]
+    assert [part["part"] for part in second] == ["place", "article"]
+    assert second[0]["question"] == "Où est la tour Eiffel ?"
+    for name in ("address", "latitude", "longitude"):
+        assert second[0][name] == first[0][name]
+    assert second[1]["title"] == first[1]["title"]
+    assert second[1]["intro"] in bot.article_intros
+
+
+def test_answer_stream_shares_the_cache_of_answer_json(google_client):
+    _, etag = bot.answer_json("Où se trouve la tour Eiffel ?")
+    parts = list(bot.answer_stream("Où est la tour Eiffel ?"))
+    assert google_client.searched == ["tour eiffel "]
+    assert parts[1]["url"] == PAGE["url"]
+    list(bot.answer_stream("Où est le Louvre ?"))
+    _, louvre_etag = bot.answer_json("Où se trouve le Louvre ?")
+    assert google_client.searched == ["tour eiffel ", "louvre "]
+    assert louvre_etag is not None
+
+
+def test_answer_stream_keeps_the_place_when_the_article_fails(
+    google_client, monkeypatch
+):
+    monkeypatch.setattr(
+        bot,
+        "get_wikipedia_client",
+        lambda lang="fr": FailingWikipediaClient(),
+    )
+    parts = list(bot.answer_stream("Où se trouve la tour Eiffel ?"))
+    assert parts[0]["found"] is True
+    assert parts[1] == {"part": "article", "found": False}
+
+
+def test_answer_stream_parts_share_the_deadline(google_client, monkeypatch):
+    class SlowGoogleClient(MockGoogleClient):
+        def search(self, address):
+            time.sleep(0.2)
+            return super().search(address)
+
+    class WikipediaClient(MockWikipediaClient):
+        def geosearch(self, latitude, longitude, with_data=False):
+            self.remaining = session.remaining()
+            return super().geosearch(latitude, longitude, with_data)
+
+    wikipedia_client = WikipediaClient()
+    monkeypatch.setattr(bot, "ANSWER_DEADLINE", 1)
+    monkeypatch.setattr(bot, "get_google_client", SlowGoogleClient)
+    monkeypatch.setattr(
+        bot, "get_wikipedia_client", lambda lang="fr": wikipedia_client
+    )
+    list(bot.answer_stream("Où se trouve la tour Eiffel ?"))
+    assert wikipedia_client.remaining <= 0.8
+
+
+def test_answer_stream_gives_a_negative_answer_on_geocoding_error(
+    google_client,
+):
+    google_client.error = GoogleGeocodingNothingFoundError("nothing")
+    parts = list(bot.answer_stream("Où se trouve nulle part ?"))
+    assert len(parts) == 1
+    assert parts[0]["part"] == "place"
+    assert parts[0]["found"] is False
+    assert parts[0]["answer"] in bot.negative_answers
+
+
+def test_answer_stream_async_keeps_the_place_when_the_article_fails():
+    class Geocoder(backends.Geocoder):
+        def search(self, address):
+            return GEO_INFO
+
+    async def collect():
+        return [
+            part
+            async for part in bot.answer_stream_async(
+                "Où se trouve la tour Eiffel ?"
+            )
+        ]
+
+    bot.use_backends(Geocoder(), FailingWikipediaClient())
+    try:
+        parts = asyncio.run(collect())
+    finally:
+        bot.use_backends()
+    assert [part["part"] for part in parts] == ["place", "article"]
+    assert parts[0]["address"] == GEO_INFO["address"]
+    assert parts[1]["found"] is False
+
+
+def test_answer_stream_async_serves_the_repeated_questions_from_the_cache():
+    class Geocoder(backends.Geocoder):
+        searched = []
+
+        def search(self, address):
+            self.searched.append(address)
+            return GEO_INFO
+
+    class ArticleSource(MockWikipediaClient, backends.ArticleSource):
+        pass
+
+    async def collect(question):
+        return [part async for part in bot.answer_stream_async(question)]
+
+    geocoder = Geocoder()
+    bot.use_backends(geocoder, ArticleSource())
+    try:
+        asyncio.run(collect("Où se trouve la tour Eiffel ?"))
+        parts = asyncio.run(collect("Où est la tour Eiffel ?"))
+    finally:
+        bot.use_backends()
+    assert geocoder.searched == ["tour eiffel "]
+    assert parts[1]["title"] == PAGE["title"]
+
+
+def test_answer_json_serializes_the_answer(google_client):
+    body, etag = bot.answer_json(" Où se trouve la tour Eiffel ? ")
+    response = json.loads(body)
+    assert response["found"] is True
+    assert response["question"] == "Où se trouve la tour Eiffel ?"
+    assert response["answer"] in bot.positive_answers
+    assert response["intro"] in bot.article_intros
+    assert response["address"] == GEO_INFO["address"]
+    assert response["title"] == PAGE["title"]
+    assert etag
+
+
+def test_answer_json_serves_the_repeated_questions_from_the_cache(
+    google_client,
+):
+    _, etag = bot.answer_json("Où se trouve la tour Eiffel ?")
+    body, cached_etag = bot.answer_json("Où est la tour Eiffel ?")
+    assert google_client.searched == ["tour eiffel "]
+    assert cached_etag == etag
+    assert json.loads(body)["question"] == "Où est la tour Eiffel ?"
+
+
+def test_answer_json_does_not_cache_the_negative_answers(google_client):
+    google_client.error = GoogleGeocodingNothingFoundError("nothing")
+    body, etag = bot.answer_json("Où se trouve nulle part ?")
+    assert json.loads(body)["found"] is False
+    assert etag is None
+    assert len(bot.get_answer_cache()) == 0
+
+
+def test_answer_searches_the_wikipedia_edition_of_the_question(
+    google_client, monkeypatch
+):
+    editions = []
+
+    def get_wikipedia_client(lang="fr"):
+        editions.append(lang)
+        return MockWikipediaClient()
+
+    monkeypatch.setattr(bot, "get_wikipedia_client", get_wikipedia_client)
+    bot.answer("Hello GrandPy, where is the Eiffel Tower?")
+    bot.answer("Hallo Opa, wo liegt das Brandenburger Tor?")
+    bot.answer("Où se trouve la tour Eiffel ?")
+    assert editions == ["en", "de", "fr"]
+    assert google_client.searched[:2] == [
+        "eiffel tower ",
+        "brandenburger tor ",
+    ]
+
+
+def test_the_wikipedia_clients_of_the_editions_share_their_caches():
+    english = bot.get_wikipedia_client("en")
+    assert english.lang == "en"
+    assert bot.get_wikipedia_client("en") is english
+    assert english.cache is bot.get_wikipedia_client("fr").cache
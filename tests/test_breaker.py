@@ -0,0 +1,76 @@
+import pytest
+
+from grandpy import metrics
+from grandpy.apis import breaker
+
+
+@pytest.fixture
+def circuit(clock):
+    yield breaker.CircuitBreaker(
+        "test",
+        failure_threshold=0.5,
+        minimum_calls=4,
+        window_size=10,
+        reset_timeout=30,
+        clock=clock,
+    )
+
+
+def test_breaker_stays_closed_below_the_threshold(circuit):
+    for _ in range(3):
+        circuit.record_success()
+    for _ in range(2):
+        circuit.record_failure()
+    assert circuit.state == breaker.CLOSED
+    assert circuit.allow()
+
+
+def test_breaker_needs_the_minimum_number_of_calls(circuit):
+    for _ in range(3):
+        circuit.record_failure()
+    assert circuit.state == breaker.CLOSED
+
+
+def test_breaker_opens_beyond_the_threshold_and_rejects_calls(circuit):
+    trips = metrics.circuit_events.value("test", "trip")
+    for _ in range(2):
+        circuit.record_success()
+    for _ in range(2):
+        circuit.record_failure()
+    assert circuit.state == breaker.OPEN
+    assert not circuit.allow()
+    assert metrics.circuit_events.value("test", "trip") == trips + 1
+
+
+def test_breaker_lets_a_single_trial_call_after_reset_timeout(
+    circuit, clock
+):
+    for _ in range(4):
+        circuit.record_failure()
+    clock.now += 30
+    assert circuit.allow()
+    assert circuit.state == breaker.HALF_OPEN
+    assert not circuit.allow()
+
+
+def test_successful_trial_call_closes_the_breaker(circuit, clock):
+    recoveries = metrics.circuit_events.value("test", "recovery")
+    for _ in range(4):
+        circuit.record_failure()
+    clock.now += 30
+    circuit.allow()
+    circuit.record_success()
+    assert circuit.state == breaker.CLOSED
+    assert circuit.allow()
+    assert metrics.circuit_events.value("test", "recovery") == recoveries + 1
+
+
+def test_failed_trial_call_opens_the_breaker_again(circuit, clock):
+    for _ in range(4):
+        circuit.record_failure()
+    clock.now += 30
+    circuit.allow()
+    circuit.record_failure()
+    assert circuit.state == breaker.OPEN
+    clock.now += 29
+    assert not circuit.allow()
@@ -0,0 +1,135 @@
+from grandpy.cache import (
+    MemoryCache,
+    SpatialCache,
+    SQLiteCache,
+    distance,
+    geohash,
+)
+
+
+class TestMemoryCache:
+    def test_get_returns_default_if_key_is_missing(self):
+        cache = MemoryCache()
+        assert cache.get("tour eiffel") is None
+        assert cache.get("tour eiffel", "default") == "default"
+
+    def test_get_returns_cached_value(self):
+        cache = MemoryCache()
+        cache.set("tour eiffel", {"latitude": 48.8})
+        assert cache.get("tour eiffel") == {"latitude": 48.8}
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = MemoryCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_are_evicted_beyond_maxbytes(self):
+        cache = MemoryCache(maxsize=100, maxbytes=10, sizeof=len)
+        cache.set("a", "xxxx")
+        cache.set("b", "xxxx")
+        cache.set("c", "xxxx")
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 8
+        cache.delete("b")
+        assert cache.stats()["bytes"] == 4
+
+    def test_peek_does_not_count_a_hit_nor_a_miss(self):
+        cache = MemoryCache()
+        cache.set("a", 1)
+        assert cache.peek("a") == 1
+        assert cache.peek("b") is None
+        assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+
+    def test_entries_expire_after_their_ttl(self, clock):
+        cache = MemoryCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=100)
+        clock.now += 10
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.stats()["expirations"] == 1
+
+    def test_stats_counts_hits_and_misses(self):
+        cache = MemoryCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    def test_missing_entries_are_loaded_from_backend(self, tmp_path, clock):
+        path = str(tmp_path / "cache.sqlite")
+        backend = SQLiteCache(path, clock=clock)
+        MemoryCache(backend=backend, ttl=60, clock=clock).set("a", 1)
+        backend.close()
+
+        cache = MemoryCache(
+            backend=SQLiteCache(path, clock=clock), clock=clock
+        )
+        assert cache.get("a") == 1
+        assert len(cache) == 1
+        clock.now += 60
+        assert cache.get("a") is None
+
+
+class TestSQLiteCache:
+    def test_values_survive_reopening(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = SQLiteCache(path)
+        cache.set("tour eiffel", {"address": "Champ de Mars"})
+        cache.set("nulle part", False)
+        cache.close()
+
+        cache = SQLiteCache(path)
+        assert cache.get("tour eiffel") == {"address": "Champ de Mars"}
+        assert cache.get("nulle part") is False
+        assert len(cache) == 2
+
+    def test_expired_entries_are_not_returned(self, tmp_path, clock):
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=5, clock=clock)
+        cache.set("a", 1)
+        clock.now += 5
+        assert cache.get("a") is None
+
+    def test_delete_and_clear(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.delete("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestSpatialCache:
+    def test_geohash_of_a_known_position(self):
+        assert geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+    def test_distance_between_two_positions(self):
+        # Tour Eiffel and Arc de Triomphe
+        assert 1700 < distance(48.8584, 2.2945, 48.8738, 2.2950) < 1750
+
+    def test_nearby_positions_share_the_cached_places(self):
+        cache = SpatialCache(MemoryCache(), precision=6)
+        places = [
+            {"pageid": 1, "lat": 48.8600, "lon": 2.2960},
+            {"pageid": 2, "lat": 48.8584, "lon": 2.2945},
+        ]
+        cache.set(48.8584, 2.2945, places)
+        found = cache.get(48.8601, 2.2961)
+        assert [place["pageid"] for place in found] == [1, 2]
+
+    def test_positions_of_other_cells_are_not_cached(self):
+        cache = SpatialCache(MemoryCache(), precision=6)
+        cache.set(48.8584, 2.2945, [])
+        assert cache.get(48.8738, 2.2950) is None
+        assert cache.get(48.8584, 2.2945, prefix="en:") is None
@@ -0,0 +1,65 @@
+import pytest
+
+from grandpy import batch, cli, warmup
+
+
+def test_parse_command_writes_one_cleaned_question_per_line(tmp_path, capsys):
+    questions = tmp_path / "questions.txt"
+    questions.write_text(
+        "Où se trouve la tour Eiffel ?\nSalut GrandPy, où est le Louvre\n"
+    )
+    cli.main(["parse", str(questions)])
+    assert capsys.readouterr().out == "tour eiffel \nlouvre\n"
+
+
+def test_parse_command_with_processes(tmp_path, capsys):
+    questions = tmp_path / "questions.txt"
+    questions.write_text("Où est le Louvre\n" * 5)
+    cli.main(["parse", str(questions), "--processes", "2", "--chunksize", "2"])
+    assert capsys.readouterr().out == "louvre\n" * 5
+
+
+def test_parse_command_parses_in_the_language_of_the_question(
+    tmp_path, capsys
+):
+    questions = tmp_path / "questions.txt"
+    questions.write_text("Where is the Eiffel Tower?\n" * 3)
+    cli.main(["parse", str(questions), "--processes", "2"])
+    assert capsys.readouterr().out == "eiffel tower \n" * 3
+
+
+def test_geocode_command_prints_the_counts(tmp_path, capsys, monkeypatch):
+    calls = []
+
+    def mock_geocode_file(questions_path, output_path, concurrency, rate):
+        calls.append((questions_path, output_path, concurrency, rate))
+        return {"found": 2, "not_found": 1, "failed": 0, "skipped": 4}
+
+    monkeypatch.setattr(batch, "geocode_file", mock_geocode_file)
+    cli.main(
+        ["geocode", "questions.txt", "out.jsonl", "-c", "4", "--rate", "5"]
+    )
+    assert calls == [("questions.txt", "out.jsonl", 4, 5.0)]
+    assert capsys.readouterr().out == (
+        "2 found, 1 not found, 0 failed, 4 already geocoded\n"
+    )
+
+
+@pytest.mark.parametrize("rate", ["0", "-1", "nan", "inf"])
+def test_geocode_command_rejects_a_rate_not_positive(rate, capsys):
+    with pytest.raises(SystemExit):
+        cli.main(["geocode", "questions.txt", "out.jsonl", "--rate", rate])
+    assert "not a positive number" in capsys.readouterr().err
+
+
+def test_warmup_command_prints_the_report(capsys, monkeypatch):
+    calls = []
+
+    def mock_warm_up(connections, places_path, count):
+        calls.append((connections, places_path, count))
+        return {"parser": 0.0125, "places_found": 10}
+
+    monkeypatch.setattr(warmup, "warm_up", mock_warm_up)
+    cli.main(["warmup", "--places", "places.txt", "--count", "10"])
+    assert calls == [(2, "places.txt", 10)]
+    assert capsys.readouterr().out == "parser: 12.5 ms\nplaces_found: 10\n"
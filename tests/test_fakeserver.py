@@ -0,0 +1,64 @@
+import pytest
+
+from grandpy import bot, fakeserver
+from grandpy.apis import googlemaps, session, wikipedia
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Fixture pointing the API clients to a fake server without latency."""
+    server = fakeserver.start_server(latency=0)
+    geocoding_url, wikipedia_url = fakeserver.urls(server)
+    monkeypatch.setattr(googlemaps, "GEOCODING_URL", geocoding_url)
+    monkeypatch.setattr(wikipedia, "WIKIPEDIA_URL", wikipedia_url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_retries():
+    session.configure(retries=0)
+    yield
+    session.configure()
+
+
+def test_geocoding_replays_the_recorded_responses(server):
+    client = googlemaps.GoogleGeocodingClient()
+    assert client.search("openclassrooms")["address"].startswith("7 Cité")
+    assert client.search("tour numéro 12")["address"].startswith("Champ")
+
+
+def test_geocoding_of_unknown_address_without_default(server):
+    del server.fixtures["geocoding"]["*"]
+    client = googlemaps.GoogleGeocodingClient()
+    with pytest.raises(googlemaps.GoogleGeocodingNothingFoundError):
+        client.search("nulle part")
+
+
+def test_geosearch_with_data_and_missing_pages(server):
+    client = wikipedia.WikipediaClient()
+    pages = client.geosearch(48.8583, 2.2944, with_data=True)
+    titles = [page.title for page in pages[:2]]
+    assert titles == ["Tour Eiffel", "Champ-de-Mars"]
+    assert not pages[2].loaded
+    assert client.load_pages(pages[2:]) == []
+    assert pages[2].missing
+
+
+def test_errors_are_answered_at_the_error_rate(server, no_retries):
+    server.error_rate = 1
+    with pytest.raises(googlemaps.GoogleGeocodingError):
+        googlemaps.GoogleGeocodingClient().search("tour eiffel")
+
+
+def test_answer_with_the_backends_of_the_fake_server(server):
+    bot.use_backends(
+        googlemaps.GoogleGeocodingClient(), wikipedia.WikipediaClient()
+    )
+    try:
+        response = bot.answer("Où se trouve la tour Eiffel ?")
+    finally:
+        bot.use_backends()
+    assert response["found"] is True
+    assert response["title"] == "Tour Eiffel"
@@ -0,0 +1,50 @@
+import pytest
+
+from grandpy import fastjson
+
+DATA = {
+    "address": "Champ de Mars, 75007 Paris, France",
+    "latitude": 48.8583701,
+    "title": "Tour Eiffel",
+    "summary": "La tour Eiffel est une tour de fer puddlé.",
+    "pages": [1359783, 117957],
+    "found": True,
+    "missing": None,
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def library(request, monkeypatch):
+    """Fixture running the test with orjson, if installed, and the stdlib."""
+    if request.param == "json":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    elif fastjson.orjson is None:
+        pytest.skip("orjson is not installed")
+    yield request.param
+
+
+def test_dumps_returns_compact_utf8_json(library):
+    assert fastjson.dumps({"title": "Musée", "id": 1}) == (
+        '{"title":"Musée","id":1}'.encode()
+    )
+
+
+def test_loads_decodes_bytes_and_str(library):
+    body = fastjson.dumps(DATA)
+    assert fastjson.loads(body) == DATA
+    assert fastjson.loads(body.decode()) == DATA
+
+
+def test_both_libraries_give_the_same_json(monkeypatch):
+    if fastjson.orjson is None:
+        pytest.skip("orjson is not installed")
+    fast = fastjson.dumps(DATA)
+    monkeypatch.setattr(fastjson, "orjson", None)
+    assert fastjson.dumps(DATA) == fast
+
+
+def test_response_json_decodes_the_body_of_the_response(library):
+    class MockResponse:
+        content = fastjson.dumps(DATA)
+
+    assert fastjson.response_json(MockResponse()) == DATA
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from grandpy import bot, cli
+from grandpy.gazetteer import Gazetteer, build, read_places
+
+PLACES = [
+    {
+        "name": "Tour Eiffel",
+        "address": "Champ de Mars, 5 Avenue Anatole France, 75007 Paris",
+        "latitude": 48.8583701,
+        "longitude": 2.2944813,
+    },
+    {
+        "name": "Musée du Louvre",
+        "latitude": 48.8606111,
+        "longitude": 2.337644,
+    },
+]
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = str(tmp_path / "gazetteer.sqlite3")
+    build(path, PLACES)
+    yield Gazetteer(path)
+
+
+def test_search_finds_the_place_of_a_parsed_question(gazetteer):
+    assert gazetteer.search("tour eiffel ") == {
+        "address": "Champ de Mars, 5 Avenue Anatole France, 75007 Paris",
+        "latitude": 48.8583701,
+        "longitude": 2.2944813,
+    }
+
+
+def test_names_are_indexed_like_the_parsed_questions(gazetteer):
+    # "du" is a stop word and the accents are removed by the parser
+    assert gazetteer.search("musee louvre")["address"] == "Musée du Louvre"
+
+
+def test_names_are_indexed_in_their_language(tmp_path):
+    path = str(tmp_path / "gazetteer.sqlite3")
+    place = {"name": "The Museum of Modern Art", "latitude": 1, "longitude": 2}
+    build(path, [place])
+    question = bot.get_parser().parse("Where is the Museum of Modern Art?")
+    assert Gazetteer(path).search(question)["latitude"] == 1
+
+
+def test_search_tolerates_a_misspelling(gazetteer):
+    assert gazetteer.search("tour eifel")["latitude"] == 48.8583701
+
+
+def test_search_returns_none_for_an_unknown_place(gazetteer):
+    assert gazetteer.search("openclassrooms") is None
+    assert gazetteer.search("") is None
+    assert gazetteer.stats()["misses"] == 2
+
+
+def test_read_places_of_csv_and_json_files(tmp_path):
+    csv_path = tmp_path / "places.csv"
+    csv_path.write_text("name,latitude,longitude\nTour Eiffel,48.85,2.29\n")
+    json_path = tmp_path / "places.json"
+    json_path.write_text(json.dumps(PLACES))
+    assert read_places(str(csv_path)) == [
+        {"name": "Tour Eiffel", "latitude": "48.85", "longitude": "2.29"}
+    ]
+    assert read_places(str(json_path)) == PLACES
+
+
+def test_gazetteer_command_builds_the_gazetteer(tmp_path, capsys):
+    source = tmp_path / "places.json"
+    source.write_text(json.dumps(PLACES))
+    database = str(tmp_path / "gazetteer.sqlite3")
+    cli.main(["gazetteer", str(source), database])
+    assert capsys.readouterr().out.startswith("2 places written")
+    assert len(Gazetteer(database)) == 2
@@ -1,7 +1,11 @@
+import asyncio
+
 import pytest
 import requests
 
-from grandpy.apis import googlemaps
+from grandpy import fastjson, metrics
+from grandpy.apis import breaker, googlemaps, ratelimit, session
+from grandpy.cache import MemoryCache
 
 
 GOOGLE_GEOCODING_SUCCESS_RESPONSE = {
@@ -29,31 +33,40 @@ def client():
     yield client
 
 
+@pytest.fixture
+def cached_client():
+    """Fixture creating a GoogleGeocodingClient client with a cache."""
+    client = googlemaps.GoogleGeocodingClient(cache=MemoryCache())
+    yield client
+
+
 @pytest.fixture
 def mock_get(monkeypatch):
-    """Fixture replacing requests.get function with an imitation."""
+    """Fixture replacing session.get function with an imitation."""
 
     class MockRequestsResponse:
         def raise_for_status(self):
             pass
 
-        def json(self):
-            return GOOGLE_GEOCODING_SUCCESS_RESPONSE
+        @property
+        def content(self):
+            return fastjson.dumps(GOOGLE_GEOCODING_SUCCESS_RESPONSE)
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
+            "timeout": timeout,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_with_http_error(monkeypatch):
-    """Fixture replacing requests.get function with an imitation
+    """Fixture replacing session.get function with an imitation
      raising a request.HTTPError via raise_for_status."""
 
     class MockRequestsResponse:
@@ -62,54 +75,56 @@ def mock_get_with_http_error(monkeypatch):
                 "Exception raised by mock_get_with_http_error"
             )
 
-        def json(self):
-            return GOOGLE_GEOCODING_SUCCESS_RESPONSE
+        @property
+        def content(self):
+            return fastjson.dumps(GOOGLE_GEOCODING_SUCCESS_RESPONSE)
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_with_connection_error(monkeypatch):
-    """Fixture replacing requests.get function with an imitation
+    """Fixture replacing session.get function with an imitation
      raising a requests.ConnectionError."""
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         raise requests.ConnectionError(
             "Exception raised by mock_get_with_http_error"
         )
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_with_no_result(monkeypatch):
-    """Fixture replacing requests.get function with an imitation
+    """Fixture replacing session.get function with an imitation
      simulating an unsuccessful call to the API."""
 
     class MockRequestsResponse:
         def raise_for_status(self):
             pass
 
-        def json(self):
-            return GOOGLE_GEOCODING_NOTHING_FOUND_RESPONSE
+        @property
+        def content(self):
+            return fastjson.dumps(GOOGLE_GEOCODING_NOTHING_FOUND_RESPONSE)
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
@@ -203,3 +218,300 @@ class TestGoogleGeocodingClient:
         with pytest.raises(googlemaps.GoogleGeocodingError):
             client.search("")
             client.search("   ")
+
+
+class TestGoogleGeocodingClientCache:
+    def test_search_method_calls_api_once_per_address(
+        self, cached_client, mock_get
+    ):
+        first = cached_client.search("tour eiffel")
+        del mock_get.called_with_parameters
+        second = cached_client.search("tour eiffel")
+        assert first == second
+        assert not hasattr(mock_get, "called_with_parameters")
+        assert cached_client.cache.stats()["hits"] == 1
+
+    def test_search_method_caches_addresses_not_found(
+        self, cached_client, mock_get_with_no_result
+    ):
+        with pytest.raises(googlemaps.GoogleGeocodingNothingFoundError):
+            cached_client.search("nulle part")
+        del mock_get_with_no_result.called_with_parameters
+        with pytest.raises(googlemaps.GoogleGeocodingNothingFoundError):
+            cached_client.search("nulle part")
+        assert not hasattr(mock_get_with_no_result, "called_with_parameters")
+
+    def test_search_method_does_not_cache_http_errors(
+        self, cached_client, mock_get_with_http_error
+    ):
+        with pytest.raises(googlemaps.GoogleGeocodingError):
+            cached_client.search("tour eiffel")
+        assert len(cached_client.cache) == 0
+
+
+class TestGoogleGeocodingClientTimeouts:
+    def test_search_method_sends_the_timeouts_of_the_client(self, mock_get):
+        client = googlemaps.GoogleGeocodingClient(
+            connect_timeout=1, read_timeout=2
+        )
+        client.search("tour eiffel")
+        assert mock_get.called_with_parameters["timeout"] == (1, 2)
+
+
+class TestGoogleGeocodingClientCircuitBreaker:
+    def test_search_method_records_the_failures_in_the_breaker(
+        self, mock_get_with_connection_error
+    ):
+        circuit = breaker.CircuitBreaker("test", minimum_calls=2)
+        client = googlemaps.GoogleGeocodingClient(circuit_breaker=circuit)
+        for _ in range(2):
+            with pytest.raises(googlemaps.GoogleGeocodingError):
+                client.search("tour eiffel")
+        assert circuit.state == breaker.OPEN
+
+    def test_search_method_fails_fast_while_the_breaker_is_open(
+        self, mock_get
+    ):
+        circuit = breaker.CircuitBreaker("test", minimum_calls=1)
+        circuit.record_failure()
+        client = googlemaps.GoogleGeocodingClient(circuit_breaker=circuit)
+        with pytest.raises(googlemaps.GoogleGeocodingUnavailableError):
+            client.search("tour eiffel")
+        assert not hasattr(mock_get, "called_with_parameters")
+
+    def test_search_method_fails_without_calling_once_the_deadline_is_spent(
+        self, mock_get
+    ):
+        circuit = breaker.CircuitBreaker("test", minimum_calls=1)
+        client = googlemaps.GoogleGeocodingClient(circuit_breaker=circuit)
+        with session.deadline(0):
+            with pytest.raises(
+                googlemaps.GoogleGeocodingDeadlineExceededError
+            ):
+                client.search("tour eiffel")
+        assert not hasattr(mock_get, "called_with_parameters")
+        assert circuit.state == breaker.CLOSED
+
+    def test_search_method_does_not_record_the_deadline_exceeded(
+        self, monkeypatch
+    ):
+        def mock_requests_get(url, params, timeout=None):
+            raise session.DeadlineExceeded("The deadline is exceeded.")
+
+        monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
+        circuit = breaker.CircuitBreaker("test", minimum_calls=1)
+        client = googlemaps.GoogleGeocodingClient(circuit_breaker=circuit)
+        with pytest.raises(googlemaps.GoogleGeocodingDeadlineExceededError):
+            client.search("tour eiffel")
+        assert circuit.state == breaker.CLOSED
+
+    def test_search_method_raises_custom_exception_on_timeout(
+        self, client, monkeypatch
+    ):
+        def mock_requests_get(url, params, timeout=None):
+            raise requests.ReadTimeout("Read timed out.")
+
+        monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
+        with pytest.raises(googlemaps.GoogleGeocodingError, match="in time"):
+            client.search("tour eiffel")
+
+
+@pytest.fixture
+def mock_get_with_status(monkeypatch):
+    """Fixture replacing session.get function with an imitation answering
+     the status given by its status attribute."""
+
+    class MockRequestsResponse:
+        def raise_for_status(self):
+            pass
+
+        @property
+        def content(self):
+            return fastjson.dumps(
+                {
+                    "results": [],
+                    "status": mock_requests_get.status,
+                    "error_message": "Error message.",
+                }
+            )
+
+    def mock_requests_get(url, params, timeout=None):
+        return MockRequestsResponse()
+
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
+    yield mock_requests_get
+
+
+class TestGoogleGeocodingClientStatuses:
+    @pytest.mark.parametrize(
+        "status, exception",
+        [
+            (
+                "OVER_QUERY_LIMIT",
+                googlemaps.GoogleGeocodingOverQueryLimitError,
+            ),
+            (
+                "OVER_DAILY_LIMIT",
+                googlemaps.GoogleGeocodingOverQueryLimitError,
+            ),
+            ("REQUEST_DENIED", googlemaps.GoogleGeocodingRequestDeniedError),
+            ("UNKNOWN_ERROR", googlemaps.GoogleGeocodingError),
+        ],
+    )
+    def test_search_method_raises_an_exception_by_failure_status(
+        self, mock_get_with_status, status, exception
+    ):
+        mock_get_with_status.status = status
+        circuit = breaker.CircuitBreaker("test", minimum_calls=1)
+        client = googlemaps.GoogleGeocodingClient(circuit_breaker=circuit)
+        with pytest.raises(exception, match="Error message"):
+            client.search("tour eiffel")
+        assert circuit.state == breaker.OPEN
+
+    def test_search_method_does_not_cache_failure_statuses(
+        self, cached_client, mock_get_with_status
+    ):
+        mock_get_with_status.status = "OVER_QUERY_LIMIT"
+        with pytest.raises(googlemaps.GoogleGeocodingOverQueryLimitError):
+            cached_client.search("tour eiffel")
+        assert len(cached_client.cache) == 0
+
+    def test_search_method_raises_custom_exception_on_invalid_request(
+        self, mock_get_with_status
+    ):
+        mock_get_with_status.status = "INVALID_REQUEST"
+        circuit = breaker.CircuitBreaker("test", minimum_calls=1)
+        client = googlemaps.GoogleGeocodingClient(circuit_breaker=circuit)
+        with pytest.raises(googlemaps.GoogleGeocodingError, match="invalid"):
+            client.search("tour eiffel")
+        assert circuit.state == breaker.CLOSED
+
+
+class StoppedClock:
+    """Clock of the rate limiters, stopped so that the tokens never refill."""
+
+    def __call__(self):
+        return 1000.0
+
+
+class TestGoogleGeocodingClientLimits:
+    def test_search_method_waits_for_the_rate_limiter(
+        self, mock_get, monkeypatch
+    ):
+        slept = []
+        monkeypatch.setattr(googlemaps.time, "sleep", slept.append)
+        bucket = ratelimit.TokenBucket(4, burst=1, clock=StoppedClock())
+        client = googlemaps.GoogleGeocodingClient(rate_limiter=bucket)
+        delayed = metrics.throttled_calls.value("geocoding", "delayed")
+        client.search("tour eiffel")
+        client.search("tour eiffel")
+        assert slept == [pytest.approx(0.25)]
+        assert (
+            metrics.throttled_calls.value("geocoding", "delayed")
+            == delayed + 1
+        )
+
+    def test_search_method_fails_fast_beyond_the_max_wait(self, mock_get):
+        bucket = ratelimit.TokenBucket(1, burst=1, clock=StoppedClock())
+        client = googlemaps.GoogleGeocodingClient(
+            rate_limiter=bucket, max_wait=0.5
+        )
+        client.search("tour eiffel")
+        del mock_get.called_with_parameters
+        with pytest.raises(googlemaps.GoogleGeocodingThrottledError):
+            client.search("musée du louvre")
+        assert not hasattr(mock_get, "called_with_parameters")
+
+    def test_search_method_waits_no_longer_than_the_deadline(
+        self, mock_get, monkeypatch
+    ):
+        monkeypatch.setattr(googlemaps.time, "sleep", lambda delay: None)
+        bucket = ratelimit.TokenBucket(1, burst=1, clock=StoppedClock())
+        client = googlemaps.GoogleGeocodingClient(rate_limiter=bucket)
+        client.search("tour eiffel")
+        with session.deadline(0.5):
+            with pytest.raises(googlemaps.GoogleGeocodingOverQueryLimitError):
+                client.search("musée du louvre")
+
+    def test_search_method_counts_the_calls_in_the_quota(self, mock_get):
+        quota = ratelimit.DailyQuota(1)
+        client = googlemaps.GoogleGeocodingClient(
+            cache=MemoryCache(), quota=quota
+        )
+        client.search("tour eiffel")
+        client.search("tour eiffel")
+        assert quota.used() == 1
+        with pytest.raises(googlemaps.GoogleGeocodingQuotaExceededError):
+            client.search("musée du louvre")
+
+    def test_search_method_keeps_the_trial_call_when_the_quota_is_reached(
+        self, mock_get
+    ):
+        circuit = breaker.CircuitBreaker(
+            "test", minimum_calls=1, reset_timeout=0
+        )
+        circuit.record_failure()
+        quota = ratelimit.DailyQuota(1)
+        quota.consume()
+        client = googlemaps.GoogleGeocodingClient(
+            circuit_breaker=circuit, quota=quota
+        )
+        with pytest.raises(googlemaps.GoogleGeocodingQuotaExceededError):
+            client.search("tour eiffel")
+        assert circuit.state == breaker.OPEN
+
+
+@pytest.fixture
+def mock_async_get(monkeypatch):
+    """Fixture replacing session.async_get function with an imitation."""
+
+    class MockResponse:
+        @property
+        def content(self):
+            return fastjson.dumps(mock_async_get.data)
+
+    async def mock_async_get(url, params, timeout=None):
+        if mock_async_get.error is not None:
+            raise mock_async_get.error
+        mock_async_get.called_with_parameters = {"url": url, "params": params}
+        return MockResponse()
+
+    mock_async_get.data = GOOGLE_GEOCODING_SUCCESS_RESPONSE
+    mock_async_get.error = None
+    monkeypatch.setattr('grandpy.apis.session.async_get', mock_async_get)
+    yield mock_async_get
+
+
+class TestGoogleGeocodingClientAsync:
+    def test_search_async_returns_same_result_as_search(
+        self, client, mock_async_get
+    ):
+        result = asyncio.run(client.search_async("tour eiffel"))
+        assert result["address"] == (
+            GOOGLE_GEOCODING_SUCCESS_RESPONSE["results"][0][
+                "formatted_address"
+            ]
+        )
+        assert (
+            mock_async_get.called_with_parameters["params"]["address"]
+            == "tour eiffel"
+        )
+
+    def test_search_async_raises_custom_exception_if_nothing_found(
+        self, client, mock_async_get
+    ):
+        mock_async_get.data = GOOGLE_GEOCODING_NOTHING_FOUND_RESPONSE
+        with pytest.raises(googlemaps.GoogleGeocodingNothingFoundError):
+            asyncio.run(client.search_async("tour eiffel"))
+
+    def test_search_async_raises_custom_exception_in_case_of_http_error(
+        self, client, mock_async_get
+    ):
+        mock_async_get.error = requests.ConnectionError("connection refused")
+        with pytest.raises(googlemaps.GoogleGeocodingError):
+            asyncio.run(client.search_async("tour eiffel"))
+
+    def test_search_async_uses_the_cache(self, cached_client, mock_async_get):
+        asyncio.run(cached_client.search_async("tour eiffel"))
+        mock_async_get.error = requests.ConnectionError("not called")
+        assert asyncio.run(cached_client.search_async("tour eiffel"))
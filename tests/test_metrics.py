@@ -0,0 +1,74 @@
+import pytest
+
+from grandpy import metrics
+
+
+@pytest.fixture
+def registry():
+    yield metrics.Registry()
+
+
+def test_counter_renders_one_sample_per_label_values(registry):
+    counter = registry.register(
+        metrics.Counter("errors_total", "Errors.", labels=("exception",))
+    )
+    counter.inc("GoogleGeocodingError")
+    counter.inc("GoogleGeocodingError")
+    counter.inc("WikipediaNothingFound")
+    assert registry.render() == (
+        "# HELP errors_total Errors.\n"
+        "# TYPE errors_total counter\n"
+        'errors_total{exception="GoogleGeocodingError"} 2\n'
+        'errors_total{exception="WikipediaNothingFound"} 1\n'
+    )
+
+
+def test_histogram_renders_cumulative_buckets(registry):
+    histogram = registry.register(
+        metrics.Histogram(
+            "duration_seconds", "Durations.", ("stage",), buckets=(0.1, 1)
+        )
+    )
+    histogram.observe(0.05, "parse")
+    histogram.observe(0.1, "parse")
+    histogram.observe(2, "parse")
+    lines = registry.render().splitlines()
+    assert 'duration_seconds_bucket{stage="parse",le="0.1"} 2' in lines
+    assert 'duration_seconds_bucket{stage="parse",le="1"} 2' in lines
+    assert 'duration_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'duration_seconds_sum{stage="parse"} 2.15' in lines
+    assert 'duration_seconds_count{stage="parse"} 3' in lines
+
+
+def test_gauge_reads_its_values_from_its_function(registry):
+    registry.register(
+        metrics.Gauge(
+            "cache", "Cache.", ("stat",), function=lambda: [(("hits",), 3)]
+        )
+    )
+    assert 'cache{stat="hits"} 3' in registry.render().splitlines()
+
+
+def test_timer_records_the_duration_of_a_stage():
+    count = metrics.stage_duration.count("test")
+    with metrics.timer("test"):
+        pass
+    assert metrics.stage_duration.count("test") == count + 1
+
+
+def test_disabled_timer_records_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    count = metrics.stage_duration.count("test")
+    with metrics.timer("test"):
+        pass
+    metrics.count_error(ValueError())
+    assert metrics.stage_duration.count("test") == count
+    assert metrics.upstream_errors.value("ValueError") == 0
+
+
+def test_count_error_counts_by_exception_class():
+    class CustomError(Exception):
+        pass
+
+    metrics.count_error(CustomError())
+    assert metrics.upstream_errors.value("CustomError") == 1
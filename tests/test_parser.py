@@ -1,5 +1,8 @@
-import string
 import json
+import os
+import string
+
+import pytest
 
 from grandpy import parser
 
@@ -147,3 +150,196 @@ def test_remove_stop_words_does_nothing_if_not_stop_word_is_present():
     sentence = "pasunstopword pasunstopword pasunstopword"
     cleaned = parser.remove_stop_words(sentence)
     assert sentence == cleaned
+
+
+SENTENCES = [
+    "Salut GrandPy ! Est-ce que tu connais l'adresse d'OpenClassrooms ?",
+    "Bonsoir Grandpy, j'espère que tu as passé une belle semaine. "
+    "Est-ce que tu pourrais m'indiquer l'adresse de la tour eiffel? Merci",
+    "Où se trouve le musée du Louvre ?",
+    "où est situé   le  château de Versailles",
+    "Peux-tu m'en dire plus sur la cathédrale Notre-Dame de Paris ?",
+    "ou est ou est la gare de lyon",
+    "",
+]
+
+
+def legacy_parse(sentence):
+    for cleaner in parser.Parser.cleaners:
+        sentence = cleaner(sentence)
+    return sentence
+
+
+def test_parser_gives_the_same_result_as_the_reference_pipeline():
+    parser_object = parser.Parser()
+    for sentence in SENTENCES:
+        assert parser_object.parse(sentence) == legacy_parse(sentence)
+
+
+def test_question_tag_matcher_gives_the_same_result_as_extract_place():
+    with open("data/questions.json") as jsonfile:
+        question_tags = json.load(jsonfile)
+    matchers = [
+        parser.QuestionTagMatcher(question_tags),
+        parser.QuestionTagMatcher(question_tags, sequential_threshold=0),
+    ]
+    for sentence in SENTENCES + ["ou est situe a ou est b", "avant après"]:
+        sentence = sentence.lower()
+        for matcher in matchers:
+            assert matcher.extract(sentence) == parser.extract_place(sentence)
+
+
+def test_question_tag_matcher_counts_non_overlapping_occurrences():
+    matcher = parser.QuestionTagMatcher(
+        ["aa", "b"], sequential_threshold=0
+    )
+    assert matcher.extract("xaaay") == "ay"
+    assert matcher.extract("aaaa b c") == " c"
+
+
+def test_question_tag_matcher_finds_all_occurrences():
+    matcher = parser.QuestionTagMatcher(["ou est ", "est situe ", "ou "])
+    assert matcher.occurrences("ou est situe x") == [
+        (3, 2),
+        (7, 0),
+        (13, 1),
+    ]
+
+
+def test_question_tag_matcher_leftmost_longest_policy():
+    matcher = parser.QuestionTagMatcher(
+        ["ou se trouve ", "m'indiquer ", "m'indiquer ou "], "leftmost_longest"
+    )
+    sentence = "peux-tu m'indiquer ou se trouve la tour"
+    assert matcher.extract(sentence) == "se trouve la tour"
+    assert matcher.extract("avant après") == "avant après"
+
+
+def test_question_tag_matcher_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        parser.QuestionTagMatcher(["ou est "], "random")
+
+
+def test_parser_does_not_reload_unmodified_data_files():
+    parser_object = parser.Parser()
+    assert parser_object.reload() is False
+
+
+def test_parser_reloads_modified_data_files(tmp_path):
+    questions_path = tmp_path / "questions.json"
+    stop_words_path = tmp_path / "fr.json"
+    questions_path.write_text(json.dumps(["ou est "]))
+    stop_words_path.write_text(json.dumps(["la"]))
+    parser_object = parser.Parser(str(questions_path), str(stop_words_path))
+    assert parser_object.parse("ou est la tour eiffel") == "tour eiffel"
+
+    questions_path.write_text(json.dumps(["ou se trouve "]))
+    stop_words_path.write_text(json.dumps(["tour"]))
+    os.utime(questions_path, ns=(0, 0))
+    os.utime(stop_words_path, ns=(0, 0))
+    assert parser_object.reload() is True
+    assert parser_object.parse("ou se trouve la tour eiffel") == "la eiffel"
+
+
+def test_normalize_gives_the_same_result_as_the_first_three_cleaners():
+    sentences = SENTENCES + [
+        "  \t  Ça, c'est   « la »   Tour  ,  ",
+        "a , b ,  c",
+        "\\u00e7a ²  ½ ça",
+    ]
+    for sentence in sentences:
+        expected = parser.normalize_spaces(
+            parser.remove_all_accents(parser.transform_to_lowercase(sentence))
+        )
+        assert parser.normalize(sentence) == expected
+
+
+def test_squeeze_spaces_gives_the_same_result_as_normalize_spaces():
+    for sentence in ["", "   ", "a  b", " a, b", "a ,  b", "a\t\n b", "1 2 a"]:
+        assert parser.squeeze_spaces(sentence) == parser.normalize_spaces(
+            sentence
+        )
+
+
+def test_parser_handles_long_sentences():
+    sentence = "Où se trouve, la  tour  Eiffel ?! " * 2000
+    parser_object = parser.Parser()
+    assert parser_object.parse(sentence) == legacy_parse(sentence)
+
+
+def test_parse_many_yields_results_in_order():
+    parser_object = parser.Parser()
+    results = parser_object.parse_many(iter(SENTENCES))
+    assert list(results) == [parser_object.parse(s) for s in SENTENCES]
+
+
+def test_parse_many_with_processes_yields_results_in_order():
+    parser_object = parser.Parser()
+    sentences = SENTENCES * 10
+    results = parser_object.parse_many(sentences, processes=2, chunksize=3)
+    assert list(results) == [parser_object.parse(s) for s in sentences]
+
+
+def test_parse_many_with_processes_keeps_the_policy(tmp_path):
+    questions_path = tmp_path / "questions.json"
+    stop_words_path = tmp_path / "fr.json"
+    questions_path.write_text(json.dumps(["zz ", "yy trouve "]))
+    stop_words_path.write_text(json.dumps([]))
+    parser_object = parser.Parser(
+        str(questions_path), str(stop_words_path), "leftmost_longest"
+    )
+    sentences = ["yy trouve zz tour"] * 4
+    results = parser_object.parse_many(sentences, processes=2, chunksize=1)
+    assert list(results) == [parser_object.parse(s) for s in sentences]
+
+
+@pytest.fixture(scope="module")
+def multilingual_parser():
+    return parser.MultilingualParser()
+
+
+@pytest.mark.parametrize(
+    "sentence, language",
+    [
+        ("Salut GrandPy ! Où se trouve la tour Eiffel ?", "fr"),
+        ("Hello GrandPy, where is the Eiffel Tower located?", "en"),
+        ("Hallo Opa, wo liegt das Brandenburger Tor?", "de"),
+        ("Louvre", "fr"),
+        ("Connais-tu l'adresse de The Museum of Modern Art ?", "fr"),
+    ],
+)
+def test_multilingual_parser_detects_the_language(
+    multilingual_parser, sentence, language
+):
+    assert multilingual_parser.detect(parser.normalize(sentence)) == language
+
+
+def test_multilingual_parser_parses_in_the_language_detected(
+    multilingual_parser,
+):
+    assert multilingual_parser.parse_with_language(
+        "Hello GrandPy, where is the Eiffel Tower located?"
+    ) == ("en", "eiffel tower ")
+    assert multilingual_parser.parse_with_language(
+        "Wo befindet sich die Frauenkirche in Dresden?"
+    ) == ("de", "frauenkirche dresden ")
+
+
+def test_multilingual_parser_parses_french_like_the_parser(
+    multilingual_parser,
+):
+    parser_object = parser.Parser()
+    for sentence in SENTENCES:
+        assert multilingual_parser.parse(sentence) == parser_object.parse(
+            sentence
+        )
+
+
+def test_multilingual_parser_with_a_single_language_does_not_detect():
+    multilingual_parser = parser.MultilingualParser(["fr"])
+    assert multilingual_parser.detect("where is the eiffel tower") == "fr"
+
+
+def test_multilingual_parser_rejects_unknown_languages():
+    with pytest.raises(ValueError):
+        parser.MultilingualParser(["fr", "it"])
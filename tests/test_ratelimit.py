@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from grandpy.apis import ratelimit
+
+
+@pytest.fixture
+def limits_path(tmp_path):
+    yield str(tmp_path / "limits.sqlite3")
+
+
+def test_bucket_allows_a_burst_without_waiting(clock):
+    bucket = ratelimit.TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+
+
+def test_bucket_spaces_the_calls_beyond_the_burst(clock):
+    bucket = ratelimit.TokenBucket(rate=2, burst=1, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_bucket_refills_over_time_up_to_the_burst(clock):
+    bucket = ratelimit.TokenBucket(rate=2, burst=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 10
+    assert [bucket.reserve() for _ in range(2)] == [0, 0]
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_bucket_keeps_the_latest_update_time(clock):
+    bucket = ratelimit.TokenBucket(rate=1, burst=1, clock=clock)
+    assert bucket.reserve() == 0
+    # Clock of another process sharing the bucket, 5 seconds behind
+    clock.now -= 5
+    assert bucket.reserve() == pytest.approx(1)
+    clock.now += 5.5
+    assert bucket.reserve() == pytest.approx(1.5)
+
+
+def test_bucket_burst_defaults_to_the_rate_rounded_up(clock):
+    assert ratelimit.TokenBucket(rate=2.5, clock=clock).burst == 3
+    assert ratelimit.TokenBucket(rate=0.1, clock=clock).burst == 1
+
+
+def test_bucket_rejects_a_rate_not_positive():
+    with pytest.raises(ValueError):
+        ratelimit.TokenBucket(rate=0)
+
+
+def test_acquire_waits_for_the_token(clock, monkeypatch):
+    slept = []
+    monkeypatch.setattr(ratelimit.time, "sleep", slept.append)
+    bucket = ratelimit.TokenBucket(rate=4, burst=1, clock=clock)
+    bucket.acquire()
+    bucket.acquire()
+    assert slept == [pytest.approx(0.25)]
+
+
+def test_acquire_async_waits_for_the_token(clock):
+    bucket = ratelimit.TokenBucket(rate=100, burst=1, clock=clock)
+
+    async def acquire_twice():
+        await bucket.acquire_async()
+        await bucket.acquire_async()
+
+    asyncio.run(acquire_twice())
+    assert bucket.reserve() == pytest.approx(0.02)
+
+
+def test_bucket_rejects_the_calls_waiting_beyond_max_wait(clock):
+    bucket = ratelimit.TokenBucket(rate=2, burst=1, clock=clock)
+    bucket.reserve()
+    assert bucket.reserve(max_wait=0.4) is None
+    # The rejected call did not take a token
+    assert bucket.reserve(max_wait=0.5) == pytest.approx(0.5)
+
+
+def test_acquire_returns_false_beyond_max_wait(clock, monkeypatch):
+    monkeypatch.setattr(ratelimit.time, "sleep", pytest.fail)
+    bucket = ratelimit.TokenBucket(rate=1, burst=1, clock=clock)
+    assert bucket.acquire(max_wait=0)
+    assert not bucket.acquire(max_wait=0)
+
+
+def test_buckets_share_their_tokens_through_sqlite(clock, limits_path):
+    first = ratelimit.TokenBucket(2, 1, path=limits_path, clock=clock)
+    second = ratelimit.TokenBucket(2, 1, path=limits_path, clock=clock)
+    other = ratelimit.TokenBucket(2, 1, path=limits_path, name="other")
+    assert first.reserve() == 0
+    assert second.reserve() == pytest.approx(0.5)
+    assert other.reserve() == 0
+
+
+def test_quota_counts_the_calls_of_the_day(clock):
+    quota = ratelimit.DailyQuota(2, clock=clock)
+    assert quota.consume()
+    assert quota.consume()
+    assert not quota.consume()
+    assert quota.used() == 2
+
+
+def test_quota_resets_at_midnight_utc(clock):
+    clock.now = 86400 - 1
+    quota = ratelimit.DailyQuota(1, clock=clock)
+    assert quota.consume()
+    clock.now += 1
+    assert quota.used() == 0
+    assert quota.consume()
+
+
+def test_quotas_share_their_count_through_sqlite(clock, limits_path):
+    first = ratelimit.DailyQuota(2, path=limits_path, clock=clock)
+    second = ratelimit.DailyQuota(2, path=limits_path, clock=clock)
+    assert first.consume()
+    assert second.consume()
+    assert not first.consume()
+    assert second.used() == 2
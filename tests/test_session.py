@@ -0,0 +1,152 @@
+import http.server
+import threading
+import time
+
+import pytest
+import requests
+
+from grandpy.apis import session
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers with the statuses listed in the server, then with 200."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        statuses = self.server.statuses
+        status = statuses.pop(0) if statuses else 200
+        body = b'{"status": "OK"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Fixture starting a local HTTP server in a thread."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.statuses = []
+    server.delay = 0
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.05,), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pool():
+    """Fixture giving a fresh pool of connections to each test."""
+    session.configure(backoff_factor=0)
+    yield session
+    session.close()
+
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_get_reuses_the_same_connection(server, pool):
+    for _ in range(5):
+        pool.get(url(server)).raise_for_status()
+    assert pool.stats() == {"connections": 1, "requests": 5}
+
+
+def test_get_retries_on_server_errors(server, pool):
+    server.statuses = [503, 429]
+    response = pool.get(url(server))
+    assert response.status_code == 200
+    assert pool.stats()["requests"] == 3
+
+
+def test_get_returns_the_last_response_when_retries_are_exhausted(
+    server, pool
+):
+    session.configure(retries=1, backoff_factor=0)
+    server.statuses = [500, 500, 500]
+    response = pool.get(url(server))
+    assert response.status_code == 500
+
+
+def test_sessions_are_per_thread_and_share_the_adapter(pool):
+    sessions = []
+    thread = threading.Thread(
+        target=lambda: sessions.append(pool.get_session())
+    )
+    thread.start()
+    thread.join()
+    assert sessions[0] is not pool.get_session()
+    assert sessions[0].get_adapter("https://") is pool.get_adapter()
+    assert pool.get_session().get_adapter("https://") is pool.get_adapter()
+
+
+def test_configure_replaces_the_sessions(pool):
+    previous = pool.get_session()
+    session.configure(pool_size=2)
+    assert pool.get_session() is not previous
+
+
+def test_deadline_bounds_the_timeouts():
+    assert session.timeouts() == (
+        session.CONNECT_TIMEOUT,
+        session.READ_TIMEOUT,
+    )
+    with session.deadline(1):
+        connect, read = session.timeouts()
+        assert 0.9 < connect <= 1 and 0.9 < read <= 1
+        # A nested deadline can only shorten the current one
+        with session.deadline(10):
+            assert session.remaining() <= 1
+    assert session.remaining() is None
+
+
+def test_get_fails_once_the_deadline_is_exceeded(server, pool):
+    server.delay = 0.2
+    session.configure(retries=0)
+    start = time.perf_counter()
+    with session.deadline(0.05):
+        with pytest.raises(requests.Timeout):
+            pool.get(url(server))
+        time.sleep(0.05)
+        with pytest.raises(session.DeadlineExceeded):
+            pool.get(url(server))
+    assert time.perf_counter() - start < 0.2
+
+
+def test_timeouts_default_to_the_ones_of_the_session():
+    assert session.timeouts(1, None) == (1, session.READ_TIMEOUT)
+    with session.deadline(60):
+        assert session.timeouts(None, 2) == (session.CONNECT_TIMEOUT, 2)
+
+
+def test_retries_stop_at_the_deadline(server, pool):
+    session.configure(retries=3, backoff_factor=0.3)
+    server.statuses = [500] * 4
+    server.delay = 0.2
+    start = time.perf_counter()
+    with session.deadline(0.5):
+        response = pool.get(url(server))
+    assert response.status_code == 500
+    assert time.perf_counter() - start < 0.6
+
+
+def test_retries_are_bounded_by_the_time_left(server, pool):
+    session.configure(retries=3, backoff_factor=0)
+    server.statuses = [500]
+    server.delay = 0.3
+    start = time.perf_counter()
+    with session.deadline(0.5):
+        # The retry after 0.3 seconds only has 0.2 seconds left to read
+        with pytest.raises(requests.Timeout):
+            pool.get(url(server))
+    assert time.perf_counter() - start < 0.6
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+
+import pytest
+
+from grandpy.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def run_threads(count, target):
+    """Runs target in count threads and returns their results or errors."""
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = target()
+        except Exception as error:
+            results[index] = error
+
+    threads = [
+        threading.Thread(target=run, args=(index,)) for index in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class BlockingFunction:
+    """Function blocking until released, counting its calls."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.released = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.released.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def wait_for_followers(single_flight, count):
+    while single_flight.stats()["shared"] < count:
+        threading.Event().wait(0.001)
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        function = BlockingFunction(result="tour eiffel")
+        threads, results = run_threads(
+            5, lambda: single_flight.do("key", function)
+        )
+        wait_for_followers(single_flight, 4)
+        function.released.set()
+        for thread in threads:
+            thread.join()
+        assert results == ["tour eiffel"] * 5
+        assert function.calls == 1
+        assert single_flight.stats()["in_flight"] == 0
+
+    def test_errors_are_raised_in_all_the_callers(self):
+        single_flight = SingleFlight()
+        function = BlockingFunction(error=ValueError("nothing"))
+        threads, results = run_threads(
+            3, lambda: single_flight.do("key", function)
+        )
+        wait_for_followers(single_flight, 2)
+        function.released.set()
+        for thread in threads:
+            thread.join()
+        assert all(isinstance(result, ValueError) for result in results)
+        assert function.calls == 1
+
+    def test_followers_stop_waiting_after_their_timeout(self):
+        single_flight = SingleFlight()
+        function = BlockingFunction(result=1)
+        threads, results = run_threads(
+            1, lambda: single_flight.do("key", function)
+        )
+        while not single_flight.stats()["in_flight"]:
+            threading.Event().wait(0.001)
+        with pytest.raises(TimeoutError):
+            single_flight.do("key", function, timeout=0.01)
+        function.released.set()
+        threads[0].join()
+        assert results == [1]
+        assert single_flight.stats()["timeouts"] == 1
+
+    def test_calls_for_other_keys_are_not_shared(self):
+        single_flight = SingleFlight()
+        assert single_flight.do("a", lambda: 1) == 1
+        assert single_flight.do("a", lambda: 2) == 2
+        assert single_flight.stats()["calls"] == 2
+
+
+class TestAsyncSingleFlight:
+    def test_concurrent_coroutines_share_one_execution(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def search():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "tour eiffel"
+
+        async def main():
+            return await asyncio.gather(
+                *(single_flight.do("key", search) for _ in range(5))
+            )
+
+        assert asyncio.run(main()) == ["tour eiffel"] * 5
+        assert len(calls) == 1
+
+    def test_errors_are_raised_in_all_the_coroutines(self):
+        single_flight = AsyncSingleFlight()
+
+        async def search():
+            await asyncio.sleep(0.01)
+            raise ValueError("nothing")
+
+        async def main():
+            return await asyncio.gather(
+                *(single_flight.do("key", search) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+        assert all(isinstance(result, ValueError) for result in results)
+
+    def test_followers_stop_waiting_after_their_timeout(self):
+        single_flight = AsyncSingleFlight()
+
+        async def search():
+            await asyncio.sleep(0.05)
+            return 1
+
+        async def main():
+            leader = asyncio.ensure_future(single_flight.do("key", search))
+            await asyncio.sleep(0)
+            with pytest.raises(TimeoutError):
+                await single_flight.do("key", search, timeout=0.01)
+            return await leader
+
+        assert asyncio.run(main()) == 1
+
+    def test_followers_call_again_when_the_leader_is_cancelled(self):
+        single_flight = AsyncSingleFlight()
+        calls = []
+
+        async def search():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def main():
+            leader = asyncio.ensure_future(single_flight.do("key", search))
+            await asyncio.sleep(0)
+            followers = asyncio.gather(
+                *(single_flight.do("key", search) for _ in range(3))
+            )
+            await asyncio.sleep(0)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await followers
+
+        assert asyncio.run(main()) == [2] * 3
+        assert len(calls) == 2
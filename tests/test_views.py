@@ -0,0 +1,80 @@
+import json
+
+import flask
+import pytest
+
+from website import app, views
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Fixture giving a test client of the Flask application whose answers
+     are imitations, with the ETag "louvre" when the question is about the
+     Louvre.
+    """
+
+    def mock_answer_json(question):
+        body = b'{"found":true,"question":"%s"}' % question.encode()
+        return body, "louvre" if "Louvre" in question else None
+
+    def mock_answer_stream(question):
+        yield {"part": "place", "found": True, "question": question}
+        yield {"part": "article", "found": False}
+
+    monkeypatch.setattr(views, "answer_json", mock_answer_json)
+    monkeypatch.setattr(views, "answer_stream", mock_answer_stream)
+    yield app.test_client()
+
+
+def test_question_view_answers_the_question_posted(client):
+    response = client.post("/question", data={"question": "Louvre"})
+    assert response.status_code == 200
+    assert response.get_json() == {"found": True, "question": "Louvre"}
+    assert response.headers["ETag"] == 'W/"louvre"'
+
+
+def test_question_view_answers_a_get_request_not_modified(client):
+    response = client.get(
+        "/question?question=Louvre", headers={"If-None-Match": 'W/"louvre"'}
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_question_view_answers_without_etag_the_negative_answers(client):
+    response = client.get("/question?question=Orsay")
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_question_view_streams_the_answer_in_json_lines(client):
+    response = client.post(
+        "/question",
+        data={"question": "Louvre"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in response.data.splitlines()] == [
+        {"part": "place", "found": True, "question": "Louvre"},
+        {"part": "article", "found": False},
+    ]
+
+
+def test_jsonify_serializes_with_fastjson():
+    with app.app_context():
+        response = flask.jsonify({"title": "Musée du Louvre"})
+    assert response.get_data() == '{"title":"Musée du Louvre"}\n'.encode()
+
+
+def test_metrics_view_exports_the_durations_of_the_stages(fake_backends):
+    client = app.test_client()
+    client.post("/question", data={"question": "Où est la tour Eiffel ?"})
+    text = client.get("/metrics").get_data(as_text=True)
+    assert "# HELP grandpy_stage_duration_seconds " in text
+    assert "# TYPE grandpy_stage_duration_seconds histogram" in text
+    for stage in ("parse", "geocode", "geosearch", "page", "question"):
+        assert (
+            f'grandpy_stage_duration_seconds_bucket{{stage="{stage}",'
+            'le="+Inf"}'
+        ) in text
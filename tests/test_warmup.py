@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from grandpy import bot, fakeserver, warmup
+from grandpy.apis import googlemaps, session, wikipedia
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Fixture pointing the API clients of the bot to a fake server without
+     latency.
+    """
+    server = fakeserver.start_server(latency=0)
+    geocoding_url, wikipedia_url = fakeserver.urls(server)
+    monkeypatch.setattr(googlemaps, "GEOCODING_URL", geocoding_url)
+    monkeypatch.setattr(wikipedia, "WIKIPEDIA_URL", wikipedia_url)
+    bot.use_backends(
+        googlemaps.GoogleGeocodingClient(), wikipedia.WikipediaClient()
+    )
+    yield server
+    bot.use_backends()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def places_path(tmp_path):
+    path = tmp_path / "places.txt"
+    path.write_text(
+        "Où se trouve la tour Eiffel ?\n\nopenclassrooms\ntour Eiffel\n",
+        encoding="utf-8",
+    )
+    yield str(path)
+
+
+def test_read_places_returns_the_first_lines_not_empty(places_path):
+    assert warmup.read_places(places_path, 2) == [
+        "Où se trouve la tour Eiffel ?",
+        "openclassrooms",
+    ]
+
+
+def test_upstream_urls_has_the_wikipedia_api_of_each_language():
+    urls = warmup.upstream_urls(["fr", "en"])
+    assert urls[0] == googlemaps.GEOCODING_URL
+    assert urls[1:] == [
+        wikipedia.WIKIPEDIA_URL.format(lang="fr"),
+        wikipedia.WIKIPEDIA_URL.format(lang="en"),
+    ]
+
+
+def test_warm_up_opens_connections_and_primes_the_caches(
+    server, places_path
+):
+    report = warmup.warm_up(connections=2, places_path=places_path, count=2)
+    languages = len(bot.get_parser().parsers)
+    assert report["connections_opened"] == (1 + languages) * 2
+    assert report["places_found"] == 2
+    assert {"parser", "clients", "connections", "caches"} <= set(report)
+
+
+def test_warm_up_survives_unreachable_apis(monkeypatch):
+    monkeypatch.setattr(googlemaps, "GEOCODING_URL", "http://127.0.0.1:9/")
+    monkeypatch.setattr(wikipedia, "WIKIPEDIA_URL", "http://127.0.0.1:9/")
+    session.configure(retries=0)
+    try:
+        report = warmup.warm_up(connections=1)
+    finally:
+        session.configure()
+    assert report["connections_opened"] == 0
+
+
+def test_warm_up_async_opens_connections_and_primes_the_caches(
+    server, places_path
+):
+    async def warm_up():
+        try:
+            return await warmup.warm_up_async(
+                connections=1, places_path=places_path, count=3
+            )
+        finally:
+            await session.async_close()
+
+    report = asyncio.run(warm_up())
+    languages = len(bot.get_parser().parsers)
+    assert report["connections_opened"] == 1 + languages
+    assert report["places_found"] == 3
@@ -1,7 +1,12 @@
+import asyncio
+import collections.abc
+
 import pytest
 import requests
 
-from grandpy.apis import wikipedia
+from grandpy import fastjson
+from grandpy.apis import breaker, session, wikipedia
+from grandpy.cache import MemoryCache, SpatialCache
 
 TEST_PAGE_IDS = [6422233, 5105544]
 
@@ -66,6 +71,21 @@ WIKIPEDIA_PAGE_NOT_FOUND_RESPONSE = {
 }
 
 
+WIKIPEDIA_GEOSEARCH_WITH_DATA_RESPONSE = {
+    'query': {
+        **WIKIPEDIA_GEOSEARCH_SUCCESS_RESPONSE['query'],
+        'pages': {
+            **WIKIPEDIA_PAGE_SUCCESS_RESPONSE['query']['pages'],
+            f'{TEST_PAGE_IDS[1]}': {
+                'pageid': TEST_PAGE_IDS[1],
+                'title': '101 Second Street',
+                'fullurl': 'https://fr.wikipedia.org/wiki/101_Second_Street',
+            },
+        },
+    }
+}
+
+
 @pytest.fixture
 def client():
     client = wikipedia.WikipediaClient()
@@ -80,7 +100,7 @@ def page():
 
 @pytest.fixture
 def mock_get_geosearch(monkeypatch):
-    """Fixture replacing the requests.get function with an imitation simulating
+    """Fixture replacing the session.get function with an imitation simulating
      a successful search of the Wikipedia API.
     """
 
@@ -88,23 +108,25 @@ def mock_get_geosearch(monkeypatch):
         def raise_for_status(self):
             pass
 
-        def json(self):
-            return WIKIPEDIA_GEOSEARCH_SUCCESS_RESPONSE
+        @property
+        def content(self):
+            return fastjson.dumps(WIKIPEDIA_GEOSEARCH_SUCCESS_RESPONSE)
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
+            "timeout": timeout,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_geosearch_with_no_result(monkeypatch):
-    """Fixture replacing the requests.get function with an imitation simulating
+    """Fixture replacing the session.get function with an imitation simulating
      a search without results with the Wikipedia API.
     """
 
@@ -112,23 +134,24 @@ def mock_get_geosearch_with_no_result(monkeypatch):
         def raise_for_status(self):
             pass
 
-        def json(self):
-            return WIKIPEDIA_GEOSEARCH_NOTHING_FOUND_RESPONSE
+        @property
+        def content(self):
+            return fastjson.dumps(WIKIPEDIA_GEOSEARCH_NOTHING_FOUND_RESPONSE)
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_geosearch_with_http_error(monkeypatch):
-    """Fixture replacing the requests.get function with an imitation simulating
+    """Fixture replacing the session.get function with an imitation simulating
      a search where raise_for_status () throws a requests.HTTPError.
     """
 
@@ -138,39 +161,40 @@ def mock_get_geosearch_with_http_error(monkeypatch):
                 "Exception raised by mock_get_geosearch_with_http_error"
             )
 
-        def json(self):
-            return {}
+        @property
+        def content(self):
+            return fastjson.dumps({})
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_geosearch_with_connection_error(monkeypatch):
-    """Fixture replacing the requests.get function with an imitation simulating
+    """Fixture replacing the session.get function with an imitation simulating
      a search with the Wikipedia API raising a
      requests.ConnectionError.
     """
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         raise requests.ConnectionError(
             "Raise in mock_get_geosearch_with_connection_error."
         )
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_page(monkeypatch):
-    """Fixture replacing the requests.get function with an imitation simulating
+    """Fixture replacing the session.get function with an imitation simulating
      a successful search of the Wikipedia Extracts API.
     """
 
@@ -178,23 +202,25 @@ def mock_get_page(monkeypatch):
         def raise_for_status(self):
             pass
 
-        def json(self):
-            return WIKIPEDIA_PAGE_SUCCESS_RESPONSE
+        @property
+        def content(self):
+            return fastjson.dumps(WIKIPEDIA_PAGE_SUCCESS_RESPONSE)
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
+            "timeout": timeout,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 @pytest.fixture
 def mock_get_page_not_found(monkeypatch):
-    """Fixture replacing the requests.get function with an imitation simulating
+    """Fixture replacing the session.get function with an imitation simulating
      a search of the Wikipedia Extracts API with no results.
     """
 
@@ -202,24 +228,88 @@ def mock_get_page_not_found(monkeypatch):
         def raise_for_status(self):
             pass
 
-        def json(self):
-            return WIKIPEDIA_PAGE_NOT_FOUND_RESPONSE
+        @property
+        def content(self):
+            return fastjson.dumps(WIKIPEDIA_PAGE_NOT_FOUND_RESPONSE)
+
+    def mock_requests_get(url, params, timeout=None):
+        mock_requests_get.called_with_parameters = {
+            "url": url,
+            "params": params,
+        }
+        return MockRequestsResponse()
+
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
+    yield mock_requests_get
+
+
+@pytest.fixture
+def mock_get_geosearch_with_data(monkeypatch):
+    """Fixture replacing the session.get function with an imitation simulating
+     a search of the Wikipedia API returning the data of the first page.
+    """
+
+    class MockRequestsResponse:
+        def raise_for_status(self):
+            pass
+
+        @property
+        def content(self):
+            return fastjson.dumps(WIKIPEDIA_GEOSEARCH_WITH_DATA_RESPONSE)
 
-    def mock_requests_get(url, params):
+    def mock_requests_get(url, params, timeout=None):
         mock_requests_get.called_with_parameters = {
             "url": url,
             "params": params,
         }
         return MockRequestsResponse()
 
-    monkeypatch.setattr('requests.get', mock_requests_get)
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
+    yield mock_requests_get
+
+
+@pytest.fixture
+def mock_get_pages(monkeypatch):
+    """Fixture replacing the session.get function with an imitation simulating
+     the Wikipedia Extracts API, where only the first test page exists. The
+     extracts are returned one per response, following the continuation of
+     the query.
+    """
+
+    class MockRequestsResponse:
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        @property
+        def content(self):
+            return fastjson.dumps(self.data)
+
+    def mock_requests_get(url, params, timeout=None):
+        mock_requests_get.requested_page_ids.append(params["pageids"])
+        found = WIKIPEDIA_PAGE_SUCCESS_RESPONSE['query']['pages']
+        pages = {}
+        for page_id in str(params["pageids"]).split("|"):
+            if page_id not in found:
+                pages[page_id] = {'missing': ''}
+            elif "excontinue" in params:
+                pages[page_id] = {'title': found[page_id]['title']}
+            else:
+                pages[page_id] = found[page_id]
+        return MockRequestsResponse({'query': {'pages': pages}})
+
+    mock_requests_get.requested_page_ids = []
+    monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
     yield mock_requests_get
 
 
 class TestWikipediaClient:
-    def test_geosearch_returns_a_list(self, client, mock_get_geosearch):
+    def test_geosearch_returns_a_sequence(self, client, mock_get_geosearch):
         result = client.geosearch(latitude=0, longitude=0)
-        assert isinstance(result, list)
+        assert isinstance(result, collections.abc.Sequence)
+        assert len(result) == 2
 
     def test_geosearch_calls_wikipedia_api(self, client, mock_get_geosearch):
         result = client.geosearch(latitude=0, longitude=0)
@@ -245,6 +335,24 @@ class TestWikipediaClient:
         assert params["list"] == "geosearch"
         assert 0 <= params["gsradius"] <= 10000
         assert params["gscoord"] == f"0|0"
+        assert params["gslimit"] == wikipedia.GEOSEARCH_LIMIT
+
+    def test_geosearch_asks_for_limit_places(
+        self, client, mock_get_geosearch
+    ):
+        client.geosearch(latitude=0, longitude=0, with_data=True, limit=3)
+        params = mock_get_geosearch.called_with_parameters["params"]
+        assert params["gslimit"] == params["ggslimit"] == 3
+
+    def test_geosearch_only_builds_the_pages_accessed(
+        self, client, mock_get_geosearch_with_data
+    ):
+        pages = client.geosearch(latitude=0, longitude=0, with_data=True)
+        assert pages.built == 0
+        assert client.first_available_page(pages) is pages[0]
+        assert pages.built == 1
+        assert [page.id for page in pages] == TEST_PAGE_IDS
+        assert pages[-1] is pages[1]
 
     def test_geosearch_returns_wikipedia_pages_instances(
         self, client, mock_get_geosearch
@@ -287,8 +395,179 @@ class TestWikipediaClient:
         with pytest.raises(wikipedia.WikipediaNothingFound):
             results = client.geosearch(latitude=0, longitude=0)
 
+    def test_geosearch_with_data_uses_the_geosearch_generator(
+        self, client, mock_get_geosearch_with_data
+    ):
+        client.geosearch(latitude=0, longitude=0, with_data=True)
+        params = mock_get_geosearch_with_data.called_with_parameters["params"]
+        assert params["list"] == "geosearch"
+        assert params["generator"] == "geosearch"
+        assert params["ggscoord"] == params["gscoord"]
+        assert params["prop"] == "extracts|info"
+
+    def test_geosearch_with_data_loads_pages_with_an_extract(
+        self, client, mock_get_geosearch_with_data
+    ):
+        pages = client.geosearch(latitude=0, longitude=0, with_data=True)
+        assert [page.id for page in pages] == TEST_PAGE_IDS
+        assert pages[0].loaded
+        assert pages[0].title == 'Academy of Art University'
+        assert not pages[1].loaded
+
+    def test_first_available_page_returns_loaded_page_without_api_call(
+        self, client, mock_get_pages
+    ):
+        pages = [wikipedia.WikipediaPage(page_id) for page_id in TEST_PAGE_IDS]
+        pages[0].load(
+            WIKIPEDIA_PAGE_SUCCESS_RESPONSE['query']['pages'][
+                str(TEST_PAGE_IDS[0])
+            ]
+        )
+        assert client.first_available_page(pages) is pages[0]
+        assert mock_get_pages.requested_page_ids == []
+
+    def test_first_available_page_falls_back_on_following_pages(
+        self, client, mock_get_pages
+    ):
+        pages = [wikipedia.WikipediaPage(page_id) for page_id in [1, 2]]
+        pages.append(wikipedia.WikipediaPage(TEST_PAGE_IDS[0]))
+        page = client.first_available_page(pages, prefetch=3)
+        assert page is pages[2]
+        assert page.title == 'Academy of Art University'
+        assert pages[0].missing and pages[1].missing
+        assert mock_get_pages.requested_page_ids == [f"1|2|{TEST_PAGE_IDS[0]}"]
+
+    def test_first_available_page_raises_custom_exception_if_none_exists(
+        self, client, mock_get_pages
+    ):
+        pages = [wikipedia.WikipediaPage(page_id) for page_id in [1, 2, 3, 4]]
+        with pytest.raises(wikipedia.WikipediaNothingFound):
+            client.first_available_page(pages, prefetch=2)
+
+    def test_load_pages_loads_all_pages_in_one_request(
+        self, client, mock_get_pages
+    ):
+        pages = [wikipedia.WikipediaPage(page_id) for page_id in TEST_PAGE_IDS]
+        found = client.load_pages(pages)
+        assert found == [pages[0]]
+        assert pages[0].summary.startswith("L’Academy of Art University")
+        assert pages[1].missing
+        assert mock_get_pages.requested_page_ids == [
+            f"{TEST_PAGE_IDS[0]}|{TEST_PAGE_IDS[1]}"
+        ]
+
+    def test_load_pages_sends_at_most_50_page_ids_per_request(
+        self, client, mock_get_pages
+    ):
+        pages = [wikipedia.WikipediaPage(page_id) for page_id in range(120)]
+        client.load_pages(pages)
+        assert [
+            len(page_ids.split("|"))
+            for page_ids in mock_get_pages.requested_page_ids
+        ] == [50, 50, 20]
+
+    def test_load_pages_skips_pages_already_loaded_or_missing(
+        self, client, mock_get_pages
+    ):
+        pages = [wikipedia.WikipediaPage(page_id) for page_id in [1, 2]]
+        client.load_pages(pages)
+        client.load_pages(pages)
+        assert mock_get_pages.requested_page_ids == ["1|2"]
+
+    def test_load_pages_follows_the_continuation(self, client, monkeypatch):
+        responses = [
+            {
+                'continue': {'excontinue': 1, 'continue': '||info'},
+                'query': {
+                    'pages': {
+                        '1': {'title': 'Un', 'fullurl': 'u1', 'extract': 'e1'},
+                        '2': {'title': 'Deux', 'fullurl': 'u2'},
+                    }
+                },
+            },
+            {
+                'query': {
+                    'pages': {'1': {'title': 'Un'}, '2': {'extract': 'e2'}}
+                }
+            },
+        ]
+        calls = []
+
+        class MockRequestsResponse:
+            def __init__(self, data):
+                self.data = data
+
+            def raise_for_status(self):
+                pass
+
+            @property
+            def content(self):
+                return fastjson.dumps(self.data)
+
+        def mock_requests_get(url, params, timeout=None):
+            calls.append(params)
+            return MockRequestsResponse(responses[len(calls) - 1])
+
+        monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
+        pages = [wikipedia.WikipediaPage(1), wikipedia.WikipediaPage(2)]
+        client.load_pages(pages)
+        assert calls[1]["excontinue"] == 1
+        assert [page.summary for page in pages] == ["e1", "e2"]
+
+    def test_geosearch_fails_fast_while_the_breaker_is_open(
+        self, client, mock_get_geosearch
+    ):
+        for _ in range(breaker.wikipedia.minimum_calls):
+            breaker.wikipedia.record_failure()
+        with pytest.raises(wikipedia.WikipediaUnavailableError):
+            client.geosearch(latitude=0, longitude=0)
+        assert not hasattr(mock_get_geosearch, "called_with_parameters")
+
+    def test_geosearch_failures_are_recorded_in_the_breaker(
+        self, client, mock_get_geosearch_with_connection_error
+    ):
+        for _ in range(breaker.wikipedia.minimum_calls):
+            with pytest.raises(wikipedia.WikipediaError):
+                client.geosearch(latitude=0, longitude=0)
+        assert breaker.wikipedia.state == breaker.OPEN
+
+    def test_geosearch_fails_without_calling_once_the_deadline_is_spent(
+        self, client, mock_get_geosearch
+    ):
+        with session.deadline(0):
+            for _ in range(breaker.wikipedia.minimum_calls):
+                with pytest.raises(wikipedia.WikipediaDeadlineExceededError):
+                    client.geosearch(latitude=0, longitude=0)
+        assert not hasattr(mock_get_geosearch, "called_with_parameters")
+        assert breaker.wikipedia.state == breaker.CLOSED
+
+    def test_deadline_exceeded_in_session_is_not_recorded_in_the_breaker(
+        self, client, monkeypatch
+    ):
+        def mock_requests_get(url, params, timeout=None):
+            raise session.DeadlineExceeded("The deadline is exceeded.")
+
+        monkeypatch.setattr('grandpy.apis.session.get', mock_requests_get)
+        for _ in range(breaker.wikipedia.minimum_calls):
+            with pytest.raises(wikipedia.WikipediaDeadlineExceededError):
+                client.geosearch(latitude=0, longitude=0)
+        assert breaker.wikipedia.state == breaker.CLOSED
+
+    def test_client_timeouts_are_passed_to_the_requests_of_its_pages(
+        self, mock_get_geosearch
+    ):
+        client = wikipedia.WikipediaClient(connect_timeout=1, read_timeout=2)
+        client.geosearch(latitude=0, longitude=0)
+        assert mock_get_geosearch.called_with_parameters["timeout"] == (1, 2)
+        pages = client.geosearch(latitude=0, longitude=0)
+        assert all(page.timeout == (1, 2) for page in pages)
+
 
 class TestWikipediaPage:
+    def test_pages_have_no_instance_dictionary(self):
+        page = wikipedia.WikipediaPage(TEST_PAGE_IDS[0])
+        assert not hasattr(page, "__dict__")
+
     def test_wikipedia_page_can_be_instantiated_with_a_page_id(self):
         page = wikipedia.WikipediaPage(TEST_PAGE_IDS[0])
 
@@ -345,3 +624,161 @@ class TestWikipediaPage:
         assert dict_data["title"] == page.title
         assert dict_data["url"] == page.url
         assert dict_data["summary"] == page.summary
+
+
+@pytest.fixture
+def cache():
+    yield MemoryCache(maxbytes=100000, sizeof=wikipedia.article_size)
+
+
+class TestArticleCache:
+    def test_get_data_stores_the_article_in_the_cache(
+        self, cache, mock_get_page
+    ):
+        wikipedia.WikipediaPage(TEST_PAGE_IDS[0], cache=cache).get_data()
+        page = wikipedia.WikipediaPage(TEST_PAGE_IDS[0], cache=cache)
+        mock_get_page.called_with_parameters = None
+        assert page.title == 'Academy of Art University'
+        assert mock_get_page.called_with_parameters is None
+        assert cache.stats()["bytes"] > 0
+
+    def test_articles_are_cached_by_lang_and_page_id(
+        self, cache, mock_get_page
+    ):
+        wikipedia.WikipediaPage(TEST_PAGE_IDS[0], cache=cache).get_data()
+        assert f"fr:{TEST_PAGE_IDS[0]}" in cache._entries
+        page = wikipedia.WikipediaPage(TEST_PAGE_IDS[0], "en", cache=cache)
+        assert not page.load_cached()
+
+    def test_load_pages_only_requests_pages_not_cached(
+        self, cache, mock_get_pages
+    ):
+        client = wikipedia.WikipediaClient(cache=cache)
+        client.load_pages(
+            [wikipedia.WikipediaPage(TEST_PAGE_IDS[0], cache=cache)]
+        )
+        pages = [
+            wikipedia.WikipediaPage(page_id, cache=cache)
+            for page_id in TEST_PAGE_IDS
+        ]
+        assert client.load_pages(pages) == [pages[0]]
+        assert mock_get_pages.requested_page_ids == [
+            str(TEST_PAGE_IDS[0]),
+            str(TEST_PAGE_IDS[1]),
+        ]
+
+    def test_geosearch_invalidates_articles_of_an_older_revision(
+        self, cache, mock_get_pages
+    ):
+        page_data = {
+            **WIKIPEDIA_PAGE_SUCCESS_RESPONSE['query']['pages'][
+                str(TEST_PAGE_IDS[0])
+            ],
+            'lastrevid': 1,
+        }
+        wikipedia.WikipediaPage(TEST_PAGE_IDS[0], cache=cache).load(page_data)
+        client = wikipedia.WikipediaClient(cache=cache)
+        client._geosearch_pages(
+            {
+                'query': {
+                    'geosearch': [{'pageid': TEST_PAGE_IDS[0]}],
+                    'pages': {
+                        str(TEST_PAGE_IDS[0]): {'lastrevid': 1},
+                    },
+                }
+            },
+            with_data=True,
+        )
+        assert cache.peek(f"fr:{TEST_PAGE_IDS[0]}") is not None
+        client._geosearch_pages(
+            {
+                'query': {
+                    'geosearch': [{'pageid': TEST_PAGE_IDS[0]}],
+                    'pages': {
+                        str(TEST_PAGE_IDS[0]): {'lastrevid': 2},
+                    },
+                }
+            },
+            with_data=True,
+        )
+        assert cache.peek(f"fr:{TEST_PAGE_IDS[0]}") is None
+
+
+class TestGeosearchCache:
+    def test_nearby_geosearch_is_served_from_the_cache(
+        self, mock_get_geosearch
+    ):
+        client = wikipedia.WikipediaClient(
+            geosearch_cache=SpatialCache(MemoryCache(), precision=6)
+        )
+        client.geosearch(latitude=37.7879, longitude=-122.4001)
+        mock_get_geosearch.called_with_parameters = None
+        pages = client.geosearch(latitude=37.7881, longitude=-122.3991)
+        assert mock_get_geosearch.called_with_parameters is None
+        # Sorted again by distance to the second position
+        assert [page.id for page in pages] == TEST_PAGE_IDS[::-1]
+
+    def test_empty_geosearch_is_cached(
+        self, mock_get_geosearch_with_no_result
+    ):
+        client = wikipedia.WikipediaClient(
+            geosearch_cache=SpatialCache(MemoryCache(), precision=6)
+        )
+        with pytest.raises(wikipedia.WikipediaNothingFound):
+            client.geosearch(latitude=0, longitude=0)
+        mock_get_geosearch_with_no_result.called_with_parameters = None
+        with pytest.raises(wikipedia.WikipediaNothingFound):
+            client.geosearch(latitude=0, longitude=0)
+        assert mock_get_geosearch_with_no_result.called_with_parameters is None
+
+
+@pytest.fixture
+def mock_async_get(monkeypatch):
+    """Fixture replacing the session.async_get function with an imitation
+     returning the responses of the test in turn.
+    """
+
+    class MockResponse:
+        def __init__(self, data):
+            self.data = data
+
+        @property
+        def content(self):
+            return fastjson.dumps(self.data)
+
+    async def mock_async_get(url, params, timeout=None):
+        mock_async_get.calls.append(params)
+        return MockResponse(mock_async_get.responses.pop(0))
+
+    mock_async_get.calls = []
+    monkeypatch.setattr('grandpy.apis.session.async_get', mock_async_get)
+    yield mock_async_get
+
+
+class TestWikipediaClientAsync:
+    def test_geosearch_async_loads_pages_with_an_extract(
+        self, client, mock_async_get
+    ):
+        mock_async_get.responses = [WIKIPEDIA_GEOSEARCH_WITH_DATA_RESPONSE]
+        pages = asyncio.run(
+            client.geosearch_async(latitude=0, longitude=0, with_data=True)
+        )
+        assert [page.id for page in pages] == TEST_PAGE_IDS
+        assert pages[0].title == 'Academy of Art University'
+        assert mock_async_get.calls[0]["generator"] == "geosearch"
+
+    def test_first_available_page_async_falls_back_on_following_pages(
+        self, client, mock_async_get
+    ):
+        pages_data = {
+            '1': {'missing': ''},
+            **WIKIPEDIA_PAGE_SUCCESS_RESPONSE['query']['pages'],
+        }
+        mock_async_get.responses = [{'query': {'pages': pages_data}}]
+        pages = [
+            wikipedia.WikipediaPage(1),
+            wikipedia.WikipediaPage(TEST_PAGE_IDS[0]),
+        ]
+        page = asyncio.run(client.first_available_page_async(pages))
+        assert page is pages[1]
+        assert len(mock_async_get.calls) == 1
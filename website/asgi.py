@@ -0,0 +1,173 @@
+"""ASGI application answering the questions without blocking, to run with
+an ASGI server such as uvicorn (uvicorn website.asgi:app).
+
+A worker of the Flask application is blocked during all the API calls of a
+question, this application handles many questions at the same time in a
+single event loop. It only serves the /question and /metrics routes, the
+other pages being served by the Flask application.
+"""
+
+import email.parser
+import email.policy
+import urllib.parse
+
+from grandpy import fastjson, metrics, warmup
+from grandpy.apis import session
+from grandpy.bot import answer_json_async, answer_stream_async
+
+
+async def read_body(receive):
+    """Reads the whole body of the request."""
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+
+async def send_response(send, status, body, content_type, headers=()):
+    """Sends a complete response, with the optional additional headers."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def header(scope, name):
+    """Returns the value of a header of the request, b"" if it is missing."""
+    for header_name, value in scope.get("headers", []):
+        if header_name == name:
+            return value
+    return b""
+
+
+def parse_form(scope, body):
+    """Returns the values of the fields of a form posted urlencoded or as
+     multipart/form-data, like the FormData sent by the javascript, by name.
+    """
+    content_type = header(scope, b"content-type")
+    if not content_type.startswith(b"multipart/form-data"):
+        return urllib.parse.parse_qs(body.decode())
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type + b"\r\n\r\n" + body
+    )
+    form = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name is not None and part.get_filename() is None:
+            # The browsers send the fields in UTF-8, without a charset
+            value = part.get_payload(decode=True).decode("utf-8")
+            form.setdefault(name, []).append(value)
+    return form
+
+
+def accepts_stream(scope):
+    """Returns True if the request accepts the answer streamed."""
+    return b"application/x-ndjson" in header(scope, b"accept")
+
+
+def not_modified(scope, etag):
+    """Returns True if the If-None-Match header of a GET request matches the
+     weak ETag, compared weakly.
+    """
+    if scope["method"] != "GET":
+        return False
+    tags = header(scope, b"if-none-match").decode("latin-1").split(",")
+    for tag in map(str.strip, tags):
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in ("*", f'"{etag}"'):
+            return True
+    return False
+
+
+async def stream_view(send, question):
+    """Sends the answer in parts, one JSON object per line."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/x-ndjson")],
+        }
+    )
+    with metrics.timer("question"):
+        async for part in answer_stream_async(question):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": fastjson.dumps(part) + b"\n",
+                    "more_body": True,
+                }
+            )
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def question_view(scope, receive, send):
+    """Answers the question posted by the javascript of the home page, or
+     given in the query string of a GET request, like the Flask view.
+    """
+    if scope["method"] == "GET":
+        form = urllib.parse.parse_qs(scope.get("query_string", b"").decode())
+    else:
+        form = parse_form(scope, await read_body(receive))
+    if "question" not in form:
+        await send_response(send, 400, b"Bad Request", b"text/plain")
+        return
+    if accepts_stream(scope):
+        await stream_view(send, form["question"][0])
+        return
+    with metrics.timer("question"):
+        body, etag = await answer_json_async(form["question"][0])
+    if etag is None:
+        await send_response(send, 200, body, b"application/json")
+        return
+    headers = [(b"etag", f'W/"{etag}"'.encode())]
+    if not_modified(scope, etag):
+        await send_response(send, 304, b"", b"application/json", headers)
+    else:
+        await send_response(send, 200, body, b"application/json", headers)
+
+
+async def lifespan(receive, send):
+    """Warms up the application when the server starts if GRANDPY_WARMUP is
+     1, and closes the connections to the APIs when it stops.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            if warmup.enabled:
+                await warmup.warm_up_async(**warmup.settings())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await session.async_close()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """Entry point of the ASGI application."""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+    elif scope["type"] != "http":
+        return
+    elif scope["path"] == "/question" and scope["method"] in ("GET", "POST"):
+        await question_view(scope, receive, send)
+    elif scope["path"] == "/metrics":
+        await send_response(
+            send,
+            200,
+            metrics.render().encode(),
+            b"text/plain; version=0.0.4",
+        )
+    else:
+        await send_response(send, 404, b"Not Found", b"text/plain")
@@ -2,22 +2,48 @@ const chatboxForm = document.querySelector("#chatbox-form");
 
 /**
  * Sends a form to a remote server with the HTTP POST method
- * for its asynchronous processing.
+ * for its asynchronous processing. The answer is streamed in parts,
+ * one JSON object per line, and onPart is called with each part
+ * as soon as it is received.
  */
-function postForm(url, form) {
+function postForm(url, form, onPart) {
     const formData = new FormData(form);
 
     // Envoi de la requête HTTP
     response = fetch(url, {
         method: "POST",
+        headers: { "Accept": "application/x-ndjson" },
         body: formData
     })
-    .then(response => response.json())
+    .then(response => readLines(response.body, line => onPart(JSON.parse(line))))
     .catch(error => console.log(error));
 
     return response;
 }
 
+/**
+ * Reads a stream of text and calls onLine with each of its complete lines.
+ */
+async function readLines(stream, onLine) {
+    const reader = stream.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = "";
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            break;
+        }
+        buffer += value;
+
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        lines.filter(line => line).forEach(onLine);
+    }
+    if (buffer) {
+        onLine(buffer);
+    }
+}
+
 /**
  * Creates the HTML element containing the user's question
  */
@@ -42,7 +68,8 @@ function createUserQuestion(parent, data) {
 }
 
 /**
- * Create the HTML element containing Grandpy's response
+ * Create the HTML element containing Grandpy's response with the place
+ * found, the article being added by addGrandpyAnswerArticle once received.
  */
 function createGrandpyAnswer(parent, data) {
     const chatboxAnswer = document.createElement("div");
@@ -51,14 +78,20 @@ function createGrandpyAnswer(parent, data) {
     createGrandpyAnswerAvatar(chatboxAnswer, data);
     createGrandpyAnswerContent(chatboxAnswer, data);
     createGrandpyAnswerMap(chatboxAnswer, data);
-    createGrandpyAnswerIntro(chatboxAnswer, data);
-    createGrandpyAnswerArticle(chatboxAnswer, data);
-    createGrandpyAnswerLink(chatboxAnswer, data);
 
     parent.appendChild(chatboxAnswer);
     return chatboxAnswer;
 }
 
+/**
+ * Adds the article about the place to Grandpy's response.
+ */
+function addGrandpyAnswerArticle(chatboxAnswer, data) {
+    createGrandpyAnswerIntro(chatboxAnswer, data);
+    createGrandpyAnswerArticle(chatboxAnswer, data);
+    createGrandpyAnswerLink(chatboxAnswer, data);
+}
+
 /**
  * Build the HTML element containing Grandpy's avatar
  */
@@ -184,6 +217,7 @@ function handleGrandpyPositiveAnswer(data) {
     const chatboxAnswer = createGrandpyAnswer(chatbox, data);
 
     chatboxMessage.scrollIntoView();
+    return chatboxAnswer;
 }
 
 /**
@@ -206,14 +240,18 @@ chatboxForm.addEventListener("submit", function (event) {
     // We change the state of the mouse to ask the user to wait
     toggleCursorToWait();
 
-    postForm("/question", chatboxForm)
-    .then(response => {
-        if (response.found) {
-            handleGrandpyPositiveAnswer(response);
-        } else {
-            handleGrandpyNegativeAnswer(response);
+    // The place is shown as soon as it is found, the article after it
+    let chatboxAnswer = null;
+    postForm("/question", chatboxForm, part => {
+        if (part.part === "place" && part.found) {
+            chatboxAnswer = handleGrandpyPositiveAnswer(part);
+        } else if (part.part === "place") {
+            handleGrandpyNegativeAnswer(part);
+        } else if (part.found && chatboxAnswer) {
+            addGrandpyAnswerArticle(chatboxAnswer, part);
         }
-
+    })
+    .then(() => {
         // Return to default mouse
         toggleCursorToWait();
     });
@@ -1,10 +1,29 @@
 import os
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, render_template
+from flask.json.provider import DefaultJSONProvider
+
+from grandpy import fastjson, metrics, warmup
+from grandpy.bot import answer_json, answer_stream
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider of jsonify and get_json, serializing with orjson when
+     it is installed like the answers.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return fastjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return fastjson.loads(s)
 
-from grandpy.bot import answer
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
+
+if warmup.enabled:
+    warmup.warm_up(**warmup.settings())
 
 
 @app.route("/")
@@ -15,11 +34,39 @@ def homepage_view():
     )
 
 
-@app.route("/question", methods=["POST"])
+@app.route("/question", methods=["GET", "POST"])
 def question_view():
     """View managing the request to obtain an answer to a question in
      processing ajax requests from javascript.
+
+    When the request accepts application/x-ndjson, the answer is streamed
+    in parts, one JSON object per line, as soon as they are known.
+
+    The positive answers have a weak ETag, the place and the article being
+    the same whatever the phrases of GrandPy: a GET request whose
+    If-None-Match matches it is answered with 304 Not Modified.
     """
-    question = request.form["question"]
-    response = answer(question)
-    return jsonify(response)
+    question = request.values["question"]
+    if request.accept_mimetypes.best == "application/x-ndjson":
+        return Response(
+            stream_answer(question), mimetype="application/x-ndjson"
+        )
+    with metrics.timer("question"):
+        body, etag = answer_json(question)
+    response = Response(body, mimetype="application/json")
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    return response.make_conditional(request)
+
+
+def stream_answer(question):
+    """Yields the lines of the answer streamed."""
+    with metrics.timer("question"):
+        for part in answer_stream(question):
+            yield fastjson.dumps(part) + b"\n"
+
+
+@app.route("/metrics")
+def metrics_view():
+    """View exporting the metrics of the application for Prometheus."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")